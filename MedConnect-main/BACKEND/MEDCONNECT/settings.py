@@ -76,6 +76,11 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Take the write lock when a transaction starts, so concurrent
+                # transactions queue instead of failing with "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+            },
         }
     }
 
@@ -141,4 +146,7 @@ MIDDLEWARE = [
 # --- REMAINING SETTINGS ---
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+# --- COMMUNITY FEATURES ---
+# Buffer likes per process and flush them in batches (medconnect_app/like_buffer.py)
+LIKE_WRITE_BEHIND = os.environ.get('LIKE_WRITE_BEHIND', 'False') == 'True'
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, PatientProfile, ResearcherProfile, Appointment, Community, CommunityMembership, CommunityPost, PostAttachment, PostLike, PostComment, ResearchStudy, StudyParticipation, MedicalRecord, VitalSigns, Medication, Immunization, Allergy, ContactRequest, StudyDocument
+from .models import Profile, PatientProfile, ResearcherProfile, Appointment, Community, CommunityMembership, CommunityPost, PostAttachment, PostLike, PostComment, ResearchStudy, StudyParticipation, MedicalRecord, VitalSigns, Medication, Immunization, Allergy, ContactRequest, StudyDocument, Tag, Hashtag, Poll, PollOption
 
 admin.site.register(Profile)
 admin.site.register(PatientProfile)
@@ -14,6 +14,16 @@ class CommunityAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     filter_horizontal = ['moderators']
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'community_count']
+    search_fields = ['name']
+
+@admin.register(Hashtag)
+class HashtagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'post_count']
+    search_fields = ['name']
+
 @admin.register(CommunityMembership)
 class CommunityMembershipAdmin(admin.ModelAdmin):
     list_display = ['community', 'member', 'joined_at', 'is_moderator']
@@ -22,14 +32,26 @@ class CommunityMembershipAdmin(admin.ModelAdmin):
 
 @admin.register(CommunityPost)
 class CommunityPostAdmin(admin.ModelAdmin):
-    list_display = ['community', 'author', 'content_preview', 'like_count', 'comment_count', 'created_at']
-    list_filter = ['community', 'created_at']
+    list_display = ['community', 'author', 'content_preview', 'like_count', 'comment_count', 'duplicate_of', 'created_at']
+    list_filter = ['community', 'created_at', ('duplicate_of', admin.EmptyFieldListFilter)]
     search_fields = ['content', 'author__user__username', 'community__name']
+    raw_id_fields = ['duplicate_of']
     
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_preview.short_description = 'Content Preview'
 
+class PollOptionInline(admin.TabularInline):
+    model = PollOption
+    extra = 0
+
+@admin.register(Poll)
+class PollAdmin(admin.ModelAdmin):
+    list_display = ['question', 'post', 'counter_shards', 'created_at']
+    search_fields = ['question']
+    raw_id_fields = ['post']
+    inlines = [PollOptionInline]
+
 @admin.register(PostAttachment)
 class PostAttachmentAdmin(admin.ModelAdmin):
     list_display = ['post', 'filename', 'file_type', 'uploaded_at']
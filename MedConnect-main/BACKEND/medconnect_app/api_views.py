@@ -1,13 +1,30 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q, F, Case, Count, Max, Sum, Exists, OuterRef, Prefetch, FilteredRelation, Value, When, Window
+from django.db.models.functions import Coalesce, RowNumber, Substr
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
+from collections import Counter
+import heapq
+import random
 import json
+from itertools import islice
 from datetime import datetime, timedelta
-from .models import Profile, PatientProfile, ResearcherProfile, Appointment, Community, CommunityMembership, CommunityPost, PostAttachment, PostLike, PostComment, ResearchStudy, StudyParticipation, MedicalRecord, VitalSigns, Medication, Immunization, Allergy, ContactRequest
+from . import duplicates, like_buffer, recommendations, search, trending
+from .pagination import DEFAULT_PAGE_SIZE, InvalidCursor, encode_cursor, keyset_filter, keyset_page, page_size
+from .models import Profile, PatientProfile, ResearcherProfile, Appointment, Community, CommunityMembership, CommunityTag, CommunityPost, Hashtag, PostHashtag, Poll, PollOption, PollOptionCounter, PollVote, PostAttachment, PostLike, PostComment, PostProjection, ResearchStudy, StudyMatch, StudyParticipation, MedicalRecord, VitalSigns, Medication, Immunization, Allergy, ContactRequest, Tag
+
+# Upper bound on threads writing one post's attachments to storage
+ATTACHMENT_WRITE_WORKERS = 4
+# Per-community subqueries UNIONed into one home feed query, so a user in
+# many communities never builds an unbounded statement (SQLite, for one,
+# caps a compound SELECT at 500 terms: SQLITE_MAX_COMPOUND_SELECT)
+HOME_FEED_UNION_SIZE = 200
 
 def require_auth(view_func):
     """Custom decorator to check authentication"""
@@ -21,6 +38,342 @@ def require_auth(view_func):
         return view_func(request, *args, **kwargs)
     return wrapper
 
+def _bulk_upsert(model, objs, unique_fields, update_fields):
+    """INSERT ``objs``, updating ``update_fields`` of rows that collide on ``unique_fields``."""
+    # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+    if not connection.features.supports_update_conflicts_with_target:
+        unique_fields = None
+    return model.objects.bulk_create(objs, update_conflicts=True, unique_fields=unique_fields, update_fields=update_fields)
+
+def _community_directory_queryset():
+    """Communities with moderators prefetched along with their users.
+
+    Member count and last activity are stored on the row, so listing any
+    number of communities costs two queries.
+    """
+    return Community.objects.prefetch_related(
+        Prefetch('moderators', queryset=Profile.objects.select_related('user'))
+    )
+
+def _normalize_tags(tags):
+    """Lower-cased, de-duplicated tag names as stored in the Tag table."""
+    names = []
+    for tag in tags if isinstance(tags, list) else []:
+        name = str(tag).strip().lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def _link_community_tags(community):
+    """Mirror ``community.tags`` into the indexed Tag/CommunityTag tables."""
+    names = _normalize_tags(community.tags)
+    if not names:
+        return
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tags = list(Tag.objects.filter(name__in=names))
+    CommunityTag.objects.bulk_create([CommunityTag(community=community, tag=tag) for tag in tags])
+    Tag.objects.filter(id__in=[tag.id for tag in tags]).update(community_count=F('community_count') + 1)
+
+def _sync_post_hashtags(post):
+    """Mirror the hashtags in ``post.content`` into the PostHashtag index.
+
+    Links for hashtags no longer in the text are deleted (the post_delete
+    signal releases their counts); new ones bump post_count and the trending
+    score of their Hashtag in place.
+    """
+    names = search.hashtags(post.content)
+    links = {link.hashtag.name: link for link in post.hashtag_links.select_related('hashtag')}
+    stale = [link.id for name, link in links.items() if name not in names]
+    if stale:
+        PostHashtag.objects.filter(id__in=stale).delete()
+    added = [name for name in names if name not in links]
+    if not added:
+        return
+    Hashtag.objects.bulk_create([Hashtag(name=name) for name in added], ignore_conflicts=True)
+    hashtags = list(Hashtag.objects.filter(name__in=added))
+    PostHashtag.objects.bulk_create([
+        PostHashtag(hashtag=hashtag, post=post, created_at=post.created_at) for hashtag in hashtags
+    ])
+    Hashtag.objects.filter(id__in=[hashtag.id for hashtag in hashtags]).update(
+        post_count=F('post_count') + 1,
+        trending_score=trending.bumped('post', post.created_at),
+    )
+
+def _community_to_dict(community):
+    """Serialize a community from ``_community_directory_queryset``."""
+    last_activity = community.last_activity
+    return {
+        'id': str(community.id),
+        'name': community.name,
+        'description': community.description,
+        'category': community.category,
+        'isPrivate': community.is_private,
+        'tags': community.tags,
+        'memberCount': community.member_count,
+        'lastActivity': last_activity.isoformat() if last_activity else None,
+        'moderators': [mod.user.username for mod in community.moderators.all()]
+    }
+
+def _feed_posts_queryset(user_profile, comment_limit=DEFAULT_PAGE_SIZE):
+    """Community posts with everything the feed renders loaded up front.
+
+    ``is_liked`` is annotated from an Exists subquery, like counts and author
+    names come from columns stored on the post, and comments, attachments
+    and polls are joined or prefetched, so rendering a page costs a fixed
+    number of queries however many posts it contains. Only the first ``comment_limit``
+    top-level comments of each post are loaded (plus one to tell whether more
+    exist); the rest, and replies, are paged through api_post_comments.
+    """
+    return _rendered_posts_queryset(comment_limit).select_related('poll').annotate(
+        is_liked=Exists(PostLike.objects.filter(post=OuterRef('pk'), user=user_profile)),
+    ).prefetch_related(
+        Prefetch('poll__options', queryset=_poll_options_queryset(), to_attr='tallied_options'),
+        Prefetch('poll__votes', queryset=PollVote.objects.filter(voter=user_profile), to_attr='viewer_votes'),
+    )
+
+def _rendered_posts_queryset(comment_limit=DEFAULT_PAGE_SIZE):
+    """Community posts with what ``_post_static_dict`` and ``_attachment_dicts`` render prefetched."""
+    return CommunityPost.objects.prefetch_related(
+        Prefetch(
+            'comments',
+            queryset=PostComment.objects.filter(depth=0).order_by('path')[:comment_limit + 1],
+            to_attr='comment_page',
+        ),
+        'attachments',
+    )
+
+def _projected_posts_queryset(user_profile):
+    """Community posts with only the per-viewer columns ``_projected_posts`` splices in."""
+    return CommunityPost.objects.annotate(
+        is_liked=Exists(PostLike.objects.filter(post=OuterRef('pk'), user=user_profile)),
+    ).only('id', 'community_id', 'created_at', 'like_count', 'comment_count', 'render_version')
+
+def _poll_options_queryset():
+    """Poll options with ``total`` summed over their counter shards."""
+    return PollOption.objects.annotate(total=Coalesce(Sum('counters__votes'), 0)).order_by('position', 'id')
+
+def _parse_poll(poll_data):
+    """Validate a create-post ``poll`` payload into ``(question, options)``."""
+    if isinstance(poll_data, str):
+        try:
+            poll_data = json.loads(poll_data)
+        except json.JSONDecodeError:
+            raise ValueError('Invalid poll data')
+    if not isinstance(poll_data, dict):
+        raise ValueError('Invalid poll data')
+    question = str(poll_data.get('question', '')).strip()[:255]
+    raw_options = poll_data.get('options')
+    options = [str(text).strip()[:255] for text in raw_options if str(text).strip()] if isinstance(raw_options, list) else []
+    if not question:
+        raise ValueError('A poll needs a question')
+    if not 2 <= len(options) <= 20:
+        raise ValueError('A poll needs between 2 and 20 options')
+    return question, options
+
+def _create_poll(post, question, options):
+    poll = Poll.objects.create(post=post, question=question)
+    PollOption.objects.bulk_create([
+        PollOption(poll=poll, text=text, position=position) for position, text in enumerate(options)
+    ])
+    PollOptionCounter.objects.bulk_create([
+        PollOptionCounter(option=option, shard=shard)
+        for option in poll.options.all() for shard in range(poll.counter_shards)
+    ])
+    return poll
+
+def _store_attachments(files):
+    """Write uploaded ``files`` to attachment storage concurrently.
+
+    Returns the stored names in upload order. If any write fails, the files
+    already written are deleted before the error is raised.
+    """
+    field = PostAttachment._meta.get_field('file')
+    
+    def store(file):
+        return field.storage.save(field.generate_filename(None, file.name), file, max_length=field.max_length)
+    
+    with ThreadPoolExecutor(max_workers=min(ATTACHMENT_WRITE_WORKERS, len(files))) as pool:
+        futures = [pool.submit(store, file) for file in files]
+    names = [future.result() for future in futures if not future.exception()]
+    if len(names) < len(futures):
+        _delete_attachment_files(names)
+        raise next(future.exception() for future in futures if future.exception())
+    return names
+
+def _delete_attachment_files(names):
+    storage = PostAttachment._meta.get_field('file').storage
+    for name in names:
+        storage.delete(name)
+
+def _poll_to_dict(poll, options, user_vote=None):
+    """Serialize a poll from its tallied options and the id of the option the viewer chose."""
+    return {
+        'id': poll.id,
+        'question': poll.question,
+        'options': [{'id': option.id, 'text': option.text, 'votes': option.total} for option in options],
+        'total_votes': sum(option.total for option in options),
+        'user_vote': user_vote
+    }
+
+def _comment_to_dict(comment):
+    return {
+        'id': comment.id,
+        'parent_id': comment.parent_id,
+        'depth': comment.depth,
+        'author_name': comment.author_name,
+        'author_type': comment.author_role,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat()
+    }
+
+def _attach_first_replies(post, roots, replies_limit):
+    """Set ``first_replies`` and ``has_more_replies`` on top-level comments.
+
+    The page's threads are one contiguous (post, path) range, so a single
+    query reads them in thread order; a ROW_NUMBER window per thread keeps
+    only the first ``replies_limit`` replies (plus one to flag more).
+    """
+    for root in roots:
+        root.first_replies = []
+        root.has_more_replies = False
+    if not roots or replies_limit <= 0:
+        return
+    thread = Substr('path', 1, PostComment.PATH_SEGMENT_WIDTH + 1)
+    replies = PostComment.objects.filter(
+        post=post,
+        depth__gt=0,
+        path__gte=roots[0].path,
+        path__lt=roots[-1].subtree_upper_bound,
+    ).annotate(
+        thread=thread,
+        position=Window(RowNumber(), partition_by=[thread], order_by=F('path').asc()),
+    ).filter(position__lte=replies_limit + 1).order_by('path')
+    roots_by_path = {root.path: root for root in roots}
+    for reply in replies:
+        root = roots_by_path[reply.thread]
+        if reply.position > replies_limit:
+            root.has_more_replies = True
+        else:
+            root.first_replies.append(reply)
+
+def _attachment_dicts(post):
+    """A post's attachments with their URLs as storage returns them (usually relative)."""
+    return [
+        {
+            'id': attachment.id,
+            'name': attachment.filename,
+            'type': attachment.file_type,
+            'url': attachment.file.url if attachment.file else None
+        } for attachment in post.attachments.all()
+    ]
+
+def _absolute_attachments(attachments, request):
+    """Make the relative URLs in ``attachments`` absolute for ``request``'s host and scheme."""
+    for attachment in attachments:
+        if attachment['url'] and not attachment['url'].startswith('http'):
+            attachment['url'] = request.build_absolute_uri(attachment['url'])
+    return attachments
+
+def _post_static_dict(post, comment_limit=DEFAULT_PAGE_SIZE):
+    """The part of a post's feed entry that is the same for every viewer and request."""
+    comment_page = post.comment_page[:comment_limit]
+    comments = [_comment_to_dict(comment) for comment in comment_page]
+    comments_next_cursor = None
+    if len(post.comment_page) > comment_limit:
+        last = comment_page[-1]
+        comments_next_cursor = encode_cursor(last.path, last.id)
+    
+    return {
+        'id': post.id,
+        'author_name': post.author_name,
+        'author_type': post.author_role,
+        'content': post.content,
+        'comments': comments,
+        'comments_next_cursor': comments_next_cursor,
+        'created_at': post.created_at.isoformat()
+    }
+
+def _post_viewer_dict(post, poll, user_profile):
+    """Likes, comment count and poll of a post as ``user_profile`` sees them."""
+    # Show the viewer their own likes still waiting in the write-behind buffer
+    is_liked, like_count = post.is_liked, post.like_count
+    pending_like = like_buffer.buffer.pending_like(post.id, user_profile.id)
+    if pending_like is not None and pending_like != is_liked:
+        like_count += 1 if pending_like else -1
+        is_liked = pending_like
+    
+    return {
+        'likes': like_count,
+        'comment_count': post.comment_count,
+        'is_liked': is_liked,
+        'poll': _poll_to_dict(poll, poll.tallied_options, poll.viewer_votes[0].option_id if poll.viewer_votes else None) if poll else None
+    }
+
+def _post_to_dict(post, request, comment_limit=DEFAULT_PAGE_SIZE):
+    """Serialize a post from ``_feed_posts_queryset`` for the feed."""
+    return {
+        **_post_static_dict(post, comment_limit),
+        'attachments': _absolute_attachments(_attachment_dicts(post), request),
+        **_post_viewer_dict(post, getattr(post, 'poll', None), request.user.profile),
+    }
+
+def _projected_posts(posts, request):
+    """Feed JSON for ``posts`` from ``_projected_posts_queryset``, one string per post.
+
+    Each post's PostProjection payload is reused as rendered, with the
+    viewer's likes, the comment count, the poll and the attachments (made
+    absolute for this request) spliced into the object, so a page of current
+    projections costs three queries (two more when it has polls) and no
+    per-post serialization. Missing or stale projections are rendered the
+    full way first and stored in one upsert.
+    """
+    user_profile = request.user.profile
+    posts_by_id = {post.id: post for post in posts}
+    payloads = {
+        post_id: (payload, attachments)
+        for post_id, version, payload, attachments in PostProjection.objects.filter(post_id__in=posts_by_id).values_list(
+            'post_id', 'version', 'payload', 'attachments'
+        )
+        if version == posts_by_id[post_id].render_version
+    }
+    stale = [post_id for post_id in posts_by_id if post_id not in payloads]
+    if stale:
+        rendered = [
+            # The version read with the rendered row; a change racing this
+            # render bumps past it and the next read renders again
+            PostProjection(post_id=post.id, version=post.render_version,
+                           payload=json.dumps(_post_static_dict(post)), attachments=_attachment_dicts(post))
+            for post in _rendered_posts_queryset().filter(id__in=stale)
+        ]
+        _bulk_upsert(PostProjection, rendered, ['post'], ['version', 'payload', 'attachments', 'rendered_at'])
+        payloads.update((projection.post_id, (projection.payload, projection.attachments)) for projection in rendered)
+    
+    polls = {
+        poll.post_id: poll
+        for poll in Poll.objects.filter(post_id__in=posts_by_id).prefetch_related(
+            Prefetch('options', queryset=_poll_options_queryset(), to_attr='tallied_options'),
+            Prefetch('votes', queryset=PollVote.objects.filter(voter=user_profile), to_attr='viewer_votes'),
+        )
+    }
+    fragments = []
+    for post in posts:
+        payload, attachments = payloads[post.id]
+        viewer = json.dumps({
+            'attachments': _absolute_attachments(attachments, request),
+            **_post_viewer_dict(post, polls.get(post.id), user_profile),
+        })
+        # Both are JSON objects: drop the closing brace of one and the
+        # opening brace of the other
+        fragments.append(payload[:-1] + ', ' + viewer[1:])
+    return fragments
+
+def _feed_response(posts_json, next_cursor):
+    """JSON response wrapping already serialized posts."""
+    return HttpResponse(
+        '{"success": true, "posts": [' + ', '.join(posts_json) + '], "next_cursor": ' + json.dumps(next_cursor) + '}',
+        content_type='application/json',
+    )
+
 @csrf_exempt
 @require_auth
 @require_http_methods(["PUT"])
@@ -157,10 +510,12 @@ def api_join_community(request, community_id):
             }, status=400)
         
         # Create membership
-        membership = CommunityMembership.objects.create(
-            community=community,
-            member=user_profile
-        )
+        with transaction.atomic():
+            membership = CommunityMembership.objects.create(
+                community=community,
+                member=user_profile
+            )
+            Community.objects.filter(pk=community.pk).update(member_count=F('member_count') + 1)
         
         return JsonResponse({
             'success': True,
@@ -203,7 +558,9 @@ def api_leave_community(request, community_id):
                 'message': 'Not a member of this community'
             }, status=400)
         
-        membership.delete()
+        with transaction.atomic():
+            membership.delete()
+            Community.objects.filter(pk=community.pk, member_count__gt=0).update(member_count=F('member_count') - 1)
         
         return JsonResponse({
             'success': True,
@@ -228,30 +585,96 @@ def api_user_communities(request):
     """API endpoint to get user's joined communities"""
     try:
         user_profile = request.user.profile
-        memberships = CommunityMembership.objects.filter(member=user_profile)
+        communities = _community_directory_queryset().annotate(
+            membership=FilteredRelation('members', condition=Q(members__member=user_profile))
+        ).filter(membership__isnull=False).annotate(
+            joined_at=F('membership__joined_at'),
+            membership_is_moderator=F('membership__is_moderator'),
+        ).order_by('-joined_at')
+        
+        # One grouped query over the (community, created_at) index for every badge
+        unread_counts = dict(
+            CommunityPost.objects.filter(
+                community__members__member=user_profile,
+                created_at__gt=Coalesce('community__members__last_seen_at', 'community__members__joined_at'),
+            ).exclude(author=user_profile).order_by().values_list('community_id').annotate(unread=Count('id'))
+        )
         
         communities_data = []
+        for community in communities:
+            community_data = _community_to_dict(community)
+            community_data['joined_at'] = community.joined_at.isoformat()
+            community_data['is_moderator'] = community.membership_is_moderator
+            community_data['unreadCount'] = unread_counts.get(community.id, 0)
+            communities_data.append(community_data)
+        
+        return JsonResponse({
+            'success': True,
+            'communities': communities_data
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_community_members(request, community_id):
+    """API endpoint to page through a community's members, newest first.
+
+    Accepts ``limit``, ``cursor`` and ``moderators=1`` to list moderators only.
+    Members of private communities are visible to other members only.
+    """
+    try:
+        community = Community.objects.get(id=community_id)
+        user_profile = request.user.profile
+        if community.is_private and not CommunityMembership.objects.filter(community=community, member=user_profile).exists():
+            return JsonResponse({
+                'success': False,
+                'message': 'Only members can view this community'
+            }, status=403)
+        
+        memberships = CommunityMembership.objects.filter(community=community).select_related('member__user')
+        if request.GET.get('moderators') in ('1', 'true'):
+            memberships = memberships.filter(is_moderator=True)
+        memberships, next_cursor = keyset_page(
+            memberships,
+            request.GET.get('cursor'),
+            page_size(request.GET.get('limit')),
+            field='joined_at',
+        )
+        
+        members_data = []
         for membership in memberships:
-            community = membership.community
-            communities_data.append({
-                'id': str(community.id),
-                'name': community.name,
-                'description': community.description,
-                'category': community.category,
-                'isPrivate': community.is_private,
-                'tags': community.tags,
-                'memberCount': community.member_count,
-                'lastActivity': community.last_activity.isoformat() if community.last_activity else None,
-                'moderators': [mod.user.username for mod in community.moderators.all()],
+            user = membership.member.user
+            members_data.append({
+                'id': membership.member.id,
+                'username': user.username,
+                'name': user.get_full_name() or user.username,
+                'role': membership.member.role,
                 'joined_at': membership.joined_at.isoformat(),
                 'is_moderator': membership.is_moderator
             })
         
         return JsonResponse({
             'success': True,
-            'communities': communities_data
+            'members': members_data,
+            'next_cursor': next_cursor
         })
         
+    except Community.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Community not found'
+        }, status=404)
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -262,58 +685,140 @@ def api_user_communities(request):
 @require_auth
 @require_http_methods(["GET"])
 def api_community_posts(request, community_id):
-    """API endpoint to get posts for a community"""
+    """API endpoint to get one page of posts for a community, newest first.
+
+    Accepts ``limit``, ``cursor`` (the ``next_cursor`` of the previous page)
+    and ``comments_limit`` for the number of comments embedded per post.
+    """
     try:
         community = Community.objects.get(id=community_id)
-        posts = CommunityPost.objects.filter(community=community)
+        user_profile = request.user.profile
+        limit = page_size(request.GET.get('limit'))
+        comment_limit = page_size(request.GET.get('comments_limit'))
+        # Projections hold the default page of comments; other sizes are
+        # rendered per request
+        projected = comment_limit == DEFAULT_PAGE_SIZE
+        posts, next_cursor = keyset_page(
+            (_projected_posts_queryset(user_profile) if projected else _feed_posts_queryset(user_profile, comment_limit))
+            .filter(community=community),
+            request.GET.get('cursor'),
+            limit,
+        )
         
-        posts_data = []
+        if projected:
+            posts_json = _projected_posts(posts, request)
+        else:
+            posts_json = [json.dumps(_post_to_dict(post, request, comment_limit)) for post in posts]
+        
+        if not request.GET.get('cursor'):
+            # Reading the newest page marks the community as read
+            CommunityMembership.objects.filter(community=community, member=user_profile).update(last_seen_at=timezone.now())
+        
+        return _feed_response(posts_json, next_cursor)
+        
+    except Community.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Community not found'
+        }, status=404)
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+def _home_feed_page(community_ids, cursor, limit):
+    """Return ``(post_ids, next_cursor)`` for the newest posts across communities.
+
+    Each community contributes at most ``limit + 1`` rows read from its
+    (community, -created_at, -id) index and the already sorted streams are
+    k-way merged, so no query ever sorts every post of every community.
+    The per-community reads are UNIONed HOME_FEED_UNION_SIZE at a time.
+    """
+    heads = [
+        keyset_filter(CommunityPost.objects.filter(community_id=community_id), cursor)
+        .order_by('-created_at', '-id')
+        .values_list('community_id', 'created_at', 'id')[:limit + 1]
+        for community_id in community_ids
+    ]
+    if len(heads) > 1 and connection.features.supports_slicing_ordering_in_compound:
+        # UNION ALL of the per-community index range scans, one round trip per
+        # HOME_FEED_UNION_SIZE communities
+        by_community = {}
+        for start in range(0, len(heads), HOME_FEED_UNION_SIZE):
+            first, *rest = heads[start:start + HOME_FEED_UNION_SIZE]
+            for community_id, created_at, post_id in first.union(*rest, all=True) if rest else first:
+                by_community.setdefault(community_id, []).append((created_at, post_id))
+        streams = [sorted(rows, reverse=True) for rows in by_community.values()]
+    else:
+        streams = [[(created_at, post_id) for _, created_at, post_id in head] for head in heads]
+
+    merged = list(islice(heapq.merge(*streams, reverse=True), limit + 1))
+    next_cursor = None
+    if len(merged) > limit:
+        merged = merged[:limit]
+        next_cursor = encode_cursor(*merged[-1])
+    return [post_id for _, post_id in merged], next_cursor
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_community_duplicate_posts(request, community_id):
+    """API endpoint for moderators to review posts flagged as near-duplicates.
+
+    Newest first with ``limit``/``cursor``; each post names the earliest post
+    of its group under ``duplicate_of`` so the client can group them. Only
+    groups within this community are listed: its moderators may not be
+    members of other communities the original was posted in.
+    """
+    try:
         user_profile = request.user.profile
+        community = Community.objects.get(id=community_id)
+        
+        is_moderator = CommunityMembership.objects.filter(
+            community=community, member=user_profile, is_moderator=True
+        ).exists() or community.moderators.filter(pk=user_profile.pk).exists()
+        if not is_moderator:
+            return JsonResponse({
+                'success': False,
+                'message': 'Only moderators can review flagged posts'
+            }, status=403)
+        
+        posts, next_cursor = keyset_page(
+            # duplicate_of__isnull matches the partial index's condition
+            CommunityPost.objects.filter(community=community, duplicate_of__isnull=False, duplicate_of__community=community)
+            .select_related('duplicate_of'),
+            request.GET.get('cursor'),
+            page_size(request.GET.get('limit')),
+        )
         
+        posts_data = []
         for post in posts:
-            # Check if user liked this post
-            is_liked = PostLike.objects.filter(post=post, user=user_profile).exists()
-            
-            # Get comments
-            comments = []
-            for comment in post.comments.all():
-                comments.append({
-                    'id': comment.id,
-                    'author_name': comment.author.user.get_full_name() or comment.author.user.username,
-                    'author_type': comment.author.role,
-                    'content': comment.content,
-                    'created_at': comment.created_at.isoformat()
-                })
-            
-            # Get attachments
-            attachments = []
-            for attachment in post.attachments.all():
-                attachment_url = attachment.file.url if attachment.file else None
-                if attachment_url and not attachment_url.startswith('http'):
-                    # Make URL absolute
-                    attachment_url = request.build_absolute_uri(attachment_url)
-                attachments.append({
-                    'id': attachment.id,
-                    'name': attachment.filename,
-                    'type': attachment.file_type,
-                    'url': attachment_url
-                })
-            
+            original = post.duplicate_of
             posts_data.append({
                 'id': post.id,
-                'author_name': post.author.user.get_full_name() or post.author.user.username,
-                'author_type': post.author.role,
+                'author_name': post.author_name,
                 'content': post.content,
-                'attachments': attachments,
-                'likes': post.like_count,
-                'comments': comments,
                 'created_at': post.created_at.isoformat(),
-                'is_liked': is_liked
+                'similarity': post.duplicate_score,
+                'duplicate_of': {
+                    'id': original.id,
+                    'community_id': original.community_id,
+                    'author_name': original.author_name,
+                    'content': original.content,
+                    'created_at': original.created_at.isoformat()
+                }
             })
         
         return JsonResponse({
             'success': True,
-            'posts': posts_data
+            'posts': posts_data,
+            'next_cursor': next_cursor
         })
         
     except Community.DoesNotExist:
@@ -321,6 +826,56 @@ def api_community_posts(request, community_id):
             'success': False,
             'message': 'Community not found'
         }, status=404)
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_home_feed(request):
+    """API endpoint to get one page of the newest posts across the user's communities.
+
+    Accepts the same ``limit``, ``cursor`` and ``comments_limit`` parameters
+    as api_community_posts.
+    """
+    try:
+        user_profile = request.user.profile
+        limit = page_size(request.GET.get('limit'))
+        comment_limit = page_size(request.GET.get('comments_limit'))
+        community_ids = list(
+            CommunityMembership.objects.filter(member=user_profile).values_list('community_id', flat=True)
+        )
+        post_ids, next_cursor = _home_feed_page(community_ids, request.GET.get('cursor'), limit)
+        
+        communities = dict(Community.objects.filter(id__in=community_ids).values_list('id', 'name'))
+        if comment_limit == DEFAULT_PAGE_SIZE:
+            posts_by_id = _projected_posts_queryset(user_profile).in_bulk(post_ids)
+            posts = [posts_by_id[post_id] for post_id in post_ids]
+            posts_json = _projected_posts(posts, request)
+        else:
+            posts_by_id = _feed_posts_queryset(user_profile, comment_limit).in_bulk(post_ids)
+            posts = [posts_by_id[post_id] for post_id in post_ids]
+            posts_json = [json.dumps(_post_to_dict(post, request, comment_limit)) for post in posts]
+        posts_json = [
+            post_json[:-1] + ', "community": ' + json.dumps({'id': str(post.community_id), 'name': communities[post.community_id]}) + '}'
+            for post, post_json in zip(posts, posts_json)
+        ]
+        
+        return _feed_response(posts_json, next_cursor)
+        
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -352,28 +907,65 @@ def api_create_post(request, community_id):
         content_type = request.META.get('CONTENT_TYPE', '') or ''
         if content_type.startswith('multipart/form-data'):
             content = request.POST.get('content', '')
+            poll_data = request.POST.get('poll')
         else:
             try:
                 data = json.loads(request.body or '{}')
             except json.JSONDecodeError:
                 return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
             content = data.get('content', '')
+            poll_data = data.get('poll')
         
-        post = CommunityPost.objects.create(
-            community=community,
-            author=user_profile,
-            content=content
-        )
+        poll = None
+        if poll_data:
+            try:
+                poll = _parse_poll(poll_data)
+            except ValueError as e:
+                return JsonResponse({'success': False, 'message': str(e)}, status=400)
+        
+        # Flag near-duplicates of recent posts for moderators, grouped under
+        # the earliest post of the group
+        duplicate_of, duplicate_score = None, None
+        for match_id, similarity in duplicates.index.find(content, community.id):
+            match = CommunityPost.objects.filter(pk=match_id).values_list('duplicate_of_id', flat=True)
+            if match:
+                duplicate_of, duplicate_score = match[0] or match_id, similarity
+                break
+        
+        # Attachments (FormData path) are written before the post exists,
+        # so it is never visible without them
+        files = request.FILES.getlist('attachments')
+        stored_names = _store_attachments(files) if files else []
         
-        # Handle file attachments if provided (FormData path)
-        if request.FILES:
-            for file in request.FILES.getlist('attachments'):
-                PostAttachment.objects.create(
-                    post=post,
-                    file=file,
-                    filename=file.name,
-                    file_type=getattr(file, 'content_type', '')
+        try:
+            with transaction.atomic():
+                post = CommunityPost.objects.create(
+                    community=community,
+                    author=user_profile,
+                    author_name=user_profile.display_name,
+                    author_role=user_profile.role,
+                    content=content,
+                    trending_score=trending.event_score('post'),
+                    duplicate_of_id=duplicate_of,
+                    duplicate_score=duplicate_score
+                )
+                Community.objects.filter(pk=community.pk).update(
+                    last_activity_at=post.created_at,
+                    trending_score=trending.bumped('post', post.created_at),
                 )
+                _sync_post_hashtags(post)
+                if poll:
+                    poll = _create_poll(post, *poll)
+                attachments = PostAttachment.objects.bulk_create([
+                    PostAttachment(post=post, file=name, filename=file.name, file_type=getattr(file, 'content_type', ''))
+                    for file, name in zip(files, stored_names)
+                ])
+                if attachments and not connection.features.can_return_rows_from_bulk_insert:
+                    # Backends such as MySQL don't report the new ids
+                    attachments = list(post.attachments.order_by('id'))
+        except Exception:
+            _delete_attachment_files(stored_names)
+            raise
         
         return JsonResponse({
             'success': True,
@@ -382,13 +974,14 @@ def api_create_post(request, community_id):
                 'id': post.id,
                 'content': post.content,
                 'created_at': post.created_at.isoformat(),
+                'poll': _poll_to_dict(poll, list(_poll_options_queryset().filter(poll=poll))) if poll else None,
                 'attachments': [
                     {
                         'id': att.id,
                         'name': att.filename,
                         'type': att.file_type,
                         'url': att.file.url if att.file else None
-                    } for att in post.attachments.all()
+                    } for att in attachments
                 ]
             }
         })
@@ -429,7 +1022,10 @@ def api_update_post(request, post_id):
             content = data.get('content', '')
         
         post.content = content
-        post.save()
+        with transaction.atomic():
+            # Leave the denormalized counters to their F() updates
+            post.save(update_fields=['content', 'updated_at'])
+            _sync_post_hashtags(post)
         
         return JsonResponse({
             'success': True,
@@ -486,21 +1082,34 @@ def api_delete_post(request, post_id):
 @require_auth
 @require_http_methods(["POST"])
 def api_like_post(request, post_id):
-    """API endpoint to like a post"""
+    """API endpoint to like a post.
+
+    In write-behind mode (settings.LIKE_WRITE_BEHIND) the like is buffered
+    and liking an already liked post is a no-op rather than an error.
+    """
     try:
         user_profile = request.user.profile
         post = CommunityPost.objects.get(id=post_id)
         
-        # Check if already liked
-        if PostLike.objects.filter(post=post, user=user_profile).exists():
+        if like_buffer.enabled():
+            like_buffer.buffer.record(post.id, user_profile.id, liked=True)
             return JsonResponse({
-                'success': False,
-                'message': 'Post already liked'
-            }, status=400)
+                'success': True,
+                'message': 'Post liked successfully'
+            })
         
-        PostLike.objects.create(post=post, user=user_profile)
-        post.like_count += 1
-        post.save()
+        with transaction.atomic():
+            like, created = PostLike.objects.get_or_create(post=post, user=user_profile)
+            if not created:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Post already liked'
+                }, status=400)
+            CommunityPost.objects.filter(pk=post.pk).update(
+                like_count=F('like_count') + 1,
+                trending_score=trending.bumped('like', like.created_at),
+            )
+            Community.objects.filter(pk=post.community_id).update(trending_score=trending.bumped('like', like.created_at))
         
         return JsonResponse({
             'success': True,
@@ -522,22 +1131,33 @@ def api_like_post(request, post_id):
 @require_auth
 @require_http_methods(["DELETE"])
 def api_unlike_post(request, post_id):
-    """API endpoint to unlike a post"""
+    """API endpoint to unlike a post (buffered like api_like_post in write-behind mode)"""
     try:
         user_profile = request.user.profile
         post = CommunityPost.objects.get(id=post_id)
         
-        # Check if liked
-        like = PostLike.objects.filter(post=post, user=user_profile).first()
-        if not like:
+        if like_buffer.enabled():
+            like_buffer.buffer.record(post.id, user_profile.id, liked=False)
             return JsonResponse({
-                'success': False,
-                'message': 'Post not liked'
-            }, status=400)
+                'success': True,
+                'message': 'Post unliked successfully'
+            })
         
-        like.delete()
-        post.like_count -= 1
-        post.save()
+        with transaction.atomic():
+            like = PostLike.objects.filter(post=post, user=user_profile).first()
+            deleted, _ = PostLike.objects.filter(pk=like.pk).delete() if like else (0, None)
+            if not deleted:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Post not liked'
+                }, status=400)
+            # Take back exactly what the like contributed, so like/unlike
+            # cycles cannot pump a post up the trending list
+            CommunityPost.objects.filter(pk=post.pk, like_count__gt=0).update(
+                like_count=F('like_count') - 1,
+                trending_score=trending.retracted('like', like.created_at),
+            )
+            Community.objects.filter(pk=post.community_id).update(trending_score=trending.retracted('like', like.created_at))
         
         return JsonResponse({
             'success': True,
@@ -555,6 +1175,100 @@ def api_unlike_post(request, post_id):
             'message': str(e)
         }, status=500)
 
+def _visible_poll(request, post_id):
+    """The poll on ``post_id`` if the user may see it, else a JsonResponse error."""
+    poll = Poll.objects.select_related('post__community').filter(post_id=post_id).first()
+    if not poll:
+        return None, JsonResponse({
+            'success': False,
+            'message': 'Poll not found'
+        }, status=404)
+    community = poll.post.community
+    if community.is_private and not CommunityMembership.objects.filter(community=community, member=request.user.profile).exists():
+        return None, JsonResponse({
+            'success': False,
+            'message': 'You must be a member of this community to see this poll'
+        }, status=403)
+    return poll, None
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_poll(request, post_id):
+    """API endpoint for a post's poll with its current tallies"""
+    try:
+        poll, error = _visible_poll(request, post_id)
+        if error:
+            return error
+        
+        return JsonResponse({
+            'success': True,
+            'poll': _poll_to_dict(
+                poll,
+                list(_poll_options_queryset().filter(poll=poll)),
+                poll.votes.filter(voter=request.user.profile).values_list('option_id', flat=True).first(),
+            )
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["POST"])
+def api_vote_poll(request, post_id):
+    """API endpoint to vote in a post's poll.
+
+    The unique (poll, voter) index rejects a second vote; the tally goes to a
+    random counter shard of the chosen option so concurrent votes rarely
+    touch the same row.
+    """
+    try:
+        data = json.loads(request.body)
+        user_profile = request.user.profile
+        poll, error = _visible_poll(request, post_id)
+        if error:
+            return error
+        
+        option = PollOption.objects.filter(poll=poll, id=data.get('option_id')).first()
+        if not option:
+            return JsonResponse({
+                'success': False,
+                'message': 'Option not found'
+            }, status=400)
+        
+        try:
+            with transaction.atomic():
+                PollVote.objects.create(poll=poll, option=option, voter=user_profile)
+                PollOptionCounter.objects.filter(
+                    option=option, shard=random.randrange(poll.counter_shards)
+                ).update(votes=F('votes') + 1)
+        except IntegrityError:
+            return JsonResponse({
+                'success': False,
+                'message': 'You have already voted in this poll'
+            }, status=400)
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Vote recorded',
+            'poll': _poll_to_dict(poll, list(_poll_options_queryset().filter(poll=poll)), option.id)
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid JSON data'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
 @csrf_exempt
 @require_auth
 @require_http_methods(["POST"])
@@ -565,17 +1279,46 @@ def api_add_comment(request, post_id):
         user_profile = request.user.profile
         post = CommunityPost.objects.get(id=post_id)
         
-        comment = PostComment.objects.create(
-            post=post,
-            author=user_profile,
-            content=data.get('content', '')
-        )
+        # Optional parent_id makes this a reply within the parent's thread
+        parent = None
+        if data.get('parent_id'):
+            parent = PostComment.objects.filter(id=data.get('parent_id'), post=post).first()
+            if not parent:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Parent comment not found'
+                }, status=404)
+            if parent.depth >= PostComment.MAX_DEPTH:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Replies cannot be nested any deeper'
+                }, status=400)
+        
+        with transaction.atomic():
+            comment = PostComment.objects.create(
+                post=post,
+                author=user_profile,
+                author_name=user_profile.display_name,
+                author_role=user_profile.role,
+                parent=parent,
+                depth=parent.depth + 1 if parent else 0,
+                content=data.get('content', '')
+            )
+            comment.path = (parent.path if parent else '') + PostComment.path_segment(comment.pk)
+            comment.save(update_fields=['path'])
+            CommunityPost.objects.filter(pk=post.pk).update(
+                comment_count=F('comment_count') + 1,
+                trending_score=trending.bumped('comment', comment.created_at),
+            )
+            Community.objects.filter(pk=post.community_id).update(trending_score=trending.bumped('comment', comment.created_at))
         
         return JsonResponse({
             'success': True,
             'message': 'Comment added successfully',
             'comment': {
                 'id': comment.id,
+                'parent_id': comment.parent_id,
+                'depth': comment.depth,
                 'content': comment.content,
                 'created_at': comment.created_at.isoformat()
             }
@@ -597,6 +1340,71 @@ def api_add_comment(request, post_id):
             'message': str(e)
         }, status=500)
 
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_post_comments(request, post_id):
+    """API endpoint to page through a post's comments in thread order.
+
+    Without ``root`` it pages top-level comments, each with its first
+    ``replies_limit`` replies (default 3). With ``root=<comment id>`` it pages
+    that comment's whole thread depth-first, as one path range scan.
+    """
+    try:
+        post = CommunityPost.objects.get(id=post_id)
+        comments = PostComment.objects.filter(post=post)
+        root = None
+        if request.GET.get('root'):
+            root = PostComment.objects.get(id=request.GET.get('root'), post=post)
+            comments = comments.filter(path__gte=root.path, path__lt=root.subtree_upper_bound)
+        else:
+            comments = comments.filter(depth=0)
+        comments, next_cursor = keyset_page(
+            comments,
+            request.GET.get('cursor'),
+            page_size(request.GET.get('limit')),
+            field='path',
+            descending=False,
+        )
+        
+        if root:
+            comments_data = [_comment_to_dict(comment) for comment in comments]
+        else:
+            _attach_first_replies(post, comments, page_size(request.GET.get('replies_limit'), default=3))
+            comments_data = []
+            for comment in comments:
+                comment_data = _comment_to_dict(comment)
+                comment_data['replies'] = [_comment_to_dict(reply) for reply in comment.first_replies]
+                comment_data['has_more_replies'] = comment.has_more_replies
+                comments_data.append(comment_data)
+        
+        return JsonResponse({
+            'success': True,
+            'comments': comments_data,
+            'next_cursor': next_cursor
+        })
+        
+    except CommunityPost.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Post not found'
+        }, status=404)
+    except PostComment.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Comment not found'
+        }, status=404)
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
 @csrf_exempt
 @require_auth
 @require_http_methods(["POST"])
@@ -749,73 +1557,186 @@ def api_study_applicants(request, study_id):
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=500)
 
+# Participation status each applicant action moves to ('enroll' waitlists once the study is full)
+APPLICANT_ACTIONS = {'approve': 'screening', 'reject': 'rejected', 'enroll': 'enrolled', 'withdraw': 'withdrawn'}
+# Patient notifications (ContactRequests) sent when an applicant moves to these statuses
+APPLICANT_NOTIFICATIONS = {
+    'screening': "🎉 Congratulations! You have been accepted for screening in the clinical trial '{title}'. The research team will contact you soon for next steps.",
+    'enrolled': "🎉 Congratulations! You have been officially enrolled in the clinical trial '{title}'. Welcome to the study!",
+    'waitlisted': "You have been accepted for the clinical trial '{title}', which is currently full. You are on its waitlist and will be enrolled automatically as soon as a place opens up.",
+}
+MAX_BULK_APPLICANTS = 1000
+
+def _locked_participations():
+    """Participations with their study, row-locked until the transaction ends."""
+    # Backends without FOR UPDATE OF (MariaDB) lock the joined study rows too
+    of = ('self',) if connection.features.has_select_for_update_of else ()
+    return StudyParticipation.objects.select_for_update(of=of).select_related('study')
+
+def _claim_enrollment_slots(study_id, wanted):
+    """Take up to ``wanted`` free places of a study and return how many were taken.
+
+    The capacity check and the increment are a single conditional UPDATE, so
+    two concurrent enrollments can never both take the last place. Only a
+    batch that doesn't fit entirely locks the study row to split what is left.
+    The check only adds to the UNSIGNED columns: MySQL rejects a negative
+    ``estimated_enrollment - wanted`` outright. A study whose
+    ``estimated_enrollment`` is 0 (no estimate given) has no cap.
+    """
+    if ResearchStudy.objects.filter(
+        Q(estimated_enrollment=0) | Q(estimated_enrollment__gte=F('current_enrollment') + wanted), id=study_id
+    ).update(current_enrollment=F('current_enrollment') + wanted):
+        return wanted
+    if wanted == 1:
+        return 0
+    enrolled, capacity = ResearchStudy.objects.select_for_update().values_list(
+        'current_enrollment', 'estimated_enrollment'
+    ).get(id=study_id)
+    taken = max(min(wanted, capacity - enrolled), 0)
+    if taken:
+        ResearchStudy.objects.filter(id=study_id).update(current_enrollment=F('current_enrollment') + taken)
+    return taken
+
+def _promote_waitlisted(study_ids):
+    """Enroll the longest-waiting waitlisted participations into the free places of ``study_ids``.
+
+    Must be called inside a transaction; returns the promoted participations.
+    """
+    promoted = []
+    now = timezone.now()
+    for study_id in study_ids:
+        enrolled, capacity = ResearchStudy.objects.select_for_update().values_list(
+            'current_enrollment', 'estimated_enrollment'
+        ).get(id=study_id)
+        if capacity and enrolled >= capacity:
+            continue
+        waiting = _locked_participations().filter(study_id=study_id, status='waitlisted').order_by('waitlisted_at', 'id')
+        if capacity:
+            waiting = waiting[:capacity - enrolled]
+        waiting = list(waiting)
+        if waiting:
+            promoted += waiting[:_claim_enrollment_slots(study_id, len(waiting))]
+    if promoted:
+        StudyParticipation.objects.filter(id__in=[p.id for p in promoted]).update(status='enrolled', enrolled_date=now)
+        for participation in promoted:
+            participation.status = 'enrolled'
+            participation.enrolled_date = now
+    return promoted
+
+def _transition_applicants(researcher, participations, action, notes=None):
+    """Apply ``action`` to ``participations`` from ``_locked_participations``.
+
+    Enrolling takes places with ``_claim_enrollment_slots`` (one conditional
+    UPDATE per study) and waitlists whoever doesn't fit; any other action on
+    an enrolled participant frees their place and promotes the head of the
+    study's waitlist. Otherwise runs a fixed number of queries however many
+    participations there are. Must be called inside a transaction; the
+    instances are updated to match and the promoted participations returned.
+    """
+    status = APPLICANT_ACTIONS[action]
+    now = timezone.now()
+    changes = {'status': status}
+    if notes is not None:
+        changes['notes'] = notes
+
+    waitlisted = []
+    if action == 'enroll':
+        # Whoever was waitlisted first gets a free place first
+        pending = sorted(
+            (p for p in participations if p.status != 'enrolled'),
+            key=lambda p: (p.status != 'waitlisted', p.waitlisted_at or now),
+        )
+        by_study = {}
+        for participation in pending:
+            by_study.setdefault(participation.study_id, []).append(participation)
+        for study_id, candidates in by_study.items():
+            granted = _claim_enrollment_slots(study_id, len(candidates))
+            for participation in candidates[:granted]:
+                participation.enrolled_date = now
+            waitlisted += candidates[granted:]
+
+    waitlisted_ids = {p.id for p in waitlisted}
+    released = Counter()
+    for participation in participations:
+        if action != 'enroll' and participation.status == 'enrolled':
+            released[participation.study_id] += 1
+        if participation.id in waitlisted_ids:
+            # Already waitlisted participations keep their place in the queue
+            if participation.status != 'waitlisted':
+                participation.waitlisted_at = now
+            participation.status = 'waitlisted'
+        else:
+            participation.status = status
+        if notes is not None:
+            participation.notes = notes
+
+    if action == 'enroll':
+        # Keep the original date of anyone already enrolled
+        changes['enrolled_date'] = Case(When(status='enrolled', then=F('enrolled_date')), default=Value(now))
+    StudyParticipation.objects.filter(
+        id__in=[p.id for p in participations if p.id not in waitlisted_ids]
+    ).update(**changes)
+    if waitlisted:
+        queued = {'status': 'waitlisted', 'waitlisted_at': Case(When(status='waitlisted', then=F('waitlisted_at')), default=Value(now))}
+        if notes is not None:
+            queued['notes'] = notes
+        StudyParticipation.objects.filter(id__in=waitlisted_ids).update(**queued)
+
+    promoted = []
+    if released:
+        # Floored at zero inside the CASE: MySQL evaluates a subtraction
+        # going below zero on the UNSIGNED column before GREATEST could clamp it
+        ResearchStudy.objects.filter(id__in=released).update(current_enrollment=Case(
+            *(When(id=study_id, current_enrollment__gte=count, then=F('current_enrollment') - count)
+              for study_id, count in released.items()),
+            default=Value(0),
+        ))
+        promoted = _promote_waitlisted(sorted(released))
+
+    # One notification per patient, even with several of their applications in the batch
+    notifications = {
+        participation.patient_id: ContactRequest(
+            researcher=researcher,
+            patient_id=participation.patient_id,
+            status='accepted',
+            message=APPLICANT_NOTIFICATIONS[participation.status].format(title=participation.study.title),
+        )
+        for participation in participations + promoted
+        if participation.status in APPLICANT_NOTIFICATIONS
+    }
+    if notifications:
+        _bulk_upsert(ContactRequest, list(notifications.values()), ['researcher', 'patient'], ['message', 'status', 'updated_at'])
+    return promoted
+
 @csrf_exempt
 @require_auth
 @require_http_methods(["POST"])
 def api_update_applicant_status(request, participation_id):
-    """Update applicant/participant status: approve (screening), reject, enroll, withdraw. Researcher must own the study."""
+    """Update applicant/participant status: approve (screening), reject, enroll (or waitlist when full), withdraw. Researcher must own the study."""
     try:
         data = json.loads(request.body)
         action = data.get('action')  # approve|reject|enroll|withdraw
-        if action not in ['approve', 'reject', 'enroll', 'withdraw']:
+        if action not in APPLICANT_ACTIONS:
             return JsonResponse({'success': False, 'message': 'Invalid action'}, status=400)
+        notes = data.get('notes') or '' if 'notes' in data else None
 
         profile = request.user.profile
         if profile.role != 'researcher':
             return JsonResponse({'success': False, 'message': 'Only researchers can manage applicants'}, status=403)
 
-        participation = StudyParticipation.objects.select_related('study').get(id=participation_id)
-        if participation.study.created_by != profile:
-            return JsonResponse({'success': False, 'message': 'Not authorized for this study'}, status=403)
+        with transaction.atomic():
+            participation = _locked_participations().get(id=participation_id)
+            if participation.study.created_by_id != profile.id:
+                return JsonResponse({'success': False, 'message': 'Not authorized for this study'}, status=403)
+            promoted = _transition_applicants(profile, [participation], action, notes)
 
-        # Transition
-        if action == 'approve':
-            participation.status = 'screening'
-            try:
-                # Notify patient: approved for screening
-                cr, created = ContactRequest.objects.get_or_create(
-                    researcher=profile,
-                    patient=participation.patient,
-                    defaults={'message': f"🎉 Congratulations! You have been accepted for screening in the clinical trial '{participation.study.title}'. The research team will contact you soon for next steps."}
-                )
-                cr.status = 'accepted'
-                if not created:
-                    cr.message = f"🎉 Congratulations! You have been accepted for screening in the clinical trial '{participation.study.title}'. The research team will contact you soon for next steps."
-                cr.save()
-            except Exception:
-                pass
-        elif action == 'reject':
-            participation.status = 'rejected'
-        elif action == 'enroll':
-            if participation.status != 'enrolled':
-                participation.status = 'enrolled'
-                participation.enrolled_date = datetime.utcnow()
-                participation.study.current_enrollment = (participation.study.current_enrollment or 0) + 1
-                participation.study.save()
-            try:
-                # Notify patient: enrolled
-                cr, created = ContactRequest.objects.get_or_create(
-                    researcher=profile,
-                    patient=participation.patient,
-                    defaults={'message': f"🎉 Congratulations! You have been officially enrolled in the clinical trial '{participation.study.title}'. Welcome to the study!"}
-                )
-                cr.status = 'accepted'
-                if not created:
-                    cr.message = f"🎉 Congratulations! You have been officially enrolled in the clinical trial '{participation.study.title}'. Welcome to the study!"
-                cr.save()
-            except Exception:
-                pass
-        elif action == 'withdraw':
-            if participation.status == 'enrolled' and participation.study.current_enrollment > 0:
-                participation.study.current_enrollment -= 1
-                participation.study.save()
-            participation.status = 'withdrawn'
-
-        if 'notes' in data:
-            participation.notes = data.get('notes') or ''
-
-        participation.save()
-        return JsonResponse({'success': True, 'message': 'Status updated', 'status': participation.status})
+        return JsonResponse({
+            'success': True,
+            'message': 'Status updated',
+            'status': participation.status,
+            # Waitlisted participations enrolled into the place this one freed
+            'promoted': [p.id for p in promoted]
+        })
     except StudyParticipation.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Participation not found'}, status=404)
     except json.JSONDecodeError:
@@ -823,6 +1744,56 @@ def api_update_applicant_status(request, participation_id):
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=500)
 
+@csrf_exempt
+@require_auth
+@require_http_methods(["POST"])
+def api_bulk_update_applicant_status(request):
+    """Apply one action to up to MAX_BULK_APPLICANTS participations in one transaction.
+
+    Takes ``action``, ``participation_ids`` and optional ``notes``. Every
+    participation must belong to one of the researcher's studies, otherwise
+    nothing is changed.
+    """
+    try:
+        data = json.loads(request.body)
+        action = data.get('action')
+        if action not in APPLICANT_ACTIONS:
+            return JsonResponse({'success': False, 'message': 'Invalid action'}, status=400)
+        notes = data.get('notes') or '' if 'notes' in data else None
+        participation_ids = data.get('participation_ids')
+        if (not isinstance(participation_ids, list) or not participation_ids
+                or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in participation_ids)):
+            return JsonResponse({'success': False, 'message': 'participation_ids must be a non-empty list of ids'}, status=400)
+        participation_ids = set(participation_ids)
+        if len(participation_ids) > MAX_BULK_APPLICANTS:
+            return JsonResponse({
+                'success': False,
+                'message': f'At most {MAX_BULK_APPLICANTS} participations per request'
+            }, status=400)
+
+        profile = request.user.profile
+        if profile.role != 'researcher':
+            return JsonResponse({'success': False, 'message': 'Only researchers can manage applicants'}, status=403)
+
+        with transaction.atomic():
+            participations = list(
+                _locked_participations().filter(id__in=participation_ids, study__created_by=profile).order_by('id')
+            )
+            if len(participations) != len(participation_ids):
+                return JsonResponse({'success': False, 'message': 'Participation not found or not authorized'}, status=404)
+            promoted = _transition_applicants(profile, participations, action, notes)
+
+        return JsonResponse({
+            'success': True,
+            'message': f'Updated {len(participations)} participations',
+            'participations': [{'id': p.id, 'status': p.status} for p in participations],
+            'promoted': [p.id for p in promoted]
+        })
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
 @csrf_exempt
 @require_auth
 @require_http_methods(["GET", "POST"])
@@ -1017,19 +1988,14 @@ def api_user_studies(request):
         profile = request.user.profile
         
         if profile.role == 'researcher':
-            # Get studies created by the researcher
-            studies = ResearchStudy.objects.filter(created_by=profile)
+            # Get studies created by the researcher with live counts of
+            # accepted participants (screening or enrolled) in the same query
+            studies = ResearchStudy.objects.filter(created_by=profile).defer(*STUDY_DETAIL_FIELDS).annotate(
+                accepted_count=Count('participants', filter=Q(participants__status__in=['screening', 'enrolled'])),
+            )
             studies_data = []
             
             for study in studies:
-                # Live counts: accepted participants (screening or enrolled)
-                try:
-                    accepted_count = StudyParticipation.objects.filter(
-                        study=study, status__in=['screening', 'enrolled']
-                    ).count()
-                except Exception:
-                    accepted_count = study.current_enrollment or 0
-
                 studies_data.append({
                     'id': str(study.id),
                     'title': study.title,
@@ -1039,7 +2005,7 @@ def api_user_studies(request):
                     'location': study.location,
                     'status': study.status,
                     'estimatedEnrollment': study.estimated_enrollment,
-                    'currentEnrollment': accepted_count,
+                    'currentEnrollment': study.accepted_count,
                     'startDate': study.start_date.isoformat(),
                     'created_at': study.created_at.isoformat()
                 })
@@ -1051,7 +2017,9 @@ def api_user_studies(request):
             
         elif profile.role == 'patient':
             # Get studies the patient has applied to
-            participations = StudyParticipation.objects.filter(patient=profile)
+            participations = StudyParticipation.objects.filter(patient=profile).select_related('study').defer(
+                'notes', *(f'study__{field}' for field in STUDY_DETAIL_FIELDS)
+            )
             studies_data = []
             
             for participation in participations:
@@ -1794,21 +2762,25 @@ def api_create_community(request):
     try:
         data = json.loads(request.body)
         
-        community = Community.objects.create(
-            name=data.get('name'),
-            description=data.get('description'),
-            category=data.get('category', 'General'),
-            is_private=data.get('isPrivate', False),
-            tags=data.get('tags', []),
-            created_by=request.user.profile
-        )
-        
-        # Automatically add the creator as a member
-        CommunityMembership.objects.create(
-            community=community,
-            member=request.user.profile,
-            is_moderator=True
-        )
+        with transaction.atomic():
+            community = Community.objects.create(
+                name=data.get('name'),
+                description=data.get('description'),
+                category=data.get('category', 'General'),
+                is_private=data.get('isPrivate', False),
+                tags=data.get('tags', []),
+                created_by=request.user.profile,
+                member_count=1,
+                trending_score=trending.event_score('community')
+            )
+            _link_community_tags(community)
+            
+            # Automatically add the creator as a member
+            CommunityMembership.objects.create(
+                community=community,
+                member=request.user.profile,
+                is_moderator=True
+            )
         
         return JsonResponse({
             'success': True,
@@ -1967,23 +2939,52 @@ def api_create_appointment(request):
 @csrf_exempt
 @require_http_methods(["GET"])
 def api_communities(request):
-    """API endpoint to get all communities"""
+    """API endpoint to get all communities.
+
+    ``?tag=x`` or ``?tags=a,b`` keeps communities carrying every listed tag
+    (joined through the CommunityTag index); ``?sort=active`` lists the most
+    recently active first.
+    """
     try:
-        communities = Community.objects.all()
-        communities_data = []
+        communities = _community_directory_queryset()
+        tag_names = _normalize_tags(request.GET.get('tags', '').split(',') + [request.GET.get('tag', '')])
+        for name in tag_names:
+            communities = communities.filter(tag_links__tag__name=name)
+        if request.GET.get('sort') == 'active':
+            communities = communities.order_by('-last_activity_at')
+        communities_data = [_community_to_dict(community) for community in communities]
         
-        for community in communities:
-            communities_data.append({
-                'id': str(community.id),
-                'name': community.name,
-                'description': community.description,
-                'category': community.category,
-                'isPrivate': community.is_private,
-                'tags': community.tags,
-                'memberCount': community.member_count,
-                'lastActivity': community.last_activity.isoformat() if community.last_activity else None,
-                'moderators': [mod.user.username for mod in community.moderators.all()]
-            })
+        return JsonResponse({
+            'success': True,
+            'communities': communities_data
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_suggested_communities(request):
+    """API endpoint for communities suggested to the user.
+
+    Ranked from precomputed co-membership similarity plus a boost for
+    communities matching the patient's cancer type; see recommendations.py.
+    """
+    try:
+        limit = page_size(request.GET.get('limit'), default=10, maximum=recommendations.MAX_SUGGESTIONS)
+        suggestions = recommendations.suggested_communities(request.user.profile)[:limit]
+        communities = _community_directory_queryset().in_bulk([community_id for community_id, _ in suggestions])
+        
+        communities_data = []
+        for community_id, score in suggestions:
+            if community_id in communities:
+                community_data = _community_to_dict(communities[community_id])
+                community_data['score'] = score
+                communities_data.append(community_data)
         
         return JsonResponse({
             'success': True,
@@ -1996,25 +2997,34 @@ def api_communities(request):
             'message': str(e)
         }, status=500)
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_community_tags(request):
+    """API endpoint for the community tag cloud, most used tags first"""
+    try:
+        limit = page_size(request.GET.get('limit'), default=50)
+        tags = Tag.objects.filter(community_count__gt=0)[:limit]
+        
+        return JsonResponse({
+            'success': True,
+            'tags': [{'name': tag.name, 'count': tag.community_count} for tag in tags]
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def api_community_detail(request, community_id):
     """API endpoint to get community details"""
     try:
-        community = Community.objects.get(id=community_id)
+        community = _community_directory_queryset().get(id=community_id)
         
-        community_data = {
-            'id': str(community.id),
-            'name': community.name,
-            'description': community.description,
-            'category': community.category,
-            'isPrivate': community.is_private,
-            'tags': community.tags,
-            'memberCount': community.member_count,
-            'lastActivity': community.last_activity.isoformat() if community.last_activity else None,
-            'moderators': [mod.user.username for mod in community.moderators.all()],
-            'created_at': community.created_at.isoformat()
-        }
+        community_data = _community_to_dict(community)
+        community_data['created_at'] = community.created_at.isoformat()
         
         return JsonResponse({
             'success': True,
@@ -2032,43 +3042,89 @@ def api_community_detail(request, community_id):
             'message': str(e)
         }, status=500)
 
+# Catalog ``sort`` values: (keyset field, descending)
+STUDY_SORTS = {
+    'newest': ('created_at', True),
+    'oldest': ('created_at', False),
+    'start_date': ('start_date', False),
+    'completion_date': ('estimated_completion_date', False),
+}
+# Long free text left out of catalog rows; api_study_detail returns it
+STUDY_DETAIL_FIELDS = ('eligibility_criteria', 'primary_endpoint')
+
+def _study_to_dict(study, detail=True):
+    """Serialize a study; catalog rows (``detail=False``) omit STUDY_DETAIL_FIELDS."""
+    study_data = {
+        'id': str(study.id),
+        'title': study.title,
+        'description': study.description,
+        'phase': study.phase,
+        'status': study.status,
+        'sponsor': study.sponsor,
+        'location': study.location,
+        'estimatedEnrollment': study.estimated_enrollment,
+        'currentEnrollment': study.current_enrollment,
+        'startDate': study.start_date.isoformat() if study.start_date else None,
+        'estimatedCompletionDate': study.estimated_completion_date.isoformat() if study.estimated_completion_date else None,
+        'contactInfo': {
+            'name': study.contact_name,
+            'email': study.contact_email,
+            'phone': study.contact_phone,
+        },
+        'compensation': study.compensation,
+        'created_at': study.created_at.isoformat()
+    }
+    if detail:
+        study_data['eligibilityCriteria'] = study.eligibility_criteria
+        study_data['primaryEndpoint'] = study.primary_endpoint
+    return study_data
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def api_studies(request):
-    """API endpoint to get all research studies"""
+    """API endpoint to get one page of the research study catalog.
+
+    Filters on ``status``, ``phase`` (exact) and ``location`` (substring),
+    orders by ``sort`` (one of STUDY_SORTS, newest first by default) and
+    pages with ``limit`` and ``cursor``. Rows leave out STUDY_DETAIL_FIELDS.
+    """
     try:
-        studies = ResearchStudy.objects.all()
-        studies_data = []
+        studies = ResearchStudy.objects.defer(*STUDY_DETAIL_FIELDS)
+        
+        status = request.GET.get('status', '').strip()
+        if status:
+            if status not in dict(ResearchStudy.STATUS_CHOICES):
+                return JsonResponse({'success': False, 'message': 'Invalid status'}, status=400)
+            studies = studies.filter(status=status)
+        phase = request.GET.get('phase', '').strip()
+        if phase:
+            if phase not in dict(ResearchStudy.PHASE_CHOICES):
+                return JsonResponse({'success': False, 'message': 'Invalid phase'}, status=400)
+            studies = studies.filter(phase=phase)
+        location = request.GET.get('location', '').strip()
+        if location:
+            studies = studies.filter(location__icontains=location)
         
-        for study in studies:
-            studies_data.append({
-                'id': str(study.id),
-                'title': study.title,
-                'description': study.description,
-                'phase': study.phase,
-                'status': study.status,
-                'sponsor': study.sponsor,
-                'location': study.location,
-                'eligibilityCriteria': study.eligibility_criteria,
-                'primaryEndpoint': study.primary_endpoint,
-                'estimatedEnrollment': study.estimated_enrollment,
-                'currentEnrollment': study.current_enrollment,
-                'startDate': study.start_date.isoformat() if study.start_date else None,
-                'estimatedCompletionDate': study.estimated_completion_date.isoformat() if study.estimated_completion_date else None,
-                'contactInfo': {
-                    'name': study.contact_name,
-                    'email': study.contact_email,
-                    'phone': study.contact_phone,
-                },
-                'compensation': study.compensation,
-                'created_at': study.created_at.isoformat()
-            })
+        sort = request.GET.get('sort', 'newest')
+        if sort not in STUDY_SORTS:
+            return JsonResponse({'success': False, 'message': 'Invalid sort'}, status=400)
+        field, descending = STUDY_SORTS[sort]
+        
+        studies, next_cursor = keyset_page(
+            studies, request.GET.get('cursor'), page_size(request.GET.get('limit')), field, descending
+        )
         
         return JsonResponse({
             'success': True,
-            'studies': studies_data
+            'studies': [_study_to_dict(study, detail=False) for study in studies],
+            'next_cursor': next_cursor
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -2082,32 +3138,9 @@ def api_study_detail(request, study_id):
     try:
         study = ResearchStudy.objects.get(id=study_id)
         
-        study_data = {
-            'id': str(study.id),
-            'title': study.title,
-            'description': study.description,
-            'phase': study.phase,
-            'status': study.status,
-            'sponsor': study.sponsor,
-            'location': study.location,
-            'eligibilityCriteria': study.eligibility_criteria,
-            'primaryEndpoint': study.primary_endpoint,
-            'estimatedEnrollment': study.estimated_enrollment,
-            'currentEnrollment': study.current_enrollment,
-            'startDate': study.start_date.isoformat() if study.start_date else None,
-            'estimatedCompletionDate': study.estimated_completion_date.isoformat() if study.estimated_completion_date else None,
-            'contactInfo': {
-                'name': study.contact_name,
-                'email': study.contact_email,
-                'phone': study.contact_phone,
-            },
-            'compensation': study.compensation,
-            'created_at': study.created_at.isoformat()
-        }
-        
         return JsonResponse({
             'success': True,
-            'study': study_data
+            'study': _study_to_dict(study)
         })
         
     except ResearchStudy.DoesNotExist:
@@ -2121,20 +3154,73 @@ def api_study_detail(request, study_id):
             'message': str(e)
         }, status=500)
 
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_suggested_studies(request):
+    """API endpoint to get recruiting studies the patient is eligible for, best match first.
+
+    Reads the patient's rows of the StudyMatch table maintained by
+    matching.py; accepts ``limit``.
+    """
+    try:
+        matches = StudyMatch.objects.filter(
+            patient=request.user.profile, study__status='recruiting',
+        ).select_related('study').defer(
+            *(f'study__{field}' for field in STUDY_DETAIL_FIELDS)
+        ).order_by('-score', 'study_id')[:page_size(request.GET.get('limit'))]
+        
+        studies_data = []
+        for match in matches:
+            study_data = _study_to_dict(match.study, detail=False)
+            study_data['matchScore'] = match.score
+            studies_data.append(study_data)
+        
+        return JsonResponse({
+            'success': True,
+            'studies': studies_data
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def api_search_patients(request):
-    """API endpoint to search for patients"""
+    """API endpoint to search for patients
+
+    With ``studyId`` only patients eligible for that study are returned,
+    best match first; otherwise ``matchScore`` is the patient's best match
+    for any study of the signed-in researcher. Scores come from the
+    StudyMatch table maintained by matching.py.
+    """
     try:
         # Get search parameters
         condition = request.GET.get('condition', '').strip()
         location = request.GET.get('location', '').strip()
         age_range = request.GET.get('ageRange', '').strip()
         gender = request.GET.get('gender', '').strip()
+        study_id = request.GET.get('studyId', '').strip()
+        if study_id:
+            try:
+                study_id = int(study_id)
+            except ValueError:
+                return JsonResponse({'success': False, 'message': 'Invalid studyId'}, status=400)
+        else:
+            study_id = None
         
         # Start with all patients
         patients = PatientProfile.objects.select_related('profile__user').all()
         
+        if study_id is not None:
+            # Read in score order from the (study, -score) match index
+            patients = patients.filter(profile__study_matches__study_id=study_id).annotate(
+                match_score=F('profile__study_matches__score'),
+            ).order_by('-match_score', 'profile__study_matches__patient')
+        
         # Apply filters
         if condition:
             patients = patients.filter(
@@ -2160,19 +3246,23 @@ def api_search_patients(request):
                 pass  # Invalid age range format
         
         # Limit results and create response data
-        patients = patients[:20]  # Limit to 20 results
+        patients = list(patients[:20])  # Limit to 20 results
         patients_data = []
         
+        best_scores = {}
+        if study_id is None and request.user.is_authenticated and patients:
+            best_scores = dict(
+                StudyMatch.objects.filter(
+                    study__created_by__user=request.user,
+                    patient_id__in=[patient.profile_id for patient in patients],
+                ).values('patient_id').annotate(best=Max('score')).values_list('patient_id', 'best')
+            )
+        
         for patient in patients:
             # Calculate age
             age = (datetime.now().date() - patient.date_of_birth).days // 365
             
-            # Calculate match score based on search criteria
-            match_score = 85  # Base score
-            if condition and condition.lower() in patient.cancer_type.lower():
-                match_score += 10
-            if condition and condition.lower() in patient.medical_conditions.lower():
-                match_score += 5
+            match_score = patient.match_score if study_id is not None else best_scores.get(patient.profile_id, 0)
             
             patients_data.append({
                 'id': patient.profile.user.id,
@@ -2182,7 +3272,7 @@ def api_search_patients(request):
                 'location': 'Location not specified',  # Could be enhanced with actual location
                 'condition': patient.cancer_type,
                 'stage': 'Stage not specified',  # Could be enhanced with actual stage
-                'matchScore': min(match_score, 100),
+                'matchScore': match_score,
                 'lastActive': datetime.now().isoformat(),
                 'medical_conditions': patient.medical_conditions,
                 'allergies': patient.allergies
@@ -2264,6 +3354,211 @@ def api_search_researchers(request):
             'message': str(e)
         }, status=500)
 
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_hashtag_posts(request, name):
+    """API endpoint listing posts that use a hashtag, newest first.
+
+    Pages over the PostHashtag index with ``limit``/``cursor``; only posts in
+    public communities or communities the user belongs to are included.
+    """
+    try:
+        user_profile = request.user.profile
+        hashtag = Hashtag.objects.filter(name=name.lstrip('#').lower()).first()
+        if not hashtag:
+            return JsonResponse({
+                'success': False,
+                'message': 'Hashtag not found'
+            }, status=404)
+        
+        member_of = CommunityMembership.objects.filter(member=user_profile).values('community_id')
+        links, next_cursor = keyset_page(
+            PostHashtag.objects.filter(hashtag=hashtag).filter(
+                Q(post__community__is_private=False) | Q(post__community_id__in=member_of)
+            ),
+            request.GET.get('cursor'),
+            page_size(request.GET.get('limit')),
+        )
+        posts = _feed_posts_queryset(user_profile).select_related('community').in_bulk(
+            [link.post_id for link in links]
+        )
+        
+        posts_data = []
+        for link in links:
+            post = posts[link.post_id]
+            post_data = _post_to_dict(post, request)
+            post_data['community'] = {'id': str(post.community.id), 'name': post.community.name}
+            posts_data.append(post_data)
+        
+        return JsonResponse({
+            'success': True,
+            'hashtag': {'name': hashtag.name, 'post_count': hashtag.post_count},
+            'posts': posts_data,
+            'next_cursor': next_cursor
+        })
+        
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_trending_hashtags(request):
+    """API endpoint for trending hashtags, read top-down from their score index"""
+    try:
+        limit = page_size(request.GET.get('limit'), default=20)
+        now = timezone.now()
+        hashtags = Hashtag.objects.filter(post_count__gt=0).order_by('-trending_score', '-id')[:limit]
+        
+        return JsonResponse({
+            'success': True,
+            'hashtags': [
+                {
+                    'name': hashtag.name,
+                    'post_count': hashtag.post_count,
+                    'trending_score': trending.current(hashtag.trending_score, now)
+                } for hashtag in hashtags
+            ]
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_trending(request):
+    """API endpoint for trending posts and communities.
+
+    Both lists are read top-down from the ``-trending_score`` indexes, so only
+    ``limit`` rows (default 10) of each are touched. ``?community=<id>``
+    restricts posts to one community. Posts are limited to public communities
+    and those the user belongs to: public posts come off the
+    ``(community_is_private, -trending_score)`` index and the user's private
+    communities are a second small top-K read merged in.
+    """
+    try:
+        user_profile = request.user.profile
+        limit = page_size(request.GET.get('limit'), default=10)
+        now = timezone.now()
+        
+        member_of = CommunityMembership.objects.filter(member=user_profile).values('community_id')
+        posts = _feed_posts_queryset(user_profile).select_related('community').order_by('-trending_score', '-id')
+        if request.GET.get('community'):
+            top_posts = posts.filter(community_id=request.GET.get('community')).filter(
+                Q(community_is_private=False) | Q(community_id__in=member_of)
+            )[:limit]
+        else:
+            # `__in` rather than `=False`, which compiles to an unindexable `WHERE NOT col`
+            public = posts.filter(community_is_private__in=[False])[:limit]
+            private = posts.filter(community_is_private__in=[True], community_id__in=member_of)[:limit]
+            top_posts = heapq.nlargest(limit, [*public, *private], key=lambda post: (post.trending_score, post.id))
+        posts_data = []
+        for post in top_posts:
+            post_data = _post_to_dict(post, request)
+            post_data['community'] = {'id': str(post.community.id), 'name': post.community.name}
+            post_data['trending_score'] = trending.current(post.trending_score, now)
+            posts_data.append(post_data)
+        
+        communities_data = []
+        for community in _community_directory_queryset().order_by('-trending_score', '-id')[:limit]:
+            community_data = _community_to_dict(community)
+            community_data['trendingScore'] = trending.current(community.trending_score, now)
+            communities_data.append(community_data)
+        
+        return JsonResponse({
+            'success': True,
+            'posts': posts_data,
+            'communities': communities_data
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_auth
+@require_http_methods(["GET"])
+def api_search_posts(request):
+    """API endpoint for ranked full-text search over community posts.
+
+    Only posts in public communities or communities the user belongs to are
+    returned. Accepts ``q``, ``limit`` and ``cursor``.
+    """
+    try:
+        user_profile = request.user.profile
+        limit = page_size(request.GET.get('limit'))
+        member_of = CommunityMembership.objects.filter(member=user_profile).values('community_id')
+        visible = _feed_posts_queryset(user_profile).select_related('community').filter(
+            Q(community__is_private=False) | Q(community_id__in=member_of)
+        )
+        posts, next_cursor = search.search(
+            'post', request.GET.get('q', ''), visible, request.GET.get('cursor'), limit
+        )
+        
+        posts_data = []
+        for post in posts:
+            post_data = _post_to_dict(post, request)
+            post_data['community'] = {'id': str(post.community.id), 'name': post.community.name}
+            posts_data.append(post_data)
+        
+        return JsonResponse({
+            'success': True,
+            'posts': posts_data,
+            'next_cursor': next_cursor
+        })
+        
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_search_communities(request):
+    """API endpoint for ranked full-text search over community names and descriptions"""
+    try:
+        limit = page_size(request.GET.get('limit'))
+        communities, next_cursor = search.search(
+            'community', request.GET.get('q', ''), _community_directory_queryset(), request.GET.get('cursor'), limit
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'communities': [_community_to_dict(community) for community in communities],
+            'next_cursor': next_cursor
+        })
+        
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_login(request):
@@ -0,0 +1,191 @@
+"""Near-duplicate detection for community posts with MinHash and LSH.
+
+A post is reduced to the set of its word 3-grams ("shingles") and summarized
+by a MinHash signature: the minimum of each of NUM_PERM independent hash
+functions over that set. The fraction of positions where two signatures agree
+estimates the Jaccard similarity of the two shingle sets. Signatures are cut
+into BANDS bands of ROWS values and each band is a bucket key, so only posts
+sharing at least one band are compared; with 16 bands of 4 rows a pair at 0.8
+similarity collides with probability 0.999, while pairs below 0.3 rarely do.
+Bucket keys include the community, so a post is only ever matched against
+posts of its own community: flags are reviewed by that community's
+moderators, who must not be shown posts of communities they can't read.
+
+The index lives in each process and covers posts from the last WINDOW (at most
+MAX_POSTS of them). The first lookup starts loading it in a background thread
+(signatures cost ~0.1 ms each, too slow to build inside a request) and nothing
+is flagged until it is ready; after that the post signals in signals.py keep
+it current. Posts written without signals (bulk_create, raw SQL) only reach a
+running process's index when that process restarts.
+
+`manage.py flag_duplicate_posts` scans existing posts with an index of its own
+and writes duplicate_of flags; it does not touch the indexes of running servers.
+"""
+import threading
+import zlib
+from collections import defaultdict, deque
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import CommunityPost
+from .search import tokenize
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Posts shorter than this ("Thank you!") are too generic to call duplicates
+MIN_TOKENS = 8
+THRESHOLD = 0.8
+WINDOW = timedelta(days=30)
+MAX_POSTS = 100_000
+
+# Universal hashing (a * x + b) mod p; a < 2**31 and x < 2**32 keeps the
+# product inside uint64.
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)[:, None]
+
+
+def signature(text):
+    """MinHash signature of ``text``, or None if it is too short to compare."""
+    tokens = tokenize(text)
+    if len(tokens) < MIN_TOKENS:
+        return None
+    shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_A * hashes + _B) % _PRIME).min(axis=1)
+
+
+def _band_keys(sig, community_id):
+    return [(community_id, band, sig[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class DuplicateIndex:
+    """LSH buckets over the MinHash signatures of recent posts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loading = False
+        # Changes committed while a background load runs, replayed after it
+        self._backlog = []
+        self._signatures = {}
+        self._buckets = defaultdict(set)
+        # (created_at, pk) in insertion order, for expiring old posts
+        self._order = deque()
+
+    def _add(self, pk, sig, created_at, community_id):
+        self._discard(pk)
+        self._signatures[pk] = (sig, created_at, community_id)
+        for key in _band_keys(sig, community_id):
+            self._buckets[key].add(pk)
+        self._order.append((created_at, pk))
+        cutoff = timezone.now() - WINDOW
+        while self._order and (len(self._signatures) > MAX_POSTS or self._order[0][0] < cutoff):
+            expired_at, expired_pk = self._order.popleft()
+            entry = self._signatures.get(expired_pk)
+            if entry and entry[1] == expired_at:
+                self._discard(expired_pk)
+
+    def _discard(self, pk):
+        entry = self._signatures.pop(pk, None)
+        if entry is None:
+            return
+        for key in _band_keys(entry[0], entry[2]):
+            bucket = self._buckets[key]
+            bucket.discard(pk)
+            if not bucket:
+                del self._buckets[key]
+
+    def _load(self, on_post=None):
+        recent = CommunityPost.objects.filter(created_at__gte=timezone.now() - WINDOW).order_by(
+            '-created_at', '-id'
+        ).only('id', 'community_id', 'content', 'created_at', 'duplicate_of_id')[:MAX_POSTS]
+        for post in reversed(list(recent)):
+            sig = signature(post.content)
+            if sig is None:
+                continue
+            if on_post:
+                on_post(post, self._matches(sig, post.community_id))
+            self._add(post.pk, sig, post.created_at, post.community_id)
+        self._loaded = True
+
+    def _load_in_background(self):
+        try:
+            fresh = DuplicateIndex()
+            fresh._load()
+            with self._lock:
+                self._signatures, self._buckets, self._order = fresh._signatures, fresh._buckets, fresh._order
+                for change in self._backlog:
+                    self._apply(*change)
+                self._backlog = []
+                self._loaded = True
+        finally:
+            self._loading = False
+            connection.close()
+
+    def _apply(self, pk, sig, created_at, community_id):
+        if sig is None:
+            self._discard(pk)
+        else:
+            self._add(pk, sig, created_at, community_id)
+
+    def _matches(self, sig, community_id, exclude=None):
+        candidates = set()
+        for key in _band_keys(sig, community_id):
+            candidates |= self._buckets.get(key, set())
+        candidates.discard(exclude)
+        matches = []
+        for pk in candidates:
+            similarity = np.count_nonzero(self._signatures[pk][0] == sig) / NUM_PERM
+            if similarity >= THRESHOLD:
+                matches.append((pk, similarity))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def find(self, text, community_id, exclude=None):
+        """``[(post_id, similarity)]`` of indexed posts in ``community_id`` near-duplicating ``text``, closest first."""
+        sig = signature(text)
+        if sig is None:
+            return []
+        with self._lock:
+            if not self._loaded:
+                if not self._loading:
+                    self._loading = True
+                    threading.Thread(target=self._load_in_background, daemon=True).start()
+                return []
+            return self._matches(sig, community_id, exclude)
+
+    def index(self, post):
+        pk, sig, created_at, community_id = post.pk, signature(post.content), post.created_at, post.community_id
+        transaction.on_commit(lambda: self._change(pk, sig, created_at, community_id))
+
+    def remove(self, pk):
+        transaction.on_commit(lambda: self._change(pk, None, None, None))
+
+    def _change(self, pk, sig, created_at, community_id):
+        with self._lock:
+            if self._loaded:
+                self._apply(pk, sig, created_at, community_id)
+            elif self._loading:
+                self._backlog.append((pk, sig, created_at, community_id))
+
+    def rebuild(self, on_post=None):
+        """Reload this index from the table, oldest first.
+
+        ``on_post(post, matches)`` is called for each post with the earlier
+        posts of its community it near-duplicates, before the post itself is
+        added.
+        """
+        with self._lock:
+            self._signatures.clear()
+            self._buckets.clear()
+            self._order.clear()
+            self._load(on_post)
+
+
+index = DuplicateIndex()
@@ -0,0 +1,180 @@
+"""Write-behind buffering of post likes for burst traffic.
+
+With ``settings.LIKE_WRITE_BEHIND`` on, api_like_post and api_unlike_post
+only record the user's intent in a per-process buffer. PostLike rows,
+like_count and trending_score are written later, one batch per flush:
+repeated like/unlike clicks by a user collapse to their final state and a
+post liked hundreds of times gets a single counter UPDATE instead of
+hundreds contending for its row.
+
+A flush runs inline once FLUSH_SIZE intents are pending, from a timer
+FLUSH_INTERVAL seconds after the first pending intent, and at process exit.
+Until then pending_like() lets the process that took the click show the user
+their own like (read-your-own-writes); everyone else sees it after the flush.
+Intents still pending when a process is killed are lost, and
+`manage.py reconcile_post_counters` repairs any counter drift that causes.
+"""
+import atexit
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import trending
+from .models import Community, CommunityPost, PostLike
+
+FLUSH_SIZE = 500
+FLUSH_INTERVAL = 1.0  # seconds
+
+
+def enabled():
+    return getattr(settings, 'LIKE_WRITE_BEHIND', False)
+
+
+def _score_change(added, removed):
+    """trending_score expression applying a batch of added and removed events."""
+    expression = F('trending_score')
+    if added:
+        expression = trending.added(trending.combine(added), expression)
+    if removed:
+        expression = trending.removed(trending.combine(removed), expression)
+    return expression
+
+
+def _count_change(delta):
+    """like_count expression adding ``delta``, floored at zero.
+
+    The floor is a CASE rather than GREATEST(like_count + delta, 0): MySQL
+    evaluates the sum first and rejects a negative result for the UNSIGNED
+    column before GREATEST could clamp it.
+    """
+    if delta >= 0:
+        return F('like_count') + delta
+    return Case(When(like_count__gte=-delta, then=F('like_count') + delta), default=Value(0))
+
+
+def apply_intents(intents):
+    """Write ``{(post_id, profile_id): liked}`` to the database in one transaction.
+
+    Returns ``(likes created, likes deleted)``; intents that match the stored
+    state, or whose post has since been deleted, are no-ops.
+    """
+    now = timezone.now()
+    post_ids = sorted({post_id for post_id, _ in intents})
+    profile_ids = {profile_id for _, profile_id in intents}
+    with transaction.atomic():
+        # Locking the posts (in id order) serializes flushes from different
+        # processes, so the existing-likes read below cannot go stale
+        post_communities = dict(
+            CommunityPost.objects.select_for_update().filter(id__in=post_ids).order_by('id').values_list('id', 'community_id')
+        )
+        existing = {
+            (like.post_id, like.user_id): like
+            for like in PostLike.objects.filter(post_id__in=post_communities, user_id__in=profile_ids)
+            .only('id', 'post_id', 'user_id', 'created_at')
+        }
+        created = PostLike.objects.bulk_create([
+            PostLike(post_id=post_id, user_id=profile_id)
+            for (post_id, profile_id), liked in intents.items()
+            if liked and post_id in post_communities and (post_id, profile_id) not in existing
+        ])
+        deleted = [like for key, like in existing.items() if intents.get(key) is False]
+        PostLike.objects.filter(id__in=[like.id for like in deleted]).delete()
+
+        # Net like delta plus added/removed trending events, per post
+        post_changes = defaultdict(lambda: [0, [], []])
+        for like in created:
+            change = post_changes[like.post_id]
+            change[0] += 1
+            change[1].append(trending.event_score('like', now))
+        for like in deleted:
+            change = post_changes[like.post_id]
+            change[0] -= 1
+            change[2].append(trending.event_score('like', like.created_at))
+
+        community_changes = defaultdict(lambda: ([], []))
+        for post_id, (delta, added, removed) in post_changes.items():
+            CommunityPost.objects.filter(pk=post_id).update(
+                like_count=_count_change(delta),
+                trending_score=_score_change(added, removed),
+            )
+            community_change = community_changes[post_communities[post_id]]
+            community_change[0].extend(added)
+            community_change[1].extend(removed)
+        for community_id in sorted(community_changes):
+            Community.objects.filter(pk=community_id).update(
+                trending_score=_score_change(*community_changes[community_id])
+            )
+    return len(created), len(deleted)
+
+
+class LikeBuffer:
+    """Pending like/unlike intents of this process, keyed by (post, profile)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        # Intents taken by an in-progress flush; still visible to pending_like
+        self._flushing = {}
+        self._timer = None
+
+    def record(self, post_id, profile_id, liked):
+        with self._lock:
+            self._pending[(post_id, profile_id)] = liked
+            full = len(self._pending) >= FLUSH_SIZE
+            if not full and self._timer is None:
+                self._timer = threading.Timer(FLUSH_INTERVAL, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def pending_like(self, post_id, profile_id):
+        """The user's buffered like state for a post, or None if nothing is pending."""
+        key = (post_id, profile_id)
+        liked = self._pending.get(key)
+        return self._flushing.get(key) if liked is None else liked
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Apply every pending intent; returns ``(likes created, likes deleted)``."""
+        with self._flush_lock:
+            with self._lock:
+                intents, self._pending = self._pending, {}
+                self._flushing = intents
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not intents:
+                return 0, 0
+            try:
+                return apply_intents(intents)
+            except Exception:
+                # Requeue behind anything recorded since, so no click is lost
+                with self._lock:
+                    for key, liked in intents.items():
+                        self._pending.setdefault(key, liked)
+                raise
+            finally:
+                self._flushing = {}
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+buffer = LikeBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    if len(buffer):
+        buffer.flush()
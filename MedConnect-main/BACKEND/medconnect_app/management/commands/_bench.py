@@ -0,0 +1,61 @@
+"""Shared helpers for the bench_* management commands.
+
+Benchmarks seed throwaway rows inside a transaction that is always rolled
+back, so they can be pointed at a development database without leaving
+anything behind.
+"""
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from medconnect_app.models import Profile
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is rolled back on exit."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(fn, repeat=3):
+    """Call ``fn`` ``repeat`` times and return (query count, best time in ms)."""
+    best_ms = None
+    queries = 0
+    for _ in range(repeat):
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        queries = len(ctx.captured_queries)
+        best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+    return queries, best_ms
+
+
+def make_profiles(count, prefix='bench', role='patient'):
+    """Bulk create ``count`` users with profiles and return the profiles."""
+    User.objects.bulk_create([
+        User(username=f'{prefix}_{i}', first_name='Bench', last_name=str(i))
+        for i in range(count)
+    ])
+    users = User.objects.filter(username__startswith=f'{prefix}_')
+    Profile.objects.bulk_create([Profile(user=user, role=role) for user in users])
+    return list(Profile.objects.filter(user__username__startswith=f'{prefix}_').select_related('user'))
+
+
+# RequestFactory's default 'testserver' is not in ALLOWED_HOSTS, so views that
+# build absolute URLs would raise DisallowedHost
+BENCH_HOST = 'localhost'
+
+
+def get_request(user, path='/', **params):
+    """Build an authenticated GET request for calling a view directly."""
+    request = RequestFactory().get(path, params, HTTP_HOST=BENCH_HOST, SERVER_NAME=BENCH_HOST)
+    request.user = user
+    return request
@@ -0,0 +1,63 @@
+import datetime
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from medconnect_app.api_views import api_bulk_update_applicant_status, api_update_applicant_status
+from medconnect_app.models import ContactRequest, ResearchStudy, StudyParticipation
+from ._bench import rolled_back, measure, make_profiles
+
+
+class Command(BaseCommand):
+    help = 'Benchmark approving and enrolling applicants one request at a time vs in one bulk request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=300)
+
+    def handle(self, *args, **options):
+        size = options['applicants']
+        self.stdout.write(f"{'action':<8} {'path':<20} {'queries':>8} {'ms':>10}")
+        for action in ('approve', 'enroll'):
+            for label, bulk in (('one per request', False), ('bulk request', True)):
+                with rolled_back():
+                    researcher, study, ids = self.seed(size)
+                    fn = (lambda: self.bulk(researcher, action, ids)) if bulk else (lambda: self.single(researcher, action, ids))
+                    queries, ms = measure(fn, repeat=1)
+                    self.verify(study, action, size)
+                self.stdout.write(f'{action:<8} {label:<20} {queries:>8} {ms:>10.1f}')
+
+    def post(self, view, researcher, body, *args):
+        request = RequestFactory().post('/', data=json.dumps(body), content_type='application/json')
+        request.user = researcher.user
+        response = view(request, *args)
+        if response.status_code != 200:
+            raise CommandError(f'{view.__name__} returned {response.status_code}: {response.content[:200]!r}')
+
+    def single(self, researcher, action, ids):
+        for participation_id in ids:
+            self.post(api_update_applicant_status, researcher, {'action': action}, participation_id)
+
+    def bulk(self, researcher, action, ids):
+        self.post(api_bulk_update_applicant_status, researcher, {'action': action, 'participation_ids': ids})
+
+    def verify(self, study, action, size):
+        study.refresh_from_db()
+        expected = size if action == 'enroll' else 0
+        notified = ContactRequest.objects.filter(researcher=study.created_by).count()
+        if study.current_enrollment != expected or notified != size:
+            raise CommandError(f'{action}: enrollment {study.current_enrollment} (expected {expected}), {notified} notifications')
+
+    def seed(self, size):
+        researcher = make_profiles(1, prefix='bench_applicants_researcher', role='researcher')[0]
+        patients = make_profiles(size, prefix='bench_applicants_patient')
+        study = ResearchStudy.objects.create(
+            title='Benchmark study', description='Benchmark study', sponsor='Bench', location='Boston, MA',
+            eligibility_criteria='Adults 18 years or older', primary_endpoint='Overall survival',
+            estimated_enrollment=size, start_date=datetime.date(2025, 1, 1),
+            estimated_completion_date=datetime.date(2027, 1, 1), contact_name='Bench',
+            contact_email='bench@example.com', contact_phone='555-0100', created_by=researcher,
+        )
+        StudyParticipation.objects.bulk_create([
+            StudyParticipation(study=study, patient=patient, status='applied') for patient in patients
+        ])
+        return researcher, study, list(StudyParticipation.objects.filter(study=study).values_list('id', flat=True))
@@ -0,0 +1,85 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from medconnect_app.api_views import api_post_comments
+from medconnect_app.models import Community, CommunityPost, PostComment
+from ._bench import rolled_back, measure, make_profiles, get_request
+
+
+class Command(BaseCommand):
+    help = 'Benchmark threaded comment reads on one heavily discussed post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10_000)
+        parser.add_argument('--roots', type=int, default=500,
+                            help='How many of the comments are top-level')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with rolled_back():
+            viewer, post = self.seed(options['comments'], options['roots'], rng)
+            root = PostComment.objects.filter(post=post, depth=0).order_by('path').first()
+            rows = [
+                ('per-level thread walk', lambda: self.legacy_thread(root)),
+                ('path range thread', lambda: list(PostComment.objects.filter(
+                    post=post, path__gte=root.path, path__lt=root.subtree_upper_bound).order_by('path'))),
+                ('whole post, per-level', lambda: self.legacy_post(post)),
+                ('whole post, path order', lambda: list(PostComment.objects.filter(post=post).order_by('path'))),
+                ('api top-level + replies', lambda: self.call(viewer, post)),
+                ('api thread page', lambda: self.call(viewer, post, root=root.id, limit=100)),
+            ]
+            self.stdout.write(f"{'path':<26} {'queries':>8} {'ms':>10}")
+            for label, fn in rows:
+                queries, ms = measure(fn, options['repeat'])
+                self.stdout.write(f'{label:<26} {queries:>8} {ms:>10.1f}')
+
+    def call(self, viewer, post, **params):
+        response = api_post_comments(get_request(viewer.user, **params), post.id)
+        if response.status_code != 200:
+            raise CommandError(f'api_post_comments returned {response.status_code}: {response.content[:200]!r}')
+        return response
+
+    def seed(self, count, roots, rng):
+        profiles = make_profiles(5, prefix='bench_threads')
+        viewer = profiles[0]
+        community = Community.objects.create(name='Bench threads', description='Benchmark community',
+                                             category='General', created_by=viewer)
+        post = CommunityPost.objects.create(community=community, author=viewer, content='Benchmark post')
+
+        # Build the forest a level at a time: each new reply picks a random
+        # parent from the comments created so far, giving bushy, uneven threads.
+        self.stdout.write(f'Seeding {count} comments...')
+        created = []
+        level = [None] * min(roots, count)
+        while level:
+            batch = PostComment.objects.bulk_create([
+                PostComment(post=post, author=rng.choice(profiles), parent=parent,
+                            depth=parent.depth + 1 if parent else 0, content='Benchmark comment')
+                for parent in level
+            ])
+            for comment in batch:
+                comment.path = (comment.parent.path if comment.parent else '') + PostComment.path_segment(comment.pk)
+            PostComment.objects.bulk_update(batch, ['path'], batch_size=1000)
+            created.extend(batch)
+            remaining = count - len(created)
+            level = [rng.choice(created) for _ in range(min(remaining, len(created)))]
+            level = [parent for parent in level if parent.depth < PostComment.MAX_DEPTH]
+        CommunityPost.objects.filter(pk=post.pk).update(comment_count=len(created))
+        return viewer, post
+
+    def legacy_thread(self, root):
+        """Recursive per-level fetch of one thread, the adjacency-list baseline."""
+        thread, level = [root], [root.id]
+        while level:
+            children = list(PostComment.objects.filter(parent_id__in=level))
+            thread.extend(children)
+            level = [child.id for child in children]
+        return thread
+
+    def legacy_post(self, post):
+        comments, level = [], list(PostComment.objects.filter(post=post, parent__isnull=True))
+        while level:
+            comments.extend(level)
+            level = list(PostComment.objects.filter(parent_id__in=[comment.id for comment in level]))
+        return comments
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from medconnect_app.api_views import api_communities, api_user_communities
+from medconnect_app.models import Community, CommunityMembership, CommunityPost
+from ._bench import rolled_back, measure, make_profiles, get_request
+
+
+class Command(BaseCommand):
+    help = 'Benchmark query count and latency of the community directory endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10, 100, 1000],
+                            help='Community counts to benchmark')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'communities':>12} {'path':<22} {'queries':>8} {'ms':>10}")
+        for size in options['sizes']:
+            with rolled_back():
+                viewer = self.seed(size)
+                rows = [
+                    ('per-row queries', self.legacy_listing),
+                    ('api_communities', lambda: self.call(api_communities, viewer)),
+                    ('api_user_communities', lambda: self.call(api_user_communities, viewer)),
+                ]
+                for label, fn in rows:
+                    queries, ms = measure(fn, options['repeat'])
+                    self.stdout.write(f'{size:>12} {label:<22} {queries:>8} {ms:>10.1f}')
+
+    def call(self, view, viewer):
+        response = view(get_request(viewer.user))
+        if response.status_code != 200:
+            raise CommandError(f'{view.__name__} returned {response.status_code}: {response.content[:200]!r}')
+        return response
+
+    def seed(self, size):
+        profiles = make_profiles(5, prefix='bench_dir')
+        viewer = profiles[0]
+        Community.objects.bulk_create([
+            Community(name=f'Bench community {i}', description='Benchmark community',
+                      category='General', tags=['bench'], created_by=viewer,
+                      member_count=len(profiles))
+            for i in range(size)
+        ])
+        communities = list(Community.objects.filter(name__startswith='Bench community '))
+        CommunityMembership.objects.bulk_create([
+            CommunityMembership(community=community, member=profile, is_moderator=profile == viewer)
+            for community in communities for profile in profiles
+        ])
+        CommunityPost.objects.bulk_create([
+            CommunityPost(community=community, author=viewer, content='Benchmark post')
+            for community in communities for _ in range(2)
+        ])
+        Community.moderators.through.objects.bulk_create([
+            Community.moderators.through(community_id=community.id, profile_id=viewer.id)
+            for community in communities
+        ])
+        return viewer
+
+    def legacy_listing(self):
+        """The previous per-row read path, kept as a baseline."""
+        return [
+            (community.members.count(),
+             community.posts.order_by('-created_at').values_list('created_at', flat=True).first(),
+             [mod.user.username for mod in community.moderators.all()])
+            for community in Community.objects.all()
+        ]
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from medconnect_app.api_views import api_community_posts
+from medconnect_app.models import Community, CommunityMembership, CommunityPost, PostLike, PostComment
+from ._bench import rolled_back, measure, make_profiles, get_request
+
+
+class Command(BaseCommand):
+    help = 'Benchmark query count and latency of the community post feed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10, 100, 2000],
+                            help='Post counts to benchmark')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'posts':>8} {'path':<22} {'queries':>8} {'ms':>10}")
+        for size in options['sizes']:
+            with rolled_back():
+                viewer, community = self.seed(size)
+                rows = [
+                    ('per-row lookups', lambda: self.legacy_feed(community, viewer)),
+                    ('api_community_posts', lambda: self.call(viewer, community)),
+                ]
+                for label, fn in rows:
+                    queries, ms = measure(fn, options['repeat'])
+                    self.stdout.write(f'{size:>8} {label:<22} {queries:>8} {ms:>10.1f}')
+
+    def call(self, viewer, community):
+        response = api_community_posts(get_request(viewer.user), community.id)
+        if response.status_code != 200:
+            raise CommandError(f'api_community_posts returned {response.status_code}: {response.content[:200]!r}')
+        return response
+
+    def seed(self, size):
+        profiles = make_profiles(5, prefix='bench_feed')
+        viewer = profiles[0]
+        community = Community.objects.create(name='Bench feed', description='Benchmark community',
+                                             category='General', created_by=viewer)
+        CommunityMembership.objects.bulk_create([
+            CommunityMembership(community=community, member=profile) for profile in profiles
+        ])
+        CommunityPost.objects.bulk_create([
+            CommunityPost(community=community, author=profiles[i % len(profiles)], content=f'Benchmark post {i}')
+            for i in range(size)
+        ])
+        posts = list(CommunityPost.objects.filter(community=community))
+        PostLike.objects.bulk_create([
+            PostLike(post=post, user=profile) for post in posts for profile in profiles[:2]
+        ])
+        PostComment.objects.bulk_create([
+            PostComment(post=post, author=profile, content='Benchmark comment')
+            for post in posts for profile in profiles[1:4]
+        ])
+        return viewer, community
+
+    def legacy_feed(self, community, viewer):
+        """The previous per-post read path, kept as a baseline."""
+        feed = []
+        for post in CommunityPost.objects.filter(community=community):
+            feed.append((
+                PostLike.objects.filter(post=post, user=viewer).exists(),
+                post.likes.count(),
+                [(c.author.user.username, c.author.role) for c in post.comments.all()],
+                list(post.attachments.all()),
+                post.author.user.username,
+            ))
+        return feed
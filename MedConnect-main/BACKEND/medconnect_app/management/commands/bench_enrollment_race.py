@@ -0,0 +1,112 @@
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from medconnect_app.api_views import api_update_applicant_status
+from medconnect_app.models import ResearchStudy, StudyParticipation
+from ._bench import make_profiles
+
+
+class Command(BaseCommand):
+    help = 'Stress test concurrent enrollment: no study may be overbooked and withdrawals must promote the waitlist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=400)
+        parser.add_argument('--capacity', type=int, default=100)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        # Worker threads use their own connections, so the rows they write
+        # must be committed; everything is deleted again at the end.
+        researcher = make_profiles(1, prefix='bench_enrollment_researcher', role='researcher')[0]
+        patients = make_profiles(options['applicants'], prefix='bench_enrollment_patient')
+        threads, capacity = options['threads'], options['capacity']
+        failures = []
+        try:
+            self.stdout.write(
+                f"{'path':<24} {'requests':>8} {'errors':>7} {'seconds':>8} {'req/s':>7} "
+                f"{'enrolled':>8} {'counter':>8} {'waitlist':>8} {'capacity':>8}"
+            )
+            study, ids = self.seed(researcher, patients, capacity, 'read-modify-write')
+            row = self.burst(lambda pk: self.legacy_enroll(pk), ids, threads)
+            self.report('enroll, read-modify-write', study, row)
+
+            study, ids = self.seed(researcher, patients, capacity, 'slot allocation')
+            row = self.burst(lambda pk: self.call(researcher, 'enroll', pk), ids, threads)
+            failures += self.report('enroll, slot allocation', study, row)
+
+            enrolled = list(StudyParticipation.objects.filter(study=study, status='enrolled').values_list('id', flat=True))
+            row = self.burst(lambda pk: self.call(researcher, 'withdraw', pk), enrolled[::2], threads)
+            failures += self.report('withdraw + promote', study, row)
+        finally:
+            ResearchStudy.objects.filter(created_by=researcher).delete()
+            User.objects.filter(username__startswith='bench_enrollment_').delete()
+
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS('No study was overbooked and no place was left empty with a waitlist'))
+
+    def burst(self, fn, ids, threads):
+        def worker(chunk):
+            try:
+                return sum(fn(pk) != 200 for pk in chunk)
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            errors = sum(pool.map(worker, [ids[i::threads] for i in range(threads)]))
+        return len(ids), errors, time.perf_counter() - start
+
+    def report(self, label, study, row):
+        requests, errors, elapsed = row
+        study.refresh_from_db()
+        statuses = StudyParticipation.objects.filter(study=study)
+        enrolled = statuses.filter(status='enrolled').count()
+        waitlisted = statuses.filter(status='waitlisted').count()
+        self.stdout.write(
+            f'{label:<24} {requests:>8} {errors:>7} {elapsed:>8.2f} {requests / elapsed:>7.0f} '
+            f'{enrolled:>8} {study.current_enrollment:>8} {waitlisted:>8} {study.estimated_enrollment:>8}'
+        )
+        problems = []
+        if enrolled > study.estimated_enrollment:
+            problems.append(f'{label}: {enrolled} enrolled in a study of {study.estimated_enrollment}')
+        if enrolled != study.current_enrollment:
+            problems.append(f'{label}: {enrolled} enrolled but current_enrollment is {study.current_enrollment}')
+        if waitlisted and enrolled < study.estimated_enrollment:
+            problems.append(f'{label}: {waitlisted} waitlisted with {study.estimated_enrollment - enrolled} places free')
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+        return problems
+
+    def call(self, researcher, action, participation_id):
+        request = RequestFactory().post('/', data=json.dumps({'action': action}), content_type='application/json')
+        request.user = researcher.user
+        return api_update_applicant_status(request, participation_id).status_code
+
+    def legacy_enroll(self, participation_id):
+        """The previous enrollment (read the counter, add one in Python, save), kept as a baseline."""
+        participation = StudyParticipation.objects.select_related('study').get(id=participation_id)
+        study = participation.study
+        if study.current_enrollment < study.estimated_enrollment:
+            ResearchStudy.objects.filter(id=study.id).update(current_enrollment=study.current_enrollment + 1)
+            StudyParticipation.objects.filter(id=participation_id).update(status='enrolled')
+        return 200
+
+    def seed(self, researcher, patients, capacity, title):
+        study = ResearchStudy.objects.create(
+            title=f'Benchmark study, {title}', description='Benchmark study', sponsor='Bench', location='Boston, MA',
+            eligibility_criteria='Adults 18 years or older', primary_endpoint='Overall survival',
+            estimated_enrollment=capacity, start_date=datetime.date(2025, 1, 1),
+            estimated_completion_date=datetime.date(2027, 1, 1), contact_name='Bench',
+            contact_email='bench@example.com', contact_phone='555-0100', created_by=researcher,
+        )
+        StudyParticipation.objects.bulk_create([
+            StudyParticipation(study=study, patient=patient, status='applied') for patient in patients
+        ])
+        return study, list(StudyParticipation.objects.filter(study=study).order_by('id').values_list('id', flat=True))
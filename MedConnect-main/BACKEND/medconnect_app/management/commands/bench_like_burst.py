@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from medconnect_app import like_buffer
+from medconnect_app.api_views import api_like_post
+from medconnect_app.models import Community, CommunityPost, PostLike
+from ._bench import make_profiles
+
+
+class Command(BaseCommand):
+    help = 'Stress test a burst of likes on one post, direct writes vs write-behind'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--likes', type=int, default=2000,
+                            help='Distinct users liking the post')
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        # Worker threads use their own connections, so the rows they write
+        # must be committed; everything is deleted again at the end.
+        profiles = make_profiles(options['likes'], prefix='bench_likes')
+        community = Community.objects.create(name='Bench likes', description='Benchmark community',
+                                             category='General', created_by=profiles[0])
+        post = CommunityPost.objects.create(community=community, author=profiles[0], content='Popular post')
+        try:
+            self.stdout.write(f"{'mode':<14} {'likes':>7} {'errors':>7} {'seconds':>9} {'likes/s':>9} {'stored':>7}")
+            for label, write_behind in (('direct', False), ('write-behind', True)):
+                PostLike.objects.filter(post=post).delete()
+                CommunityPost.objects.filter(pk=post.pk).update(like_count=0)
+                with override_settings(LIKE_WRITE_BEHIND=write_behind):
+                    start = time.perf_counter()
+                    errors = self.burst(post, profiles, options['threads'])
+                    like_buffer.buffer.flush()
+                    elapsed = time.perf_counter() - start
+                post.refresh_from_db()
+                stored = PostLike.objects.filter(post=post).count()
+                if stored != post.like_count:
+                    self.stdout.write(self.style.WARNING(f'{label}: like_count {post.like_count} != {stored} likes'))
+                done = len(profiles) - errors
+                self.stdout.write(f'{label:<14} {done:>7} {errors:>7} {elapsed:>9.2f} {done / elapsed:>9.0f} {stored:>7}')
+        finally:
+            community.delete()
+            User.objects.filter(username__startswith='bench_likes_').delete()
+
+    def burst(self, post, profiles, threads):
+        factory = RequestFactory()
+
+        def like(profile):
+            request = factory.post('/')
+            request.user = profile.user
+            return api_like_post(request, post.id).status_code
+
+        def worker(chunk):
+            try:
+                return sum(like(profile) != 200 for profile in chunk)
+            finally:
+                connection.close()
+
+        chunks = [profiles[i::threads] for i in range(threads)]
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return sum(pool.map(worker, chunks))
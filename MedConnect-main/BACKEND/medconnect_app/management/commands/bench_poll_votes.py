@@ -0,0 +1,71 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory
+from medconnect_app.api_views import api_vote_poll, _create_poll
+from medconnect_app.models import Community, CommunityPost, Poll, PollOptionCounter, PollVote
+from ._bench import make_profiles
+
+
+class Command(BaseCommand):
+    help = 'Concurrency benchmark of poll voting with one counter row per option vs sharded counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voters', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--shards', nargs='+', type=int, default=[1, Poll.DEFAULT_COUNTER_SHARDS],
+                            help='Counter shard counts to compare')
+
+    def handle(self, *args, **options):
+        # Worker threads use their own connections, so the rows they write
+        # must be committed; everything is deleted again at the end.
+        profiles = make_profiles(options['voters'], prefix='bench_polls')
+        community = Community.objects.create(name='Bench polls', description='Benchmark community',
+                                             category='General', created_by=profiles[0])
+        try:
+            self.stdout.write(f"{'shards':>7} {'votes':>7} {'errors':>7} {'seconds':>9} {'votes/s':>9} {'tallied':>8}")
+            for shards in options['shards']:
+                post = CommunityPost.objects.create(community=community, author=profiles[0], content='Poll post')
+                poll = _create_poll(post, 'Which side effects did you have?', ['Fatigue', 'Nausea', 'Hair loss'])
+                Poll.objects.filter(pk=poll.pk).update(counter_shards=shards)
+                poll.counter_shards = shards
+                PollOptionCounter.objects.filter(option__poll=poll, shard__gte=shards).delete()
+
+                start = time.perf_counter()
+                errors = self.burst(post, poll, profiles, options['threads'])
+                elapsed = time.perf_counter() - start
+
+                votes = PollVote.objects.filter(poll=poll).count()
+                tallied = PollOptionCounter.objects.filter(option__poll=poll).aggregate(total=Sum('votes'))['total']
+                if votes != tallied:
+                    self.stdout.write(self.style.WARNING(f'{shards} shards: tallied {tallied} != {votes} votes'))
+                self.stdout.write(f'{shards:>7} {votes:>7} {errors:>7} {elapsed:>9.2f} {votes / elapsed:>9.0f} {tallied:>8}')
+        finally:
+            community.delete()
+            User.objects.filter(username__startswith='bench_polls_').delete()
+
+    def burst(self, post, poll, profiles, threads):
+        factory = RequestFactory()
+        option_ids = list(poll.options.values_list('id', flat=True))
+
+        def vote(index, profile):
+            body = json.dumps({'option_id': option_ids[index % len(option_ids)]})
+            request = factory.post('/', data=body, content_type='application/json')
+            request.user = profile.user
+            return api_vote_poll(request, post.id).status_code
+
+        def worker(chunk):
+            try:
+                return sum(vote(index, profile) != 200 for index, profile in chunk)
+            finally:
+                connection.close()
+
+        indexed = list(enumerate(profiles))
+        chunks = [indexed[i::threads] for i in range(threads)]
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return sum(pool.map(worker, chunks))
@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand
+from medconnect_app.api_views import _create_poll, _feed_posts_queryset, _post_to_dict, _projected_posts, _projected_posts_queryset
+from medconnect_app.models import (
+    Community, CommunityMembership, CommunityPost, PostAttachment, PostComment, PostLike, PostProjection,
+)
+from ._bench import rolled_back, measure, make_profiles, get_request
+
+
+class Command(BaseCommand):
+    help = 'Benchmark serializing a feed page per request vs splicing stored post projections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100, help='Posts on the page')
+        parser.add_argument('--comments', type=int, default=10, help='Top-level comments per post')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        size = options['posts']
+        self.stdout.write(f"{'path':<22} {'queries':>8} {'ms':>10} {'ms/100 posts':>13}")
+        with rolled_back():
+            viewer, community = self.seed(size, options['comments'])
+            request = get_request(viewer.user)
+            rows = [
+                ('serialize per request', lambda: self.serialized(request, viewer, community)),
+                ('projections, cold', lambda: self.projected(request, viewer, community, cold=True)),
+                ('projections, warm', lambda: self.projected(request, viewer, community)),
+            ]
+            for label, fn in rows:
+                queries, ms = measure(fn, options['repeat'])
+                self.stdout.write(f'{label:<22} {queries:>8} {ms:>10.1f} {ms * 100 / size:>13.1f}')
+
+    def serialized(self, request, viewer, community):
+        posts = _feed_posts_queryset(viewer).filter(community=community)
+        return ', '.join(json.dumps(_post_to_dict(post, request)) for post in posts)
+
+    def projected(self, request, viewer, community, cold=False):
+        if cold:
+            PostProjection.invalidate(CommunityPost.objects.filter(community=community).values('id'))
+        posts = list(_projected_posts_queryset(viewer).filter(community=community))
+        return ', '.join(_projected_posts(posts, request))
+
+    def seed(self, size, comments):
+        profiles = make_profiles(5, prefix='bench_serialize')
+        viewer = profiles[0]
+        community = Community.objects.create(name='Bench serialization', description='Benchmark community',
+                                             category='General', created_by=viewer)
+        CommunityMembership.objects.bulk_create([
+            CommunityMembership(community=community, member=profile) for profile in profiles
+        ])
+        CommunityPost.objects.bulk_create([
+            CommunityPost(community=community, author=profiles[i % len(profiles)],
+                          author_name=profiles[i % len(profiles)].display_name, author_role='patient',
+                          content=f'Benchmark post {i} about scan results, side effects and what helped. ' * 4)
+            for i in range(size)
+        ])
+        posts = list(CommunityPost.objects.filter(community=community))
+        PostLike.objects.bulk_create([PostLike(post=post, user=profile) for post in posts for profile in profiles[:2]])
+        PostComment.objects.bulk_create([
+            PostComment(post=post, author=profiles[i % len(profiles)], author_name=profiles[i % len(profiles)].display_name,
+                        author_role='patient', content='Benchmark comment with a few words of support')
+            for post in posts for i in range(comments)
+        ])
+        roots = list(PostComment.objects.filter(post__community=community).only('id'))
+        for comment in roots:
+            comment.path = PostComment.path_segment(comment.pk)
+        PostComment.objects.bulk_update(roots, ['path'])
+        PostAttachment.objects.bulk_create([
+            PostAttachment(post=post, file=f'community_attachments/bench_{post.id}.png', filename=f'bench_{post.id}.png',
+                           file_type='image/png')
+            for post in posts[::2]
+        ])
+        for post in posts[::10]:
+            _create_poll(post, 'Which treatment did you start with?', ['Surgery', 'Chemotherapy', 'Radiation'])
+        return viewer, community
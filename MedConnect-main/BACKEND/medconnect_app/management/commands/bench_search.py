@@ -0,0 +1,79 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from medconnect_app import search
+from medconnect_app.models import Community, CommunityPost
+from ._bench import rolled_back, measure, make_profiles
+
+VOCABULARY = (
+    'chemotherapy immunotherapy radiation fatigue nausea oncologist biopsy remission '
+    'tumor scan mri ct dosage side effects appetite sleep pain support family trial '
+    'surgery recovery hair loss insurance diet exercise anxiety caregiver clinic nurse '
+    'lymphoma melanoma leukemia breast lung colon prostate ovarian pancreatic stage'
+).split()
+
+# Zipf-like weights so early words are common and late ones rare, as in real text
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+QUERIES = ['chemotherapy', 'hair loss', 'lung trial fatigue', 'pancreatic stage']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text post search against an icontains scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--skip-memory', action='store_true',
+                            help='Skip the in-process index (slow to build at 1M posts)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with rolled_back():
+            self.seed(options['posts'], options['batch_size'], rng)
+            visible = CommunityPost.objects.all()
+
+            backends = [('database', search.get_backend())]
+            if not options['skip_memory'] and not isinstance(search.get_backend(), search.MemoryIndexBackend):
+                backends.append(('in-process', search.MemoryIndexBackend()))
+
+            self.stdout.write(f"{'backend':<34} {'query':<30} {'hits':>6} {'ms':>10}")
+            for label, backend in backends:
+                start = time.perf_counter()
+                backend.rebuild('post')
+                build_ms = (time.perf_counter() - start) * 1000
+                self.stdout.write(f'{label + " build":<34} {"":<30} {"":>6} {build_ms:>10.1f}')
+                for query in QUERIES:
+                    hits, ms = self.run_search(backend, query, visible, options['repeat'])
+                    self.stdout.write(f'{label + " (" + type(backend).__name__ + ")":<34} {query:<30} {hits:>6} {ms:>10.1f}')
+
+            for query in QUERIES:
+                qs = visible
+                for term in query.split():
+                    qs = qs.filter(content__icontains=term)
+                _, ms = measure(lambda: list(qs.order_by('-created_at')[:20]), options['repeat'])
+                self.stdout.write(f'{"icontains scan":<34} {query:<30} {"":>6} {ms:>10.1f}')
+
+    def run_search(self, backend, query, visible, repeat):
+        original = search._backend
+        search._backend = backend
+        try:
+            results = []
+            _, ms = measure(lambda: results.append(search.search('post', query, visible, limit=20)), repeat)
+        finally:
+            search._backend = original
+        return len(results[-1][0]), ms
+
+    def seed(self, count, batch_size, rng):
+        author = make_profiles(1, prefix='bench_search')[0]
+        community = Community.objects.create(name='Bench search', description='Benchmark community',
+                                             category='General', created_by=author)
+        self.stdout.write(f'Seeding {count} posts...')
+        for start in range(0, count, batch_size):
+            CommunityPost.objects.bulk_create([
+                CommunityPost(community=community, author=author,
+                              content=' '.join(rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(8, 40))))
+                for _ in range(min(batch_size, count - start))
+            ])
@@ -0,0 +1,72 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from medconnect_app.api_views import api_user_studies
+from medconnect_app.models import ResearchStudy, StudyParticipation
+from ._bench import rolled_back, measure, make_profiles, get_request
+
+
+class Command(BaseCommand):
+    help = ('Time api_user_studies against the per-row baseline as the number of studies grows '
+            '(the query count itself is guarded by medconnect_app.tests)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1, 10, 100, 1000],
+                            help='Studies per researcher (and applications per patient) to benchmark')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'studies':>8} {'path':<22} {'queries':>8} {'ms':>10}")
+        for size in options['sizes']:
+            with rolled_back():
+                researcher, patient = self.seed(size)
+                rows = [
+                    ('researcher', lambda: self.call(researcher)),
+                    ('researcher, per-row', lambda: self.legacy_researcher(researcher)),
+                    ('patient', lambda: self.call(patient)),
+                    ('patient, per-row', lambda: self.legacy_patient(patient)),
+                ]
+                for label, fn in rows:
+                    queries, ms = measure(fn, options['repeat'])
+                    self.stdout.write(f'{size:>8} {label:<22} {queries:>8} {ms:>10.1f}')
+
+    def call(self, profile):
+        response = api_user_studies(get_request(profile.user))
+        if response.status_code != 200:
+            raise CommandError(f'api_user_studies returned {response.status_code}: {response.content[:200]!r}')
+        return response
+
+    def seed(self, size):
+        researcher = make_profiles(1, prefix='bench_user_studies_researcher', role='researcher')[0]
+        patients = make_profiles(3, prefix='bench_user_studies_patient')
+        ResearchStudy.objects.bulk_create([
+            ResearchStudy(
+                title=f'Benchmark study {i}', description='Benchmark study', sponsor='Bench', location='Boston, MA',
+                eligibility_criteria='Adults with a confirmed diagnosis. ' * 50, primary_endpoint='Overall survival',
+                estimated_enrollment=100, start_date=datetime.date(2025, 1, 1),
+                estimated_completion_date=datetime.date(2027, 1, 1), contact_name='Bench',
+                contact_email='bench@example.com', contact_phone='555-0100', created_by=researcher,
+            )
+            for i in range(size)
+        ])
+        studies = list(ResearchStudy.objects.filter(created_by=researcher))
+        statuses = ['applied', 'screening', 'enrolled']
+        StudyParticipation.objects.bulk_create([
+            StudyParticipation(study=study, patient=patient, status=statuses[i % len(statuses)])
+            for study in studies for i, patient in enumerate(patients)
+        ])
+        return researcher, patients[0]
+
+    def legacy_researcher(self, researcher):
+        """The previous per-study count, kept as a baseline."""
+        return [
+            (study.title, StudyParticipation.objects.filter(study=study, status__in=['screening', 'enrolled']).count())
+            for study in ResearchStudy.objects.filter(created_by=researcher)
+        ]
+
+    def legacy_patient(self, patient):
+        """The previous lazy ``participation.study`` load, kept as a baseline."""
+        return [
+            (participation.status, participation.study.title)
+            for participation in StudyParticipation.objects.filter(patient=patient)
+        ]
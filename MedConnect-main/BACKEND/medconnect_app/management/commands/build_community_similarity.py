@@ -0,0 +1,67 @@
+from itertools import chain
+
+import numpy as np
+from scipy import sparse
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from medconnect_app.models import CommunityMembership, CommunitySimilarity
+
+class Command(BaseCommand):
+    help = 'Precompute community-to-community similarity from co-membership for suggested communities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20,
+                            help='Neighbours kept per community')
+        parser.add_argument('--min-shared', type=int, default=1,
+                            help='Ignore pairs with fewer members in common')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Loading memberships...')
+        pairs = CommunityMembership.objects.order_by().values_list('member_id', 'community_id')
+        memberships = np.fromiter(chain.from_iterable(pairs.iterator()), dtype=np.int64).reshape(-1, 2)
+
+        similarities = []
+        built_at = timezone.now()
+        if len(memberships):
+            community_ids, row, col, score = self.similarity(memberships, options['min_shared'], options['top'])
+            similarities = [
+                CommunitySimilarity(community_id=community_ids[i], similar_id=community_ids[j], score=s, built_at=built_at)
+                for i, j, s in zip(row.tolist(), col.tolist(), score.tolist())
+            ]
+
+        with transaction.atomic():
+            CommunitySimilarity.objects.all().delete()
+            CommunitySimilarity.objects.bulk_create(similarities, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {len(similarities)} similarities from {len(memberships)} memberships'
+        ))
+
+    def similarity(self, memberships, min_shared, top):
+        """Cosine similarity of community member sets, top neighbours per community.
+
+        Returns the community ids for matrix positions and parallel
+        (row, col, score) arrays, sorted by row then descending score.
+        """
+        member_ids, member_index = np.unique(memberships[:, 0], return_inverse=True)
+        community_ids, community_index = np.unique(memberships[:, 1], return_inverse=True)
+        # members x communities incidence matrix; its Gram matrix counts shared members
+        incidence = sparse.csr_matrix(
+            (np.ones(len(memberships), dtype=np.float64), (member_index, community_index)),
+            shape=(len(member_ids), len(community_ids)),
+        )
+        shared = (incidence.T @ incidence).tocoo()
+        sizes = np.asarray(incidence.sum(axis=0)).ravel()
+
+        keep = (shared.row != shared.col) & (shared.data >= min_shared)
+        row, col, common = shared.row[keep], shared.col[keep], shared.data[keep]
+        score = common / np.sqrt(sizes[row] * sizes[col])
+
+        # Rank within each row after sorting by (row, -score) and keep the top
+        order = np.lexsort((-score, row))
+        row, col, score = row[order], col[order], score[order]
+        rank = np.arange(len(row)) - np.searchsorted(row, row, side='left')
+        keep = rank < top
+        return community_ids.tolist(), row[keep], col[keep], score[keep]
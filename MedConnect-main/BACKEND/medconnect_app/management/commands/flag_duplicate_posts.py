@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from medconnect_app import duplicates
+from medconnect_app.models import CommunityPost
+
+class Command(BaseCommand):
+    help = ('Flag near-duplicates among recent posts by setting duplicate_of. Uses an index private to this '
+            'command; running servers keep their own in-process indexes, which this does not rebuild.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report duplicates without flagging them')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Scanning posts from the last {duplicates.WINDOW.days} days for near-duplicates...')
+        # Post id -> earliest post of its duplicate group
+        groups = {}
+        flagged = []
+        indexed = 0
+
+        def on_post(post, matches):
+            nonlocal indexed
+            indexed += 1
+            if post.duplicate_of_id:
+                groups[post.pk] = post.duplicate_of_id
+            elif matches:
+                best_id, similarity = matches[0]
+                groups[post.pk] = groups.get(best_id, best_id)
+                flagged.append(CommunityPost(id=post.pk, duplicate_of_id=groups[post.pk], duplicate_score=similarity))
+            else:
+                groups[post.pk] = post.pk
+
+        start = time.perf_counter()
+        duplicates.DuplicateIndex().rebuild(on_post)
+        elapsed = time.perf_counter() - start
+        per_post_us = elapsed / indexed * 1e6 if indexed else 0.0
+        self.stdout.write(f'Indexed {indexed} posts in {elapsed:.2f}s ({per_post_us:.0f} us per post)')
+
+        if not options['dry_run']:
+            CommunityPost.objects.bulk_update(flagged, ['duplicate_of', 'duplicate_score'], batch_size=options['batch_size'])
+        verb = 'Found' if options['dry_run'] else 'Flagged'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(flagged)} new near-duplicate posts'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from medconnect_app import search
+
+class Command(BaseCommand):
+    help = 'Repopulate the full-text search index for community posts and communities'
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        self.stdout.write(f'Rebuilding search index ({type(backend).__name__})...')
+        for kind in search.KINDS:
+            backend.rebuild(kind)
+            self.stdout.write(f'Rebuilt {kind} index')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from medconnect_app import matching
+from medconnect_app.models import ResearchStudy
+
+class Command(BaseCommand):
+    help = 'Recompile study eligibility rules and recompute every patient-to-study match score'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Compiling eligibility criteria...')
+        studies = list(ResearchStudy.objects.only('id', 'eligibility_criteria'))
+        for study in studies:
+            study.eligibility_rules = matching.compile_criteria(study.eligibility_criteria)
+        ResearchStudy.objects.bulk_update(studies, ['eligibility_rules'], batch_size=options['batch_size'])
+
+        start = time.perf_counter()
+        patients, recruiting, matches = matching.rebuild(options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {matches} matches for {patients} patients x {recruiting} recruiting studies in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from medconnect_app.models import CommunityPost, PostLike, PostComment
+
+class Command(BaseCommand):
+    help = 'Recompute CommunityPost like/comment counters from PostLike and PostComment rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of posts recomputed per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write('Reconciling post counters...')
+
+        checked = 0
+        fixed_count = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                # Lock the batch so concurrent F() updates wait for the fix
+                posts = list(
+                    CommunityPost.objects.select_for_update()
+                    .filter(id__gt=last_id).order_by('id')
+                    .only('id', 'like_count', 'comment_count')[:batch_size]
+                )
+                if not posts:
+                    break
+                ids = [post.id for post in posts]
+                likes = dict(
+                    PostLike.objects.filter(post_id__in=ids).order_by()
+                    .values_list('post_id').annotate(total=Count('id'))
+                )
+                comments = dict(
+                    PostComment.objects.filter(post_id__in=ids).order_by()
+                    .values_list('post_id').annotate(total=Count('id'))
+                )
+
+                drifted = []
+                for post in posts:
+                    like_count = likes.get(post.id, 0)
+                    comment_count = comments.get(post.id, 0)
+                    if post.like_count != like_count or post.comment_count != comment_count:
+                        post.like_count = like_count
+                        post.comment_count = comment_count
+                        drifted.append(post)
+                if drifted:
+                    CommunityPost.objects.bulk_update(drifted, ['like_count', 'comment_count'])
+
+            checked += len(posts)
+            fixed_count += len(drifted)
+            last_id = ids[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Checked {checked} posts, fixed {fixed_count} counters')
+        )
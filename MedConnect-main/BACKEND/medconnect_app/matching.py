@@ -0,0 +1,375 @@
+"""Patient-to-study eligibility matching.
+
+Each study's free-text ``eligibility_criteria`` is compiled into rules
+(stored on ResearchStudy.eligibility_rules): an age range, a required
+gender, the cancer types it enrolls and the allergens and active medications
+it excludes. Rules are evaluated for many patients against many studies at
+once over arrays: patients become a PatientFeatures matrix (age, gender
+code, one-hot cancer types and a column per exclusion term in play) and
+studies a StudyRules matrix, so scoring a block is a handful of broadcast
+comparisons and two boolean matrix products.
+
+Every predicate a study specifies either fails, which makes the patient
+ineligible, or is satisfied; one the study leaves out, or that the
+patient's profile can't answer, counts half. The weighted sum is the 0-100
+score. Eligible pairs scoring at least MIN_SCORE for recruiting studies are
+stored in StudyMatch, which is indexed from both sides: the signals in
+signals.py refresh a study's row set when its criteria or status change
+and a patient's when their profile, allergies or medications do, and
+`manage.py rebuild_study_matches` recomputes everything.
+"""
+import re
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+
+from .models import Allergy, Medication, PatientProfile, ResearchStudy, StudyMatch
+
+# Canonical cancer types with the phrases that name them in criteria.
+# Organ names alone ("adequate liver function") are not enough there, but
+# are what patients enter as their cancer type, so profiles also match the
+# canonical names themselves.
+CANCER_TYPES = {
+    'breast': ['breast'],
+    'lung': ['lung', 'nsclc', 'sclc'],
+    'colorectal': ['colorectal', 'colon', 'rectal'],
+    'prostate': ['prostate'],
+    'pancreatic': ['pancreatic', 'pancreas'],
+    'ovarian': ['ovarian', 'ovary'],
+    'cervical': ['cervical cancer', 'cervix'],
+    'uterine': ['uterine', 'endometrial'],
+    'melanoma': ['melanoma'],
+    'skin': ['skin cancer', 'basal cell', 'squamous cell skin'],
+    'leukemia': ['leukemia', 'leukaemia', 'aml', 'cll'],
+    'lymphoma': ['lymphoma', 'hodgkin'],
+    'myeloma': ['myeloma'],
+    'bladder': ['bladder cancer', 'urothelial'],
+    'kidney': ['kidney cancer', 'renal cell'],
+    'liver': ['liver cancer', 'hepatocellular'],
+    'thyroid': ['thyroid cancer'],
+    'brain': ['brain tumor', 'brain cancer', 'glioma', 'glioblastoma'],
+    'stomach': ['stomach cancer', 'gastric'],
+    'esophageal': ['esophageal', 'oesophageal'],
+    'head and neck': ['head and neck', 'throat cancer'],
+    'sarcoma': ['sarcoma'],
+    'testicular': ['testicular'],
+}
+_CANCER_INDEX = {name: i for i, name in enumerate(CANCER_TYPES)}
+_CANCER_BY_PHRASE = {phrase: name for name, phrases in CANCER_TYPES.items() for phrase in phrases}
+_PROFILE_CANCER_BY_PHRASE = {**{name: name for name in CANCER_TYPES}, **_CANCER_BY_PHRASE}
+
+
+def _phrase_re(phrases):
+    return re.compile(r'\b(' + '|'.join(sorted(map(re.escape, phrases), key=len, reverse=True)) + r')\b')
+
+
+_CANCER_RE = _phrase_re(_CANCER_BY_PHRASE)
+_PROFILE_CANCER_RE = _phrase_re(_PROFILE_CANCER_BY_PHRASE)
+
+GENDER_CODES = {'female': 1, 'male': 2}
+
+WEIGHTS = {'cancer': 0.5, 'age': 0.3, 'gender': 0.1, 'exclusions': 0.1}
+# Half credit for every predicate scores 50; storing only pairs above it
+# keeps studies with nothing parseable from matching every patient
+MIN_SCORE = 60
+# Patients scored per block, bounding the (patients x studies) arrays
+CHUNK_SIZE = 5000
+
+_EXCLUSION_RE = re.compile(r'\bexclu(?:sion|ded|de|ding)\b', re.I)
+# Ages only count next to "age" or "years", so "stage 2-3" or "at least 2
+# prior therapies" aren't read as ages
+_YEARS = r'\s*(?:years?|yrs?)'
+_AGE_RANGE_RE = re.compile(
+    r'\bage[ds]?\s*(?:between\s*)?(\d{1,3})\s*(?:-|–|to|and)\s*(\d{1,3})'
+    r'|\b(?:between\s*)?(\d{1,3})\s*(?:-|–|to|and)\s*(\d{1,3})' + _YEARS,
+    re.I,
+)
+_MIN_AGE_RE = re.compile(
+    r'\bage[ds]?\s*(?:of\s*)?(?:≥|>=|>|at least|over|above)\s*(\d{1,3})'
+    r'|(?:≥|>=|at least|over|older than)\s*(\d{1,3})' + _YEARS +
+    r'|(\d{1,3})\s*(?:\+\s*)?' + _YEARS + r'\s*(?:of age\s*)?(?:or|and)\s*(?:older|above|over)'
+    r'|\bage[ds]?\s*(\d{1,3})\s*\+',
+    re.I,
+)
+_MAX_AGE_RE = re.compile(
+    r'\bage[ds]?\s*(?:of\s*)?(?:≤|<=|<|under|below|up to|at most)\s*(\d{1,3})'
+    r'|(?:≤|<=|under|younger than|up to|no older than)\s*(\d{1,3})' + _YEARS +
+    r'|(\d{1,3})' + _YEARS + r'\s*(?:of age\s*)?or\s*(?:younger|less|below)',
+    re.I,
+)
+_FEMALE_RE = re.compile(r'\b(?:female|females|women|woman)\b', re.I)
+_MALE_RE = re.compile(r'\b(?:male|males|men|man)\b', re.I)
+_ALLERGEN_RE = re.compile(r'\b(?:allerg(?:y|ies|ic)|hypersensitivity|intolerance)\s+(?:to\s+)?([^.;:\n]+)', re.I)
+_MEDICATION_RE = re.compile(
+    r'\b(?:currently\s+)?(?:taking|receiving|treated with|treatment with|use of|using|on)\s+([^.;:\n]+)', re.I
+)
+_LIST_SPLIT_RE = re.compile(r'\s*(?:,|/|\bor\b|\band\b)\s*', re.I)
+_TERM_STOPWORDS = {
+    'a', 'an', 'the', 'any', 'known', 'other', 'prior', 'current', 'drug', 'drugs', 'medication', 'medications',
+    'therapy', 'agents', 'products', 'components', 'its', 'of', 'study',
+}
+
+
+def _normalize(text):
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def _terms(phrase):
+    terms = []
+    for part in _LIST_SPLIT_RE.split(phrase):
+        term = ' '.join(word for word in _normalize(part).split() if word not in _TERM_STOPWORDS)
+        if len(term) > 2:
+            terms.append(term)
+    return terms
+
+
+def _first_age(match):
+    return int(next(group for group in match.groups() if group is not None))
+
+
+def cancer_types(text, profile=False):
+    """Canonical cancer types named in criteria ``text``, or in a profile's cancer type."""
+    pattern, phrases = (_PROFILE_CANCER_RE, _PROFILE_CANCER_BY_PHRASE) if profile else (_CANCER_RE, _CANCER_BY_PHRASE)
+    return sorted({phrases[phrase] for phrase in pattern.findall(_normalize(text))})
+
+
+def compile_criteria(text):
+    """Compile free-text eligibility criteria into the rules dict stored on a study.
+
+    Text after the first mention of exclusion is the exclusion section:
+    allergens and medications are only read from there, and cancer types,
+    ages and gender only from the inclusion text before it.
+    """
+    text = text or ''
+    split = _EXCLUSION_RE.search(text)
+    inclusion, exclusion = (text[:split.start()], text[split.end():]) if split else (text, '')
+
+    min_age = max_age = None
+    ages = _AGE_RANGE_RE.search(inclusion)
+    if ages:
+        low, high = (int(group) for group in ages.groups() if group is not None)
+        if low <= high:
+            min_age, max_age = low, high
+    if min_age is None:
+        lower = _MIN_AGE_RE.search(inclusion)
+        upper = _MAX_AGE_RE.search(inclusion)
+        min_age = _first_age(lower) if lower else None
+        max_age = _first_age(upper) if upper else None
+
+    female, male = bool(_FEMALE_RE.search(inclusion)), bool(_MALE_RE.search(inclusion))
+    gender = 'female' if female and not male else 'male' if male and not female else None
+
+    return {
+        'min_age': min_age,
+        'max_age': max_age,
+        'gender': gender,
+        'cancer_types': cancer_types(inclusion),
+        'excluded_allergens': sorted({term for phrase in _ALLERGEN_RE.findall(exclusion) for term in _terms(phrase)}),
+        'excluded_medications': sorted({term for phrase in _MEDICATION_RE.findall(exclusion) for term in _terms(phrase)}),
+    }
+
+
+def _term_keys(rules):
+    return [('allergy', term) for term in rules.get('excluded_allergens', [])] + \
+        [('medication', term) for term in rules.get('excluded_medications', [])]
+
+
+def _name_terms(name):
+    """Every 1-3 word run of a normalized allergen or medication name."""
+    words = _normalize(name).split()
+    return {' '.join(words[i:i + n]) for n in (1, 2, 3) for i in range(len(words) - n + 1)}
+
+
+class StudyRules:
+    """Compiled rules of S studies as arrays, plus the exclusion term vocabulary."""
+
+    def __init__(self, study_ids, rules):
+        count = len(study_ids)
+        self.study_ids = np.asarray(study_ids, dtype=np.int64)
+        self.terms = {}
+        for study_rules in rules:
+            for key in _term_keys(study_rules):
+                self.terms.setdefault(key, len(self.terms))
+
+        self.min_age = np.full(count, -np.inf)
+        self.max_age = np.full(count, np.inf)
+        self.gender = np.zeros(count, dtype=np.int8)
+        self.cancer = np.zeros((count, len(CANCER_TYPES)), dtype=bool)
+        self.excluded = np.zeros((count, len(self.terms)), dtype=bool)
+        for i, study_rules in enumerate(rules):
+            if study_rules.get('min_age') is not None:
+                self.min_age[i] = study_rules['min_age']
+            if study_rules.get('max_age') is not None:
+                self.max_age[i] = study_rules['max_age']
+            self.gender[i] = GENDER_CODES.get(study_rules.get('gender'), 0)
+            for name in study_rules.get('cancer_types', []):
+                if name in _CANCER_INDEX:
+                    self.cancer[i, _CANCER_INDEX[name]] = True
+            for key in _term_keys(study_rules):
+                self.excluded[i, self.terms[key]] = True
+
+    @classmethod
+    def recruiting(cls):
+        rows = ResearchStudy.objects.filter(status='recruiting').order_by('id').values_list('id', 'eligibility_rules')
+        study_ids, rules = zip(*rows) if rows else ((), ())
+        return cls(study_ids, rules)
+
+    def __len__(self):
+        return len(self.study_ids)
+
+
+class PatientFeatures:
+    """P patients as arrays, with one column per exclusion term of ``terms``."""
+
+    def __init__(self, profile_ids, ages, genders, cancer, term_hits):
+        self.profile_ids = profile_ids
+        self.ages = ages
+        self.genders = genders
+        self.cancer = cancer
+        self.cancer_known = cancer.any(axis=1)
+        self.term_hits = term_hits
+
+    @classmethod
+    def load(cls, patients, terms, today=None):
+        """Features of the PatientProfiles in ``patients`` (a queryset)."""
+        today = np.datetime64(today or date.today(), 'D')
+        rows = list(patients.order_by('profile_id').values_list(
+            'profile_id', 'date_of_birth', 'gender', 'cancer_type', 'allergies'
+        ))
+        count = len(rows)
+        profile_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        births = np.array([row[1] or 'NaT' for row in rows], dtype='datetime64[D]').reshape(count)
+        ages = np.where(np.isnat(births), np.nan, (today - births).astype('float64') / 365.25)
+        genders = np.array([GENDER_CODES.get(_gender_name(row[2]), 0) for row in rows], dtype=np.int8).reshape(count)
+        cancer = np.zeros((count, len(CANCER_TYPES)), dtype=bool)
+        term_hits = np.zeros((count, len(terms)), dtype=bool)
+        position = {profile_id: i for i, profile_id in enumerate(profile_ids.tolist())}
+        for i, row in enumerate(rows):
+            for name in cancer_types(row[3] or '', profile=True):
+                cancer[i, _CANCER_INDEX[name]] = True
+
+        if terms and count:
+            def mark(kind, pairs):
+                for profile_id, name in pairs:
+                    for term in _name_terms(name):
+                        column = terms.get((kind, term))
+                        if column is not None:
+                            term_hits[position[profile_id], column] = True
+
+            # The free-text allergy field on the profile counts too
+            mark('allergy', ((row[0], part) for row in rows for part in re.split(r'[,;\n]', row[4] or '')))
+            owners = {'patient_id__gte': profile_ids[0], 'patient_id__lte': profile_ids[-1]}
+            mark('allergy', (
+                pair for pair in Allergy.objects.filter(**owners).values_list('patient_id', 'allergen')
+                if pair[0] in position
+            ))
+            mark('medication', (
+                pair for pair in Medication.objects.filter(status='active', **owners).values_list('patient_id', 'name')
+                if pair[0] in position
+            ))
+        return cls(profile_ids, ages, genders, cancer, term_hits)
+
+    def __len__(self):
+        return len(self.profile_ids)
+
+
+def _gender_name(gender):
+    gender = (gender or '').strip().lower()
+    return {'f': 'female', 'woman': 'female', 'm': 'male', 'man': 'male'}.get(gender, gender)
+
+
+def score(patients, studies):
+    """(P, S) int array of match scores, -1 where the patient is ineligible."""
+    half = 0.5
+    ineligible = np.zeros((len(patients), len(studies)), dtype=bool)
+    total = np.zeros((len(patients), len(studies)))
+
+    ages = patients.ages[:, None]
+    age_known = ~np.isnan(ages)
+    age_specified = np.isfinite(studies.min_age) | np.isfinite(studies.max_age)
+    with np.errstate(invalid='ignore'):
+        age_ok = (ages >= studies.min_age) & (ages < studies.max_age + 1)
+    age_decided = age_known & age_specified
+    ineligible |= age_decided & ~age_ok
+    total += WEIGHTS['age'] * np.where(age_decided, 1.0, half)
+
+    genders = patients.genders[:, None]
+    gender_decided = (genders > 0) & (studies.gender > 0)
+    ineligible |= gender_decided & (genders != studies.gender)
+    total += WEIGHTS['gender'] * np.where(gender_decided, 1.0, half)
+
+    cancer_hit = (patients.cancer.astype(np.float32) @ studies.cancer.T.astype(np.float32)) > 0
+    cancer_decided = patients.cancer_known[:, None] & studies.cancer.any(axis=1)
+    ineligible |= cancer_decided & ~cancer_hit
+    total += WEIGHTS['cancer'] * np.where(cancer_decided, 1.0, half)
+
+    excluded = (patients.term_hits.astype(np.float32) @ studies.excluded.T.astype(np.float32)) > 0
+    ineligible |= excluded
+    total += WEIGHTS['exclusions'] * np.where(studies.excluded.any(axis=1), 1.0, half)
+
+    scores = np.rint(total * 100).astype(np.int16)
+    scores[ineligible] = -1
+    return scores
+
+
+def _matches(patients, studies):
+    scores = score(patients, studies)
+    rows, cols = np.nonzero(scores >= MIN_SCORE)
+    return [
+        StudyMatch(study_id=study_id, patient_id=profile_id, score=value)
+        for study_id, profile_id, value in zip(
+            studies.study_ids[cols].tolist(), patients.profile_ids[rows].tolist(), scores[rows, cols].tolist()
+        )
+    ]
+
+
+def _patient_chunks(terms):
+    """PatientFeatures for every patient, CHUNK_SIZE at a time in profile_id order."""
+    last_id = 0
+    while True:
+        ids = list(PatientProfile.objects.filter(profile_id__gt=last_id).order_by('profile_id').values_list(
+            'profile_id', flat=True
+        )[:CHUNK_SIZE])
+        if not ids:
+            return
+        yield PatientFeatures.load(PatientProfile.objects.filter(profile_id__gte=ids[0], profile_id__lte=ids[-1]), terms)
+        last_id = ids[-1]
+
+
+def refresh_study(study):
+    """Recompute ``study``'s matches against every patient."""
+    with transaction.atomic():
+        StudyMatch.objects.filter(study=study).delete()
+        if study.status != 'recruiting':
+            return
+        studies = StudyRules([study.pk], [study.eligibility_rules or compile_criteria(study.eligibility_criteria)])
+        for patients in _patient_chunks(studies.terms):
+            StudyMatch.objects.bulk_create(_matches(patients, studies), batch_size=1000)
+
+
+def refresh_patient(profile_id):
+    """Recompute one patient's matches against every recruiting study."""
+    with transaction.atomic():
+        StudyMatch.objects.filter(patient_id=profile_id).delete()
+        studies = StudyRules.recruiting()
+        if not len(studies):
+            return
+        patients = PatientFeatures.load(PatientProfile.objects.filter(profile_id=profile_id), studies.terms)
+        StudyMatch.objects.bulk_create(_matches(patients, studies), batch_size=1000)
+
+
+def rebuild(batch_size=1000):
+    """Recompute every match; returns ``(patients, studies, matches)`` counts."""
+    studies = StudyRules.recruiting()
+    patient_count = match_count = 0
+    with transaction.atomic():
+        StudyMatch.objects.all().delete()
+        if not len(studies):
+            return 0, 0, 0
+        for patients in _patient_chunks(studies.terms):
+            matches = _matches(patients, studies)
+            StudyMatch.objects.bulk_create(matches, batch_size=batch_size)
+            patient_count += len(patients)
+            match_count += len(matches)
+    return patient_count, len(studies), match_count
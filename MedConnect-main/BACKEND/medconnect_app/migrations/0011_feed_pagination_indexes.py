@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0010_appointment_study_studydocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='communitypost',
+            index=models.Index(fields=['community', '-created_at', '-id'], name='communitypost_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='postcomment_page_idx'),
+        ),
+    ]
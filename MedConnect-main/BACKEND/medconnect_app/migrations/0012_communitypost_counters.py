@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_post_counters(apps, schema_editor):
+    CommunityPost = apps.get_model('medconnect_app', 'CommunityPost')
+    PostLike = apps.get_model('medconnect_app', 'PostLike')
+    PostComment = apps.get_model('medconnect_app', 'PostComment')
+    like_totals = PostLike.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('id')).values('total')
+    comment_totals = PostComment.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('id')).values('total')
+    CommunityPost.objects.update(
+        like_count=Coalesce(Subquery(like_totals), 0),
+        comment_count=Coalesce(Subquery(comment_totals), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0011_feed_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitypost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_post_counters, migrations.RunPython.noop),
+    ]
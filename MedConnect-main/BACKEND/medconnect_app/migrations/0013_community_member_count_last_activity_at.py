@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_community_activity(apps, schema_editor):
+    Community = apps.get_model('medconnect_app', 'Community')
+    CommunityMembership = apps.get_model('medconnect_app', 'CommunityMembership')
+    CommunityPost = apps.get_model('medconnect_app', 'CommunityPost')
+    member_totals = CommunityMembership.objects.filter(community=OuterRef('pk')).order_by().values('community').annotate(total=Count('id')).values('total')
+    latest_post_at = CommunityPost.objects.filter(community=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+    Community.objects.update(
+        member_count=Coalesce(Subquery(member_totals), 0),
+        last_activity_at=Coalesce(Subquery(latest_post_at), F('created_at')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0012_communitypost_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['-last_activity_at'], name='community_activity_idx'),
+        ),
+        migrations.RunPython(backfill_community_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+FTS_TABLES = {
+    'medconnect_app_post_fts': "SELECT id, content FROM medconnect_app_communitypost",
+    'medconnect_app_community_fts': "SELECT id, name || ' ' || description FROM medconnect_app_community",
+}
+
+MYSQL_FULLTEXT_INDEXES = {
+    'communitypost_content_ft': ('medconnect_app_communitypost', 'content'),
+    'community_text_ft': ('medconnect_app_community', 'name, description'),
+}
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        # Builds without FTS5 fall back to the in-process index in search.py
+        if not sqlite_has_fts5(connection):
+            return
+        for table, source in FTS_TABLES.items():
+            schema_editor.execute(f"CREATE VIRTUAL TABLE {table} USING fts5(body, tokenize='porter unicode61')")
+            schema_editor.execute(f"INSERT INTO {table}(rowid, body) {source}")
+    elif connection.vendor == 'mysql':
+        for name, (table, columns) in MYSQL_FULLTEXT_INDEXES.items():
+            schema_editor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({columns})")
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        for table in FTS_TABLES:
+            schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+    elif connection.vendor == 'mysql':
+        for name, (table, columns) in MYSQL_FULLTEXT_INDEXES.items():
+            schema_editor.execute(f"ALTER TABLE {table} DROP INDEX {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0013_community_member_count_last_activity_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tags(apps, schema_editor):
+    Community = apps.get_model('medconnect_app', 'Community')
+    Tag = apps.get_model('medconnect_app', 'Tag')
+    CommunityTag = apps.get_model('medconnect_app', 'CommunityTag')
+    links = {}
+    for community_id, tags in Community.objects.values_list('id', 'tags'):
+        names = {str(tag).strip().lower()[:100] for tag in (tags or []) if str(tag).strip()}
+        for name in names:
+            links.setdefault(name, []).append(community_id)
+    for name, community_ids in links.items():
+        tag = Tag.objects.create(name=name, community_count=len(community_ids))
+        CommunityTag.objects.bulk_create([
+            CommunityTag(tag=tag, community_id=community_id) for community_id in community_ids
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0014_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('community_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-community_count', 'name'],
+                'indexes': [models.Index(fields=['-community_count'], name='tag_cloud_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CommunityTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='medconnect_app.community')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='community_links', to='medconnect_app.tag')),
+            ],
+            options={
+                'unique_together': {('tag', 'community')},
+            },
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
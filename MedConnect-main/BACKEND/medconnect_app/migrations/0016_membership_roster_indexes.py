@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0015_tag_communitytag'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='communitymembership',
+            index=models.Index(fields=['community', '-joined_at', '-id'], name='membership_roster_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='communitymembership',
+            index=models.Index(fields=['community', 'is_moderator', '-joined_at', '-id'], name='membership_mod_roster_idx'),
+        ),
+    ]
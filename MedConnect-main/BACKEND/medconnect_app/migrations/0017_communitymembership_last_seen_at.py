@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0016_membership_roster_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitymembership',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Cast, Concat, LPad
+
+
+def backfill_comment_paths(apps, schema_editor):
+    # Existing comments are flat, so each one becomes a top-level thread
+    PostComment = apps.get_model('medconnect_app', 'PostComment')
+    PostComment.objects.update(
+        path=Concat(LPad(Cast('id', models.CharField()), 10, Value('0')), Value('/'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0017_communitymembership_last_seen_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='postcomment',
+            name='postcomment_page_idx',
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='medconnect_app.postcomment'),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='path',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='postcomment_toplevel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'path'], name='postcomment_thread_idx'),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
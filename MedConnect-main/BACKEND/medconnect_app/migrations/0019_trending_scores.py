@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:19
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.db import migrations, models
+
+# Frozen copy of the trending.py scoring this backfill was written against
+HALF_LIFE = timedelta(hours=24)
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WEIGHTS = {'community': 1.0, 'post': 1.0, 'like': 1.0, 'comment': 2.0}
+
+
+def event_score(event, at):
+    return math.log2(WEIGHTS[event]) + (at - EPOCH) / HALF_LIFE
+
+
+def combine(scores):
+    top = max(scores)
+    return top + math.log2(sum(2.0 ** (score - top) for score in scores))
+
+
+def backfill_trending_scores(apps, schema_editor):
+    Community = apps.get_model('medconnect_app', 'Community')
+    CommunityPost = apps.get_model('medconnect_app', 'CommunityPost')
+    PostLike = apps.get_model('medconnect_app', 'PostLike')
+    PostComment = apps.get_model('medconnect_app', 'PostComment')
+
+    post_events = defaultdict(list)
+    post_community = {}
+    for post_id, community_id, created_at in CommunityPost.objects.values_list('id', 'community_id', 'created_at').iterator():
+        post_community[post_id] = community_id
+        post_events[post_id].append(event_score('post', created_at))
+    for event, model in (('like', PostLike), ('comment', PostComment)):
+        for post_id, created_at in model.objects.values_list('post_id', 'created_at').iterator():
+            post_events[post_id].append(event_score(event, created_at))
+
+    community_events = defaultdict(list)
+    for community_id, created_at in Community.objects.values_list('id', 'created_at').iterator():
+        community_events[community_id].append(event_score('community', created_at))
+    for post_id, scores in post_events.items():
+        community_events[post_community[post_id]].extend(scores)
+
+    CommunityPost.objects.bulk_update(
+        [CommunityPost(id=post_id, trending_score=combine(scores)) for post_id, scores in post_events.items()],
+        ['trending_score'], batch_size=1000,
+    )
+    Community.objects.bulk_update(
+        [Community(id=community_id, trending_score=combine(scores)) for community_id, scores in community_events.items()],
+        ['trending_score'], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0018_threaded_comments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='trending_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='trending_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['-trending_score', '-id'], name='community_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='communitypost',
+            index=models.Index(fields=['-trending_score', '-id'], name='communitypost_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='communitypost',
+            index=models.Index(fields=['community', '-trending_score', '-id'], name='communitypost_comm_trend_idx'),
+        ),
+        migrations.RunPython(backfill_trending_scores, migrations.RunPython.noop),
+    ]
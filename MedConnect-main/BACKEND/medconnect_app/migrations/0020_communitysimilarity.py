@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0019_trending_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunitySimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='medconnect_app.community')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='medconnect_app.community')),
+            ],
+            options={
+                'unique_together': {('community', 'similar')},
+            },
+        ),
+    ]
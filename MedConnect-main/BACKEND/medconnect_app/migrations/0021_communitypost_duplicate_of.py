@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0020_communitysimilarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitypost',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='medconnect_app.communitypost'),
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='duplicate_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='communitypost',
+            index=models.Index(condition=models.Q(('duplicate_of__isnull', False)), fields=['community', '-created_at', '-id'], name='communitypost_dupes_idx'),
+        ),
+    ]
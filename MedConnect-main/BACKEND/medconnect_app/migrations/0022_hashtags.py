@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:26
+
+import math
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of the search.py hashtag parser and the trending.py post
+# score this backfill was written against
+HASHTAG_RE = re.compile(r'(?<!\w)#(\w*[^\W\d_]\w*)')
+HALF_LIFE = timedelta(hours=24)
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def hashtags(text):
+    names = []
+    for match in HASHTAG_RE.findall(text or ''):
+        name = match.lower()[:100]
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def post_score(at):
+    return (at - EPOCH) / HALF_LIFE
+
+
+def combine(scores):
+    scores = list(scores)
+    top = max(scores)
+    return top + math.log2(sum(2.0 ** (score - top) for score in scores))
+
+
+def backfill_hashtags(apps, schema_editor):
+    CommunityPost = apps.get_model('medconnect_app', 'CommunityPost')
+    Hashtag = apps.get_model('medconnect_app', 'Hashtag')
+    PostHashtag = apps.get_model('medconnect_app', 'PostHashtag')
+
+    uses = defaultdict(list)
+    for post_id, content, created_at in CommunityPost.objects.values_list('id', 'content', 'created_at').iterator():
+        for name in hashtags(content):
+            uses[name].append((post_id, created_at))
+    Hashtag.objects.bulk_create([
+        Hashtag(
+            name=name,
+            post_count=len(posts),
+            trending_score=combine(post_score(created_at) for _, created_at in posts),
+        )
+        for name, posts in uses.items()
+    ], batch_size=1000)
+    hashtag_ids = dict(Hashtag.objects.values_list('name', 'id'))
+    PostHashtag.objects.bulk_create([
+        PostHashtag(hashtag_id=hashtag_ids[name], post_id=post_id, created_at=created_at)
+        for name, posts in uses.items() for post_id, created_at in posts
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0021_communitypost_duplicate_of'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('trending_score', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-trending_score', '-id'], name='hashtag_trending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='medconnect_app.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_links', to='medconnect_app.communitypost')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', '-created_at', '-id'], name='posthashtag_feed_idx')],
+                'unique_together': {('post', 'hashtag')},
+            },
+        ),
+        migrations.RunPython(backfill_hashtags, migrations.RunPython.noop),
+    ]
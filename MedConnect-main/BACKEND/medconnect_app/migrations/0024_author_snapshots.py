@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:30
+
+from django.db import migrations, models
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Left, NullIf, Trim
+
+
+def backfill_author_snapshots(apps, schema_editor):
+    Profile = apps.get_model('medconnect_app', 'Profile')
+    # Same as Profile.display_name: the full name, else the username
+    authors = Profile.objects.filter(pk=OuterRef('author_id')).annotate(
+        display_name=Left(Coalesce(
+            NullIf(Trim(Concat('user__first_name', Value(' '), 'user__last_name', output_field=CharField())), Value('')),
+            'user__username',
+        ), 255)
+    )
+    for model_name in ('CommunityPost', 'PostComment'):
+        apps.get_model('medconnect_app', model_name).objects.update(
+            author_name=Subquery(authors.values('display_name')[:1]),
+            author_role=Subquery(authors.values('role')[:1]),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0023_polls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitypost',
+            name='author_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='author_role',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='author_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='author_role',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.RunPython(backfill_author_snapshots, migrations.RunPython.noop),
+    ]
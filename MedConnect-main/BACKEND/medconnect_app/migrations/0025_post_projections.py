@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0024_author_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostProjection',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='projection', serialize=False, to='medconnect_app.communitypost')),
+                ('version', models.PositiveIntegerField()),
+                ('payload', models.TextField()),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='render_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
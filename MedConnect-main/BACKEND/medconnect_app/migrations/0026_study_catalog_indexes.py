@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0025_post_projections'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='researchstudy',
+            index=models.Index(fields=['-created_at', '-id'], name='researchstudy_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='researchstudy',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='researchstudy_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='researchstudy',
+            index=models.Index(fields=['status', 'phase', '-created_at', '-id'], name='researchstudy_catalog_idx'),
+        ),
+    ]
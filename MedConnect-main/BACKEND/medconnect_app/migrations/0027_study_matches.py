@@ -0,0 +1,167 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:39
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the matching.py criteria compiler this backfill was written
+# against; later changes to matching.py must not change what it stores.
+CANCER_TYPES = {
+    'breast': ['breast'],
+    'lung': ['lung', 'nsclc', 'sclc'],
+    'colorectal': ['colorectal', 'colon', 'rectal'],
+    'prostate': ['prostate'],
+    'pancreatic': ['pancreatic', 'pancreas'],
+    'ovarian': ['ovarian', 'ovary'],
+    'cervical': ['cervical cancer', 'cervix'],
+    'uterine': ['uterine', 'endometrial'],
+    'melanoma': ['melanoma'],
+    'skin': ['skin cancer', 'basal cell', 'squamous cell skin'],
+    'leukemia': ['leukemia', 'leukaemia', 'aml', 'cll'],
+    'lymphoma': ['lymphoma', 'hodgkin'],
+    'myeloma': ['myeloma'],
+    'bladder': ['bladder cancer', 'urothelial'],
+    'kidney': ['kidney cancer', 'renal cell'],
+    'liver': ['liver cancer', 'hepatocellular'],
+    'thyroid': ['thyroid cancer'],
+    'brain': ['brain tumor', 'brain cancer', 'glioma', 'glioblastoma'],
+    'stomach': ['stomach cancer', 'gastric'],
+    'esophageal': ['esophageal', 'oesophageal'],
+    'head and neck': ['head and neck', 'throat cancer'],
+    'sarcoma': ['sarcoma'],
+    'testicular': ['testicular'],
+}
+_CANCER_BY_PHRASE = {phrase: name for name, phrases in CANCER_TYPES.items() for phrase in phrases}
+
+
+def _phrase_re(phrases):
+    return re.compile(r'\b(' + '|'.join(sorted(map(re.escape, phrases), key=len, reverse=True)) + r')\b')
+
+
+_CANCER_RE = _phrase_re(_CANCER_BY_PHRASE)
+
+_EXCLUSION_RE = re.compile(r'\bexclu(?:sion|ded|de|ding)\b', re.I)
+# Ages only count next to "age" or "years", so "stage 2-3" or "at least 2
+# prior therapies" aren't read as ages
+_YEARS = r'\s*(?:years?|yrs?)'
+_AGE_RANGE_RE = re.compile(
+    r'\bage[ds]?\s*(?:between\s*)?(\d{1,3})\s*(?:-|–|to|and)\s*(\d{1,3})'
+    r'|\b(?:between\s*)?(\d{1,3})\s*(?:-|–|to|and)\s*(\d{1,3})' + _YEARS,
+    re.I,
+)
+_MIN_AGE_RE = re.compile(
+    r'\bage[ds]?\s*(?:of\s*)?(?:≥|>=|>|at least|over|above)\s*(\d{1,3})'
+    r'|(?:≥|>=|at least|over|older than)\s*(\d{1,3})' + _YEARS +
+    r'|(\d{1,3})\s*(?:\+\s*)?' + _YEARS + r'\s*(?:of age\s*)?(?:or|and)\s*(?:older|above|over)'
+    r'|\bage[ds]?\s*(\d{1,3})\s*\+',
+    re.I,
+)
+_MAX_AGE_RE = re.compile(
+    r'\bage[ds]?\s*(?:of\s*)?(?:≤|<=|<|under|below|up to|at most)\s*(\d{1,3})'
+    r'|(?:≤|<=|under|younger than|up to|no older than)\s*(\d{1,3})' + _YEARS +
+    r'|(\d{1,3})' + _YEARS + r'\s*(?:of age\s*)?or\s*(?:younger|less|below)',
+    re.I,
+)
+_FEMALE_RE = re.compile(r'\b(?:female|females|women|woman)\b', re.I)
+_MALE_RE = re.compile(r'\b(?:male|males|men|man)\b', re.I)
+_ALLERGEN_RE = re.compile(r'\b(?:allerg(?:y|ies|ic)|hypersensitivity|intolerance)\s+(?:to\s+)?([^.;:\n]+)', re.I)
+_MEDICATION_RE = re.compile(
+    r'\b(?:currently\s+)?(?:taking|receiving|treated with|treatment with|use of|using|on)\s+([^.;:\n]+)', re.I
+)
+_LIST_SPLIT_RE = re.compile(r'\s*(?:,|/|\bor\b|\band\b)\s*', re.I)
+_TERM_STOPWORDS = {
+    'a', 'an', 'the', 'any', 'known', 'other', 'prior', 'current', 'drug', 'drugs', 'medication', 'medications',
+    'therapy', 'agents', 'products', 'components', 'its', 'of', 'study',
+}
+
+
+def _normalize(text):
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def _terms(phrase):
+    terms = []
+    for part in _LIST_SPLIT_RE.split(phrase):
+        term = ' '.join(word for word in _normalize(part).split() if word not in _TERM_STOPWORDS)
+        if len(term) > 2:
+            terms.append(term)
+    return terms
+
+
+def _first_age(match):
+    return int(next(group for group in match.groups() if group is not None))
+
+
+def compile_criteria(text):
+    """Compile free-text eligibility criteria into the rules dict stored on a study.
+
+    Text after the first mention of exclusion is the exclusion section:
+    allergens and medications are only read from there, and cancer types,
+    ages and gender only from the inclusion text before it.
+    """
+    text = text or ''
+    split = _EXCLUSION_RE.search(text)
+    inclusion, exclusion = (text[:split.start()], text[split.end():]) if split else (text, '')
+
+    min_age = max_age = None
+    ages = _AGE_RANGE_RE.search(inclusion)
+    if ages:
+        low, high = (int(group) for group in ages.groups() if group is not None)
+        if low <= high:
+            min_age, max_age = low, high
+    if min_age is None:
+        lower = _MIN_AGE_RE.search(inclusion)
+        upper = _MAX_AGE_RE.search(inclusion)
+        min_age = _first_age(lower) if lower else None
+        max_age = _first_age(upper) if upper else None
+
+    female, male = bool(_FEMALE_RE.search(inclusion)), bool(_MALE_RE.search(inclusion))
+    gender = 'female' if female and not male else 'male' if male and not female else None
+
+    return {
+        'min_age': min_age,
+        'max_age': max_age,
+        'gender': gender,
+        'cancer_types': sorted({_CANCER_BY_PHRASE[phrase] for phrase in _CANCER_RE.findall(_normalize(inclusion))}),
+        'excluded_allergens': sorted({term for phrase in _ALLERGEN_RE.findall(exclusion) for term in _terms(phrase)}),
+        'excluded_medications': sorted({term for phrase in _MEDICATION_RE.findall(exclusion) for term in _terms(phrase)}),
+    }
+
+
+def compile_eligibility_rules(apps, schema_editor):
+    ResearchStudy = apps.get_model('medconnect_app', 'ResearchStudy')
+    studies = list(ResearchStudy.objects.only('id', 'eligibility_criteria'))
+    for study in studies:
+        study.eligibility_rules = compile_criteria(study.eligibility_criteria)
+    ResearchStudy.objects.bulk_update(studies, ['eligibility_rules'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0026_study_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchstudy',
+            name='eligibility_rules',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='StudyMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='study_matches', to='medconnect_app.profile')),
+                ('study', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='medconnect_app.researchstudy')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['study', '-score', 'patient'], name='studymatch_study_idx'), models.Index(fields=['patient', '-score', 'study'], name='studymatch_patient_idx')],
+                'unique_together': {('study', 'patient')},
+            },
+        ),
+        # Matches are computed afterwards by `manage.py rebuild_study_matches`
+        migrations.RunPython(compile_eligibility_rules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0027_study_matches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studyparticipation',
+            name='waitlisted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='studyparticipation',
+            name='status',
+            field=models.CharField(choices=[('interested', 'Interested'), ('applied', 'Applied'), ('screening', 'Screening'), ('enrolled', 'Enrolled'), ('waitlisted', 'Waitlisted'), ('completed', 'Completed'), ('withdrawn', 'Withdrawn'), ('rejected', 'Rejected')], default='interested', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='studyparticipation',
+            index=models.Index(fields=['study', 'status', 'waitlisted_at', 'id'], name='participation_waitlist_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:00
+
+from django.db import migrations, models
+
+
+def backfill_community_privacy(apps, schema_editor):
+    CommunityPost = apps.get_model('medconnect_app', 'CommunityPost')
+    CommunityPost.objects.filter(community__is_private=True).update(community_is_private=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0028_enrollment_waitlist'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='communitypost',
+            name='communitypost_trending_idx',
+        ),
+        migrations.AddField(
+            model_name='communitypost',
+            name='community_is_private',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_community_privacy, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='communitypost',
+            index=models.Index(fields=['community_is_private', '-trending_score', '-id'], name='communitypost_public_trend_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0029_post_community_privacy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitysimilarity',
+            name='built_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='communitysimilarity',
+            index=models.Index(fields=['-built_at'], name='communitysimilarity_built_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+def drop_projections(apps, schema_editor):
+    # Stored payloads embed absolute attachment URLs; the next feed read re-renders them
+    PostProjection = apps.get_model('medconnect_app', 'PostProjection')
+    PostProjection.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0030_community_similarity_built_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postprojection',
+            name='attachments',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(drop_projections, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def clear_cross_community_flags(apps, schema_editor):
+    # Flags used to match posts of any community; the duplicate index is now
+    # per community, and `manage.py flag_duplicate_posts` regroups these
+    CommunityPost = apps.get_model('medconnect_app', 'CommunityPost')
+    CommunityPost.objects.filter(duplicate_of__isnull=False).exclude(
+        duplicate_of__community=F('community')
+    ).update(duplicate_of=None, duplicate_score=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0031_projection_relative_attachments'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_cross_community_flags, migrations.RunPython.noop),
+    ]
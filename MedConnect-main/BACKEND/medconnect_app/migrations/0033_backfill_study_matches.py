@@ -0,0 +1,160 @@
+import re
+from datetime import date
+
+from django.db import migrations
+
+# Frozen copy of the matching.py scoring this backfill was written against,
+# per patient instead of over arrays; later changes to matching.py must not
+# change what it stores. The rules it scores were compiled by 0027.
+CANCER_TYPES = {
+    'breast': ['breast'],
+    'lung': ['lung', 'nsclc', 'sclc'],
+    'colorectal': ['colorectal', 'colon', 'rectal'],
+    'prostate': ['prostate'],
+    'pancreatic': ['pancreatic', 'pancreas'],
+    'ovarian': ['ovarian', 'ovary'],
+    'cervical': ['cervical cancer', 'cervix'],
+    'uterine': ['uterine', 'endometrial'],
+    'melanoma': ['melanoma'],
+    'skin': ['skin cancer', 'basal cell', 'squamous cell skin'],
+    'leukemia': ['leukemia', 'leukaemia', 'aml', 'cll'],
+    'lymphoma': ['lymphoma', 'hodgkin'],
+    'myeloma': ['myeloma'],
+    'bladder': ['bladder cancer', 'urothelial'],
+    'kidney': ['kidney cancer', 'renal cell'],
+    'liver': ['liver cancer', 'hepatocellular'],
+    'thyroid': ['thyroid cancer'],
+    'brain': ['brain tumor', 'brain cancer', 'glioma', 'glioblastoma'],
+    'stomach': ['stomach cancer', 'gastric'],
+    'esophageal': ['esophageal', 'oesophageal'],
+    'head and neck': ['head and neck', 'throat cancer'],
+    'sarcoma': ['sarcoma'],
+    'testicular': ['testicular'],
+}
+_PROFILE_CANCER_BY_PHRASE = {
+    **{name: name for name in CANCER_TYPES},
+    **{phrase: name for name, phrases in CANCER_TYPES.items() for phrase in phrases},
+}
+_PROFILE_CANCER_RE = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, _PROFILE_CANCER_BY_PHRASE), key=len, reverse=True)) + r')\b'
+)
+
+GENDER_CODES = {'female': 1, 'male': 2}
+WEIGHTS = {'cancer': 0.5, 'age': 0.3, 'gender': 0.1, 'exclusions': 0.1}
+HALF = 0.5
+MIN_SCORE = 60
+CHUNK_SIZE = 5000
+
+
+def _normalize(text):
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def _name_terms(name):
+    words = _normalize(name).split()
+    return {' '.join(words[i:i + n]) for n in (1, 2, 3) for i in range(len(words) - n + 1)}
+
+
+def _gender_code(gender):
+    gender = (gender or '').strip().lower()
+    gender = {'f': 'female', 'woman': 'female', 'm': 'male', 'man': 'male'}.get(gender, gender)
+    return GENDER_CODES.get(gender, 0)
+
+
+def _study_terms(rules):
+    return {('allergy', term) for term in rules.get('excluded_allergens', [])} | \
+        {('medication', term) for term in rules.get('excluded_medications', [])}
+
+
+def _score(age, gender, cancers, terms, rules, study_cancers, study_terms):
+    """matching.score for one (patient, study) pair: 0-100, or -1 when ineligible."""
+    total = 0.0
+    min_age, max_age = rules.get('min_age'), rules.get('max_age')
+    if age is not None and (min_age is not None or max_age is not None):
+        if (min_age is not None and age < min_age) or (max_age is not None and age >= max_age + 1):
+            return -1
+        total += WEIGHTS['age']
+    else:
+        total += WEIGHTS['age'] * HALF
+
+    study_gender = GENDER_CODES.get(rules.get('gender'), 0)
+    if gender and study_gender:
+        if gender != study_gender:
+            return -1
+        total += WEIGHTS['gender']
+    else:
+        total += WEIGHTS['gender'] * HALF
+
+    if cancers and study_cancers:
+        if not cancers & study_cancers:
+            return -1
+        total += WEIGHTS['cancer']
+    else:
+        total += WEIGHTS['cancer'] * HALF
+
+    if terms & study_terms:
+        return -1
+    total += WEIGHTS['exclusions'] * (1.0 if study_terms else HALF)
+    # round() rounds half to even, like the np.rint matching.py uses
+    return round(total * 100)
+
+
+def backfill_study_matches(apps, schema_editor):
+    # 0027 created the table empty; without this it stays empty until
+    # `manage.py rebuild_study_matches` is run
+    ResearchStudy = apps.get_model('medconnect_app', 'ResearchStudy')
+    PatientProfile = apps.get_model('medconnect_app', 'PatientProfile')
+    Allergy = apps.get_model('medconnect_app', 'Allergy')
+    Medication = apps.get_model('medconnect_app', 'Medication')
+    StudyMatch = apps.get_model('medconnect_app', 'StudyMatch')
+
+    StudyMatch.objects.all().delete()
+    studies = []
+    for study_id, rules in ResearchStudy.objects.filter(status='recruiting').order_by('id').values_list(
+        'id', 'eligibility_rules'
+    ):
+        rules = rules or {}
+        studies.append((study_id, rules, set(rules.get('cancer_types', [])) & set(CANCER_TYPES), _study_terms(rules)))
+    if not studies:
+        return
+    today = date.today()
+    last_id = 0
+    while True:
+        patients = list(PatientProfile.objects.filter(profile_id__gt=last_id).order_by('profile_id').values_list(
+            'profile_id', 'date_of_birth', 'gender', 'cancer_type', 'allergies'
+        )[:CHUNK_SIZE])
+        if not patients:
+            return
+        owners = {'patient_id__gte': patients[0][0], 'patient_id__lte': patients[-1][0]}
+        terms = {
+            profile_id: {('allergy', term) for part in re.split(r'[,;\n]', allergies or '') for term in _name_terms(part)}
+            for profile_id, _, _, _, allergies in patients
+        }
+        for patient_id, allergen in Allergy.objects.filter(**owners).values_list('patient_id', 'allergen'):
+            if patient_id in terms:
+                terms[patient_id] |= {('allergy', term) for term in _name_terms(allergen)}
+        for patient_id, name in Medication.objects.filter(status='active', **owners).values_list('patient_id', 'name'):
+            if patient_id in terms:
+                terms[patient_id] |= {('medication', term) for term in _name_terms(name)}
+
+        matches = []
+        for profile_id, born, gender, cancer_type, _ in patients:
+            age = (today - born).days / 365.25 if born else None
+            cancers = {_PROFILE_CANCER_BY_PHRASE[phrase] for phrase in _PROFILE_CANCER_RE.findall(_normalize(cancer_type or ''))}
+            for study_id, rules, study_cancers, study_terms in studies:
+                score = _score(age, _gender_code(gender), cancers, terms[profile_id], rules, study_cancers, study_terms)
+                if score >= MIN_SCORE:
+                    matches.append(StudyMatch(study_id=study_id, patient_id=profile_id, score=score))
+        StudyMatch.objects.bulk_create(matches, batch_size=1000)
+        last_id = patients[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medconnect_app', '0032_clear_cross_community_duplicates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_study_matches, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class Profile(models.Model):
@@ -18,6 +19,10 @@ class Profile(models.Model):
     def __str__(self):
         return f"{self.user.username} ({self.role})"
 
+    @property
+    def display_name(self):
+        return (self.user.get_full_name() or self.user.username)[:255]
+
 class PatientProfile(models.Model):
     profile = models.OneToOneField(Profile, on_delete=models.CASCADE)
     date_of_birth = models.DateField()
@@ -202,6 +207,9 @@ class ResearchStudy(models.Model):
     contact_name = models.CharField(max_length=100)
     contact_email = models.EmailField()
     contact_phone = models.CharField(max_length=20)
+    # eligibility_criteria compiled by matching.compile_criteria, kept
+    # current by signals.py
+    eligibility_rules = models.JSONField(default=dict, blank=True)
     created_by = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='created_studies')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -211,6 +219,13 @@ class ResearchStudy(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the study catalog on (created_at, id),
+            # unfiltered and under its common status/phase filters
+            models.Index(fields=['-created_at', '-id'], name='researchstudy_newest_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='researchstudy_status_idx'),
+            models.Index(fields=['status', 'phase', '-created_at', '-id'], name='researchstudy_catalog_idx'),
+        ]
 
 class StudyParticipation(models.Model):
     STATUS_CHOICES = [
@@ -218,6 +233,7 @@ class StudyParticipation(models.Model):
         ('applied', 'Applied'),
         ('screening', 'Screening'),
         ('enrolled', 'Enrolled'),
+        ('waitlisted', 'Waitlisted'),
         ('completed', 'Completed'),
         ('withdrawn', 'Withdrawn'),
         ('rejected', 'Rejected'),
@@ -228,15 +244,38 @@ class StudyParticipation(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='interested')
     applied_date = models.DateTimeField(auto_now_add=True)
     enrolled_date = models.DateTimeField(null=True, blank=True)
+    # When the participation joined its study's waitlist (enrolled while the study was full)
+    waitlisted_at = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
 
     class Meta:
         unique_together = ['study', 'patient']
         ordering = ['-applied_date']
+        indexes = [
+            # Waitlist of a study, first come first served
+            models.Index(fields=['study', 'status', 'waitlisted_at', 'id'], name='participation_waitlist_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient.user.username} - {self.study.title}"
 
+class StudyMatch(models.Model):
+    """Eligibility match score of a patient for a recruiting study, see matching.py."""
+    study = models.ForeignKey(ResearchStudy, on_delete=models.CASCADE, related_name='matches')
+    patient = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='study_matches')
+    score = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ['study', 'patient']
+        indexes = [
+            # Best patients for a study and best studies for a patient
+            models.Index(fields=['study', '-score', 'patient'], name='studymatch_study_idx'),
+            models.Index(fields=['patient', '-score', 'study'], name='studymatch_patient_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient.user.username} matches {self.study.title} ({self.score})"
+
 class Appointment(models.Model):
     STATUS_CHOICES = [
         ('scheduled', 'Scheduled'),
@@ -297,28 +336,89 @@ class Community(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='created_communities')
     moderators = models.ManyToManyField(Profile, related_name='moderated_communities', blank=True)
+    # Denormalized from CommunityMembership/CommunityPost; kept current by the
+    # join, leave, create-community and create-post API views.
+    member_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    # Log-domain decayed engagement score, see trending.py
+    trending_score = models.FloatField(default=0.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-last_activity_at'], name='community_activity_idx'),
+            models.Index(fields=['-trending_score', '-id'], name='community_trending_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
-    @property
-    def member_count(self):
-        return self.members.count()
-
     @property
     def last_activity(self):
-        latest_post = self.posts.order_by('-created_at').first()
-        return latest_post.created_at if latest_post else self.created_at
+        return self.last_activity_at or self.created_at
+
+class Tag(models.Model):
+    """Normalized community tag; community_count is precomputed for the tag cloud."""
+    name = models.CharField(max_length=100, unique=True)
+    community_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-community_count', 'name']
+        indexes = [
+            models.Index(fields=['-community_count'], name='tag_cloud_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class CommunityTag(models.Model):
+    """Indexed link between a community and one of its tags (mirrors Community.tags)."""
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='community_links')
+
+    class Meta:
+        # Leading with tag lets ?tag= filters resolve communities from the index
+        unique_together = ['tag', 'community']
+
+    def __str__(self):
+        return f"{self.community.name} #{self.tag.name}"
+
+class CommunitySimilarity(models.Model):
+    """Precomputed co-membership similarity, top neighbours per community.
+
+    Rebuilt by `manage.py build_community_similarity`; read by the suggested
+    communities endpoint.
+    """
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='similar_links')
+    similar = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    # Shared by every row of one rebuild; the latest one versions cached suggestions
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ['community', 'similar']
+        indexes = [
+            models.Index(fields=['-built_at'], name='communitysimilarity_built_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.community.name} ~ {self.similar.name} ({self.score:.3f})"
 
 class CommunityMembership(models.Model):
     community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='members')
     member = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='joined_communities')
     joined_at = models.DateTimeField(auto_now_add=True)
     is_moderator = models.BooleanField(default=False)
+    # Read watermark: posts created after this are unread (joined_at when null)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ['community', 'member']
         ordering = ['-joined_at']
+        indexes = [
+            # Keyset pagination of a community roster, all members or moderators only
+            models.Index(fields=['community', '-joined_at', '-id'], name='membership_roster_idx'),
+            models.Index(fields=['community', 'is_moderator', '-joined_at', '-id'], name='membership_mod_roster_idx'),
+        ]
 
     def __str__(self):
         return f"{self.member.user.username} in {self.community.name}"
@@ -326,23 +426,128 @@ class CommunityMembership(models.Model):
 class CommunityPost(models.Model):
     community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='posts')
     author = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='community_posts')
+    # Snapshot of author.display_name/role so feeds render without joining
+    # auth_user; refreshed by the User/Profile signals in signals.py.
+    author_name = models.CharField(max_length=255, blank=True)
+    author_role = models.CharField(max_length=20, blank=True)
     content = models.TextField()
+    # Denormalized counters, updated with F() expressions alongside the
+    # PostLike/PostComment write; `manage.py reconcile_post_counters` fixes drift.
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Log-domain decayed engagement score, see trending.py
+    trending_score = models.FloatField(default=0.0)
+    # Copy of community.is_private so public trending posts are read straight
+    # off an index; kept in sync by the Community signals in signals.py.
+    community_is_private = models.BooleanField(default=False)
+    # Set when the post near-duplicates an earlier one (see duplicates.py);
+    # points at the earliest post of the group for moderators to review.
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates')
+    duplicate_score = models.FloatField(null=True, blank=True)
+    # Bumped whenever something the stored feed fragment renders changes,
+    # see PostProjection
+    render_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a community feed on (created_at, id)
+            models.Index(fields=['community', '-created_at', '-id'], name='communitypost_feed_idx'),
+            # Top-K trending posts of public communities, and per community
+            models.Index(fields=['community_is_private', '-trending_score', '-id'], name='communitypost_public_trend_idx'),
+            models.Index(fields=['community', '-trending_score', '-id'], name='communitypost_comm_trend_idx'),
+            # Moderators' review queue of flagged near-duplicates
+            models.Index(fields=['community', '-created_at', '-id'], condition=models.Q(duplicate_of__isnull=False),
+                         name='communitypost_dupes_idx'),
+        ]
 
     def __str__(self):
         return f"Post by {self.author.user.username} in {self.community.name}"
 
-    @property
-    def like_count(self):
-        return self.likes.count()
+class Hashtag(models.Model):
+    """Hashtag used in post content; counters are kept current by api_views."""
+    name = models.CharField(max_length=100, unique=True)
+    post_count = models.PositiveIntegerField(default=0)
+    # Log-domain decayed usage score, see trending.py
+    trending_score = models.FloatField(default=0.0)
 
-    @property
-    def comment_count(self):
-        return self.comments.count()
+    class Meta:
+        indexes = [
+            models.Index(fields=['-trending_score', '-id'], name='hashtag_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.name}"
+
+class PostHashtag(models.Model):
+    """Inverted index entry linking a hashtag to a post that uses it."""
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='post_links')
+    post = models.ForeignKey(CommunityPost, on_delete=models.CASCADE, related_name='hashtag_links')
+    # Copy of post.created_at so a hashtag's posts page straight off the index
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['post', 'hashtag']
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-id'], name='posthashtag_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.hashtag.name} on post {self.post_id}"
+
+class Poll(models.Model):
+    """Single-choice poll attached to a community post.
+
+    Each option's tally is spread over ``counter_shards`` PollOptionCounter
+    rows; a vote increments one at random, so a burst of votes does not queue
+    on a single row, and reads sum the shards.
+    """
+    DEFAULT_COUNTER_SHARDS = 8
+
+    post = models.OneToOneField(CommunityPost, on_delete=models.CASCADE, related_name='poll')
+    question = models.CharField(max_length=255)
+    counter_shards = models.PositiveSmallIntegerField(default=DEFAULT_COUNTER_SHARDS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.question
+
+class PollOption(models.Model):
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='options')
+    text = models.CharField(max_length=255)
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position', 'id']
+
+    def __str__(self):
+        return self.text
+
+class PollOptionCounter(models.Model):
+    option = models.ForeignKey(PollOption, on_delete=models.CASCADE, related_name='counters')
+    shard = models.PositiveSmallIntegerField()
+    votes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['option', 'shard']
+
+    def __str__(self):
+        return f"{self.option.text} [{self.shard}]: {self.votes}"
+
+class PollVote(models.Model):
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='votes')
+    option = models.ForeignKey(PollOption, on_delete=models.CASCADE, related_name='votes')
+    voter = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='poll_votes')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # One vote per profile per poll, enforced by the database
+        unique_together = ['poll', 'voter']
+
+    def __str__(self):
+        return f"{self.voter.user.username} voted {self.option.text}"
 
 class PostAttachment(models.Model):
     post = models.ForeignKey(CommunityPost, on_delete=models.CASCADE, related_name='attachments')
@@ -366,17 +571,70 @@ class PostLike(models.Model):
         return f"{self.user.user.username} likes {self.post}"
 
 class PostComment(models.Model):
+    # Materialized path: one zero-padded id segment per ancestor, ending with
+    # this comment's own id. Sorting by path yields depth-first thread order
+    # and a subtree is the contiguous range [path, path + '~').
+    PATH_SEGMENT_WIDTH = 10
+    MAX_DEPTH = 20
+
     post = models.ForeignKey(CommunityPost, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='post_comments')
+    # Author snapshot, as on CommunityPost
+    author_name = models.CharField(max_length=255, blank=True)
+    author_role = models.CharField(max_length=20, blank=True)
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
+    depth = models.PositiveSmallIntegerField(default=0)
+    path = models.CharField(max_length=255, default='')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Top-level comments of a post in thread order
+            models.Index(fields=['post', 'depth', 'path'], name='postcomment_toplevel_idx'),
+            # Whole threads / subtrees as one path range scan
+            models.Index(fields=['post', 'path'], name='postcomment_thread_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author.user.username} on {self.post}"
 
+    @classmethod
+    def path_segment(cls, pk):
+        return str(pk).zfill(cls.PATH_SEGMENT_WIDTH) + '/'
+
+    @property
+    def subtree_upper_bound(self):
+        """Exclusive upper bound of this comment's subtree in path order."""
+        return self.path + '~'
+
+class PostProjection(models.Model):
+    """Pre-rendered feed JSON for a post, minus anything viewer dependent.
+
+    ``payload`` holds the post's author snapshot, content and first page of
+    comments as a JSON object; likes, the comment count and the poll change
+    far more often and are spliced in per request from their own columns.
+    ``attachments`` keeps media URLs relative, since the host and scheme
+    they are made absolute with differ between requests. A projection is
+    current while its ``version`` matches the post's ``render_version``,
+    which ``invalidate`` bumps; a stale or missing one is re-rendered by the
+    next feed read.
+    """
+    post = models.OneToOneField(CommunityPost, on_delete=models.CASCADE, primary_key=True, related_name='projection')
+    version = models.PositiveIntegerField()
+    payload = models.TextField()
+    attachments = models.JSONField(default=list)
+    rendered_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Projection of post {self.post_id} (version {self.version})"
+
+    @staticmethod
+    def invalidate(post_ids):
+        """Mark the projections of ``post_ids`` (ids or a values queryset) stale."""
+        CommunityPost.objects.filter(pk__in=post_ids).update(render_version=models.F('render_version') + 1)
+
 class ContactRequest(models.Model):
     """Model for contact requests between researchers and patients"""
     STATUS_CHOICES = [
@@ -0,0 +1,83 @@
+"""Keyset (cursor) pagination helpers for the JSON API.
+
+Pages are ordered on ``(field, id)`` and each page resumes strictly after the
+last row of the previous one, so deep pages are an index range scan instead of
+an ever-growing OFFSET. Cursors are opaque URL-safe strings; clients just echo
+back the ``next_cursor`` they were given.
+"""
+import base64
+import json
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def _cursor_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def encode_cursor(*values):
+    raw = json.dumps(values, separators=(',', ':'), default=_cursor_value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def page_size(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a ``limit`` query parameter, clamped to ``1..maximum``."""
+    try:
+        size = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def keyset_filter(queryset, cursor, field='created_at', descending=True):
+    """Restrict ``queryset`` to rows strictly after ``cursor`` on ``(field, id)``."""
+    if not cursor:
+        return queryset
+    values = decode_cursor(cursor)
+    if len(values) != 2:
+        raise InvalidCursor('Invalid cursor')
+    try:
+        value = queryset.model._meta.get_field(field).to_python(values[0])
+        last_id = int(values[1])
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+    op = 'lt' if descending else 'gt'
+    # The redundant inclusive bound gives the planner an index range to seek to
+    return queryset.filter(**{f'{field}__{op}e': value}).filter(
+        Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': last_id})
+    )
+
+
+def keyset_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE, field='created_at', descending=True):
+    """Return ``(rows, next_cursor)`` for one page of ``queryset``.
+
+    Rows are ordered on ``(field, id)``; ``next_cursor`` is None on the last
+    page. A composite index on the same columns keeps every page equally cheap.
+    """
+    queryset = keyset_filter(queryset, cursor, field, descending)
+    prefix = '-' if descending else ''
+    rows = list(queryset.order_by(f'{prefix}{field}', f'{prefix}id')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+    return rows, next_cursor
@@ -0,0 +1,72 @@
+"""Suggested communities for a user.
+
+Candidates come from the CommunitySimilarity table that
+`manage.py build_community_similarity` precomputes from co-membership: every
+community the user belongs to votes for its nearest neighbours with their
+similarity score. Public communities whose category or tags match the
+patient's cancer type get CANCER_TYPE_BOOST on top, which also gives a new
+patient with no memberships something relevant, and any remaining slots are
+filled with trending communities.
+
+Rankings are cached per user for CACHE_SECONDS. The cache is per process
+(no shared CACHES backend is configured), so entries are never deleted to
+invalidate them: the key embeds the similarity table's build time and a stamp
+of the user's memberships, both read from the database. A rebuild, or a join
+or leave handled by any process, changes the key everywhere. A changed cancer
+type shows up once the entry expires.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+
+from .models import Community, CommunityMembership, CommunitySimilarity, PatientProfile
+
+CANCER_TYPE_BOOST = 1.0
+MAX_SUGGESTIONS = 50
+CACHE_SECONDS = 60 * 60
+
+
+def _cache_key(profile_id):
+    built_at = CommunitySimilarity.objects.order_by('-built_at').values_list('built_at', flat=True).first()
+    joined = CommunityMembership.objects.filter(member_id=profile_id).aggregate(count=Count('id'), last=Max('id'))
+    version = built_at.timestamp() if built_at else 0
+    return f"community_suggestions:{version}:{profile_id}:{joined['count']}:{joined['last']}"
+
+
+def suggested_communities(profile):
+    """Up to MAX_SUGGESTIONS ``(community_id, score)`` pairs for ``profile``, best first."""
+    key = _cache_key(profile.id)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = _rank(profile)
+        cache.set(key, suggestions, CACHE_SECONDS)
+    return suggestions
+
+
+def _rank(profile):
+    joined = set(CommunityMembership.objects.filter(member=profile).values_list('community_id', flat=True))
+    scores = dict(
+        CommunitySimilarity.objects.filter(community_id__in=joined).exclude(similar_id__in=joined)
+        .values('similar_id').annotate(total=Sum('score')).values_list('similar_id', 'total')
+    )
+
+    cancer_type = PatientProfile.objects.filter(profile=profile).values_list('cancer_type', flat=True).first()
+    cancer_type = (cancer_type or '').strip().lower()
+    if cancer_type:
+        matching = Community.objects.filter(
+            Q(category__icontains=cancer_type) | Q(tag_links__tag__name=cancer_type)
+        ).exclude(id__in=joined).values_list('id', flat=True).distinct()
+        for community_id in matching:
+            scores[community_id] = scores.get(community_id, 0.0) + CANCER_TYPE_BOOST
+
+    # Ties go to the larger community
+    candidates = Community.objects.filter(id__in=scores, is_private=False).values_list('id', 'member_count')
+    ranked = sorted(((scores[community_id], size, community_id) for community_id, size in candidates), reverse=True)
+    suggestions = [(community_id, score) for score, _, community_id in ranked[:MAX_SUGGESTIONS]]
+
+    if len(suggestions) < MAX_SUGGESTIONS:
+        exclude = joined | {community_id for community_id, _ in suggestions}
+        trending = Community.objects.filter(is_private=False).exclude(id__in=exclude).order_by(
+            '-trending_score', '-id'
+        ).values_list('id', flat=True)[:MAX_SUGGESTIONS - len(suggestions)]
+        suggestions.extend((community_id, 0.0) for community_id in trending)
+    return suggestions
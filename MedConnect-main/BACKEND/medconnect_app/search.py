@@ -0,0 +1,281 @@
+"""Full-text search over community posts and community descriptions.
+
+Three interchangeable backends expose the same ranked-id interface:
+
+* SQLite FTS5 virtual tables when running on the bundled db.sqlite3,
+* MySQL FULLTEXT indexes on the DATABASE_URL deployment,
+* an in-process inverted index (BM25) for any other database.
+
+The SQLite tables and MySQL indexes are created by migration 0014; the
+post_save/post_delete handlers in signals.py keep the index in step with
+writes and `manage.py rebuild_search_index` repopulates it from scratch.
+"""
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from .models import Community, CommunityPost
+from .pagination import DEFAULT_PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor
+
+KINDS = {
+    'post': CommunityPost,
+    'community': Community,
+}
+
+TOKEN_RE = re.compile(r'\w+')
+# '#' not preceded by a word character, then a word containing a letter
+HASHTAG_RE = re.compile(r'(?<!\w)#(\w*[^\W\d_]\w*)')
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def hashtags(text):
+    """Distinct lower-cased hashtags in ``text``, in order of first use."""
+    names = []
+    for match in HASHTAG_RE.findall(text or ''):
+        name = match.lower()[:100]
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def document_text(kind, obj):
+    if kind == 'post':
+        return obj.content
+    return f'{obj.name} {obj.description}'
+
+
+class SQLiteFTSBackend:
+    """FTS5 virtual tables keyed by the indexed row's primary key."""
+
+    tables = {
+        'post': 'medconnect_app_post_fts',
+        'community': 'medconnect_app_community_fts',
+    }
+    sources = {
+        'post': "SELECT id, content FROM medconnect_app_communitypost",
+        'community': "SELECT id, name || ' ' || description FROM medconnect_app_community",
+    }
+
+    @classmethod
+    def available(cls):
+        return set(cls.tables.values()) <= set(connection.introspection.table_names())
+
+    def index(self, kind, obj):
+        table = self.tables[kind]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [obj.pk])
+            cursor.execute(f'INSERT INTO {table}(rowid, body) VALUES (%s, %s)', [obj.pk, document_text(kind, obj)])
+
+    def remove(self, kind, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.tables[kind]} WHERE rowid = %s', [pk])
+
+    def rebuild(self, kind):
+        table = self.tables[kind]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(f'INSERT INTO {table}(rowid, body) {self.sources[kind]}')
+
+    def ranked_ids(self, kind, terms, offset, limit):
+        table = self.tables[kind]
+        # Terms are \w+ tokens, so quoting each one is enough to keep FTS5
+        # query syntax out of user input; space-separated terms are ANDed.
+        match = ' '.join(f'"{term}"' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class MySQLFullTextBackend:
+    """InnoDB FULLTEXT indexes, which MySQL maintains on every write."""
+
+    columns = {
+        'post': ['content'],
+        'community': ['name', 'description'],
+    }
+
+    def index(self, kind, obj):
+        pass
+
+    def remove(self, kind, pk):
+        pass
+
+    def rebuild(self, kind):
+        pass
+
+    def ranked_ids(self, kind, terms, offset, limit):
+        qn = connection.ops.quote_name
+        table = qn(KINDS[kind]._meta.db_table)
+        columns = ', '.join(qn(column) for column in self.columns[kind])
+        against = ' '.join(f'+{term}' for term in terms)
+        match = f'MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id FROM {table} WHERE {match} ORDER BY {match} DESC, id DESC LIMIT %s OFFSET %s',
+                [against, against, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class _InvertedIndex:
+    """Term -> {pk: term frequency} postings with BM25 scoring."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}
+        self.lengths = {}
+        self.total_length = 0
+
+    def add(self, pk, text):
+        self.discard(pk)
+        tokens = tokenize(text)
+        counts = defaultdict(int)
+        for token in tokens:
+            counts[token] += 1
+        for token, count in counts.items():
+            self.postings[token][pk] = count
+        self.doc_terms[pk] = list(counts)
+        self.lengths[pk] = len(tokens)
+        self.total_length += len(tokens)
+
+    def discard(self, pk):
+        if pk not in self.lengths:
+            return
+        self.total_length -= self.lengths.pop(pk)
+        for token in self.doc_terms.pop(pk):
+            postings = self.postings[token]
+            postings.pop(pk, None)
+            if not postings:
+                del self.postings[token]
+
+    def search(self, terms):
+        if not terms or not self.lengths:
+            return []
+        postings = [self.postings.get(term, {}) for term in terms]
+        if not all(postings):
+            return []
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for plist in postings[1:]:
+            candidates &= plist.keys()
+        doc_count = len(self.lengths)
+        avg_length = self.total_length / doc_count
+        scores = {}
+        for plist in postings:
+            idf = math.log(1 + (doc_count - len(plist) + 0.5) / (len(plist) + 0.5))
+            for pk in candidates:
+                tf = plist[pk]
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[pk] / avg_length)
+                scores[pk] = scores.get(pk, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
+
+
+class MemoryIndexBackend:
+    """Per-process inverted index, loaded from the database on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _loaded(self, kind):
+        index = self._indexes.get(kind)
+        if index is None:
+            index = _InvertedIndex()
+            model = KINDS[kind]
+            fields = ['content'] if kind == 'post' else ['name', 'description']
+            for obj in model.objects.only('id', *fields).iterator():
+                index.add(obj.pk, document_text(kind, obj))
+            self._indexes[kind] = index
+        return index
+
+    def index(self, kind, obj):
+        pk, text = obj.pk, document_text(kind, obj)
+
+        def apply():
+            with self._lock:
+                if kind in self._indexes:
+                    self._indexes[kind].add(pk, text)
+        transaction.on_commit(apply)
+
+    def remove(self, kind, pk):
+        def apply():
+            with self._lock:
+                if kind in self._indexes:
+                    self._indexes[kind].discard(pk)
+        transaction.on_commit(apply)
+
+    def rebuild(self, kind):
+        with self._lock:
+            self._indexes.pop(kind, None)
+            self._loaded(kind)
+
+    def ranked_ids(self, kind, terms, offset, limit):
+        with self._lock:
+            return self._loaded(kind).search(terms)[offset:offset + limit]
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if connection.vendor == 'sqlite' and SQLiteFTSBackend.available():
+            _backend = SQLiteFTSBackend()
+        elif connection.vendor == 'mysql':
+            _backend = MySQLFullTextBackend()
+        else:
+            _backend = MemoryIndexBackend()
+    return _backend
+
+
+def search(kind, query, visible, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return ``(objects, next_cursor)`` for one ranked page of matches.
+
+    ``visible`` is a queryset of ``KINDS[kind]`` restricting what the caller
+    may see. The cursor records how far into the ranked id stream the
+    previous page read, so a page never rescans rows already filtered out.
+    """
+    position = 0
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+            raise InvalidCursor('Invalid cursor')
+        position = values[0]
+
+    terms = tokenize(query)
+    if not terms:
+        return [], None
+
+    backend = get_backend()
+    chunk = limit * 2
+    results = []
+    exhausted = False
+    while len(results) < limit:
+        ids = backend.ranked_ids(kind, terms, position, chunk)
+        visible_by_id = visible.in_bulk(ids) if ids else {}
+        consumed = 0
+        for pk in ids:
+            consumed += 1
+            if pk in visible_by_id:
+                results.append(visible_by_id[pk])
+                if len(results) == limit:
+                    break
+        position += consumed
+        if len(ids) < chunk and consumed == len(ids):
+            exhausted = True
+            break
+    return results, None if exhausted else encode_cursor(position)
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
+from django.db import transaction
+from django.db.models import F
+from .models import Profile, PatientProfile, Community, CommunityPost, CommunityTag, Tag, PostHashtag, Hashtag, PostAttachment, PostComment, PostProjection, ResearchStudy, Allergy, Medication
+from . import duplicates, matching, search, trending
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -10,4 +13,171 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save() 
\ No newline at end of file
+    instance.profile.save()
+
+AUTHOR_SNAPSHOT_BATCH_SIZE = 1000
+DISPLAY_NAME_FIELDS = {'first_name', 'last_name', 'username'}
+
+def refresh_author_snapshots(profile):
+    """Rewrite the author snapshot on every post and comment by ``profile``.
+
+    Works in batches of AUTHOR_SNAPSHOT_BATCH_SIZE rows so a prolific author
+    never locks all their rows in one statement; updated rows drop out of
+    the stale filter, so the loop ends when none are left.
+    """
+    name, role = profile.display_name, profile.role
+    for model in (CommunityPost, PostComment):
+        stale = model.objects.filter(author=profile).exclude(author_name=name, author_role=role).order_by()
+        while True:
+            ids = list(stale.values_list('id', flat=True)[:AUTHOR_SNAPSHOT_BATCH_SIZE])
+            if not ids:
+                break
+            model.objects.filter(id__in=ids).update(author_name=name, author_role=role)
+            # Feed projections render the post author and top-level commenters
+            PostProjection.invalidate(ids if model is CommunityPost else
+                                      PostComment.objects.filter(id__in=ids, depth=0).values('post_id'))
+
+@receiver(pre_save, sender=CommunityPost)
+@receiver(pre_save, sender=PostComment)
+def fill_author_snapshot(sender, instance, **kwargs):
+    # The API views fill these in; this covers the admin and scripts
+    if not instance.author_name:
+        instance.author_name = instance.author.display_name
+        instance.author_role = instance.author.role
+
+@receiver(pre_save, sender=User)
+def remember_display_name(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and (update_fields is None or DISPLAY_NAME_FIELDS & set(update_fields)):
+        instance._previous_display_name = User.objects.filter(pk=instance.pk).values_list(
+            'first_name', 'last_name', 'username'
+        ).first()
+
+@receiver(post_save, sender=User)
+def refresh_user_snapshots(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_display_name', None)
+    if created or previous is None:
+        return
+    del instance._previous_display_name
+    if previous != (instance.first_name, instance.last_name, instance.username) and hasattr(instance, 'profile'):
+        refresh_author_snapshots(instance.profile)
+
+@receiver(pre_save, sender=Profile)
+def remember_role(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and (update_fields is None or 'role' in update_fields):
+        instance._previous_role = Profile.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+@receiver(post_save, sender=Profile)
+def refresh_profile_snapshots(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_role', None)
+    if created or previous is None:
+        return
+    del instance._previous_role
+    if previous != instance.role:
+        refresh_author_snapshots(instance)
+
+@receiver(post_save, sender=CommunityPost)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'content' in update_fields:
+        search.get_backend().index('post', instance)
+        duplicates.index.index(instance)
+
+@receiver(post_save, sender=CommunityPost)
+def invalidate_edited_post(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'content' in update_fields):
+        PostProjection.invalidate([instance.pk])
+
+@receiver(post_save, sender=PostComment)
+@receiver(post_delete, sender=PostComment)
+def invalidate_commented_post(sender, instance, update_fields=None, **kwargs):
+    # Only top-level comments are part of the projection; the view's
+    # follow-up save of the comment path changes nothing rendered.
+    if instance.depth == 0 and update_fields is None:
+        PostProjection.invalidate([instance.post_id])
+
+@receiver(post_save, sender=PostAttachment)
+@receiver(post_delete, sender=PostAttachment)
+def invalidate_attachment_post(sender, instance, **kwargs):
+    PostProjection.invalidate([instance.post_id])
+
+@receiver(post_delete, sender=CommunityPost)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove('post', instance.pk)
+    duplicates.index.remove(instance.pk)
+
+@receiver(post_save, sender=Community)
+def index_community(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'name', 'description'} & set(update_fields):
+        search.get_backend().index('community', instance)
+
+@receiver(pre_save, sender=CommunityPost)
+def fill_community_privacy(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance.community_is_private = instance.community.is_private
+
+@receiver(post_save, sender=Community)
+def sync_post_privacy(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'is_private' in update_fields):
+        CommunityPost.objects.filter(community=instance).exclude(
+            community_is_private=instance.is_private
+        ).update(community_is_private=instance.is_private)
+
+@receiver(post_delete, sender=Community)
+def unindex_community(sender, instance, **kwargs):
+    search.get_backend().remove('community', instance.pk)
+
+@receiver(post_delete, sender=CommunityTag)
+def release_tag(sender, instance, **kwargs):
+    Tag.objects.filter(pk=instance.tag_id, community_count__gt=0).update(community_count=F('community_count') - 1)
+
+@receiver(post_delete, sender=PostHashtag)
+def release_hashtag(sender, instance, **kwargs):
+    Hashtag.objects.filter(pk=instance.hashtag_id, post_count__gt=0).update(
+        post_count=F('post_count') - 1,
+        trending_score=trending.retracted('post', instance.created_at),
+    )
+
+# Fields whose changes invalidate stored study matches, see matching.py
+STUDY_MATCH_FIELDS = ('eligibility_criteria', 'status')
+PATIENT_MATCH_FIELDS = ('date_of_birth', 'gender', 'cancer_type', 'allergies')
+
+def _match_fields_changed(model, instance, fields, update_fields):
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return False
+    previous = model.objects.filter(pk=instance.pk).values_list(*fields).first() if instance.pk else None
+    return previous != tuple(getattr(instance, field) for field in fields)
+
+@receiver(pre_save, sender=ResearchStudy)
+def compile_eligibility_rules(sender, instance, update_fields=None, **kwargs):
+    # Enrollment changes save the whole study; only recompile and rematch
+    # when the criteria or status actually changed
+    if _match_fields_changed(ResearchStudy, instance, STUDY_MATCH_FIELDS, update_fields):
+        instance.eligibility_rules = matching.compile_criteria(instance.eligibility_criteria)
+        instance._rematch = True
+
+@receiver(post_save, sender=ResearchStudy)
+def refresh_study_matches(sender, instance, update_fields=None, **kwargs):
+    if not getattr(instance, '_rematch', False):
+        return
+    del instance._rematch
+    if update_fields is not None and 'eligibility_rules' not in update_fields:
+        ResearchStudy.objects.filter(pk=instance.pk).update(eligibility_rules=instance.eligibility_rules)
+    transaction.on_commit(lambda: matching.refresh_study(instance))
+
+@receiver(pre_save, sender=PatientProfile)
+def remember_match_fields(sender, instance, update_fields=None, **kwargs):
+    instance._rematch = _match_fields_changed(PatientProfile, instance, PATIENT_MATCH_FIELDS, update_fields)
+
+@receiver(post_save, sender=PatientProfile)
+def refresh_patient_matches(sender, instance, **kwargs):
+    if getattr(instance, '_rematch', False):
+        del instance._rematch
+        profile_id = instance.profile_id
+        transaction.on_commit(lambda: matching.refresh_patient(profile_id))
+
+@receiver(post_save, sender=Allergy)
+@receiver(post_delete, sender=Allergy)
+@receiver(post_save, sender=Medication)
+@receiver(post_delete, sender=Medication)
+def refresh_exclusion_matches(sender, instance, **kwargs):
+    profile_id = instance.patient_id
+    transaction.on_commit(lambda: matching.refresh_patient(profile_id))
@@ -1,3 +1,186 @@
-from django.test import TestCase
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from .api_views import api_bulk_update_applicant_status, api_search_patients, api_update_applicant_status, api_user_studies
+from .models import ResearchStudy, StudyParticipation
+
+
+def create_study(researcher, capacity):
+    return ResearchStudy.objects.create(
+        title='Study', description='Study', sponsor='Sponsor', location='Boston, MA',
+        eligibility_criteria='Adults 18 years or older', primary_endpoint='Overall survival',
+        estimated_enrollment=capacity, start_date=datetime.date(2025, 1, 1),
+        estimated_completion_date=datetime.date(2027, 1, 1), contact_name='Contact',
+        contact_email='contact@example.com', contact_phone='555-0100', created_by=researcher.profile,
+    )
+
+
+class UserStudiesQueryCountTests(TestCase):
+    """api_user_studies loads each branch in a constant number of queries."""
+
+    SIZES = (1, 25)
+    # The profile lookup on request.user, then one query for the studies
+    EXPECTED_QUERIES = 2
+
+    def setUp(self):
+        self.researcher = User.objects.create(username='researcher')
+        self.researcher.profile.role = 'researcher'
+        self.researcher.profile.save()
+        self.patients = [User.objects.create(username=f'patient_{i}') for i in range(3)]
+
+    def seed(self, size):
+        ResearchStudy.objects.bulk_create([
+            ResearchStudy(
+                title=f'Study {i}', description='Study', sponsor='Sponsor', location='Boston, MA',
+                eligibility_criteria='Adults 18 years or older', primary_endpoint='Overall survival',
+                estimated_enrollment=100, start_date=datetime.date(2025, 1, 1),
+                estimated_completion_date=datetime.date(2027, 1, 1), contact_name='Contact',
+                contact_email='contact@example.com', contact_phone='555-0100', created_by=self.researcher.profile,
+            )
+            for i in range(size)
+        ])
+        statuses = ['applied', 'screening', 'enrolled']
+        StudyParticipation.objects.bulk_create([
+            StudyParticipation(study=study, patient=patient.profile, status=statuses[i % len(statuses)])
+            for study in ResearchStudy.objects.all() for i, patient in enumerate(self.patients)
+        ])
+
+    def call(self, username):
+        request = RequestFactory().get('/')
+        # A fresh user, like the one the auth middleware attaches
+        request.user = User.objects.get(username=username)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = api_user_studies(request)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['studies']
+
+    def test_researcher_studies(self):
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                ResearchStudy.objects.all().delete()
+                self.seed(size)
+                studies = self.call('researcher')
+                self.assertEqual(len(studies), size)
+                # patient_1 is screening and patient_2 enrolled in every study
+                self.assertTrue(all(study['currentEnrollment'] == 2 for study in studies))
+
+    def test_patient_studies(self):
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                ResearchStudy.objects.all().delete()
+                self.seed(size)
+                studies = self.call('patient_2')
+                self.assertEqual(len(studies), size)
+                self.assertTrue(all(study['participationStatus'] == 'enrolled' for study in studies))
+
+
+class SearchPatientsTests(TestCase):
+    def test_invalid_study_id(self):
+        request = RequestFactory().get('/', {'studyId': 'abc'})
+        request.user = User.objects.create(username='researcher')
+        response = api_search_patients(request)
+        self.assertEqual(response.status_code, 400)
+
+
+class EnrollmentMixin:
+    CAPACITY = 3
+    APPLICANTS = 8
+
+    def setUp(self):
+        self.researcher = User.objects.create(username='researcher')
+        self.researcher.profile.role = 'researcher'
+        self.researcher.profile.save()
+        self.study = create_study(self.researcher, self.CAPACITY)
+        self.participations = [
+            StudyParticipation.objects.create(
+                study=self.study, patient=User.objects.create(username=f'patient_{i}').profile, status='applied',
+            )
+            for i in range(self.APPLICANTS)
+        ]
+
+    def act(self, action, participation):
+        request = RequestFactory().post('/', data=json.dumps({'action': action}), content_type='application/json')
+        request.user = self.researcher
+        return api_update_applicant_status(request, participation.id)
+
+    def act_bulk(self, action, participations):
+        request = RequestFactory().post(
+            '/', data=json.dumps({'action': action, 'participation_ids': [p.id for p in participations]}),
+            content_type='application/json',
+        )
+        request.user = self.researcher
+        return api_bulk_update_applicant_status(request)
+
+    def statuses(self):
+        return {p.id: p.status for p in StudyParticipation.objects.filter(study=self.study)}
+
+    def assertNotOversubscribed(self):
+        self.study.refresh_from_db()
+        enrolled = list(self.statuses().values()).count('enrolled')
+        self.assertLessEqual(enrolled, self.study.estimated_enrollment)
+        self.assertEqual(enrolled, self.study.current_enrollment)
+        return enrolled
+
+
+class EnrollmentCapacityTests(EnrollmentMixin, TestCase):
+    """Enrollment never takes more places than a study has and frees them again."""
+
+    def test_enroll_waitlists_once_full(self):
+        for participation in self.participations[:4]:
+            self.assertEqual(self.act('enroll', participation).status_code, 200)
+        self.assertEqual(self.act_bulk('enroll', self.participations[4:]).status_code, 200)
+        self.assertEqual(self.assertNotOversubscribed(), self.CAPACITY)
+        self.assertEqual(list(self.statuses().values()).count('waitlisted'), self.APPLICANTS - self.CAPACITY)
+
+    def test_reject_and_withdraw_release_places(self):
+        first, second, third, fourth, fifth = self.participations[:5]
+        self.act_bulk('enroll', [first, second, third, fourth, fifth])
+        # fourth and fifth are waitlisted, fourth first
+        self.act('reject', first)
+        self.assertEqual(self.statuses()[fourth.id], 'enrolled')
+        self.act('withdraw', second)
+        self.assertEqual(self.statuses()[fifth.id], 'enrolled')
+        self.assertEqual(self.assertNotOversubscribed(), self.CAPACITY)
+        # With nobody waiting, a release leaves the place free
+        self.act_bulk('withdraw', [third, fourth])
+        self.assertEqual(self.assertNotOversubscribed(), 1)
+
+    def test_zero_capacity_is_uncapped(self):
+        self.study.estimated_enrollment = 0
+        self.study.save()
+        self.act_bulk('enroll', self.participations)
+        self.study.refresh_from_db()
+        self.assertEqual(self.study.current_enrollment, self.APPLICANTS)
+        self.assertEqual(list(self.statuses().values()).count('enrolled'), self.APPLICANTS)
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentEnrollmentTests(EnrollmentMixin, TransactionTestCase):
+    """Racing enrollments from several connections never oversubscribe a study."""
+
+    APPLICANTS = 40
+    THREADS = 8
+
+    def burst(self, action, participations):
+        def worker(chunk):
+            try:
+                return [self.act(action, participation).status_code for participation in chunk]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            chunks = [participations[i::self.THREADS] for i in range(self.THREADS)]
+            return [code for codes in pool.map(worker, chunks) for code in codes]
+
+    def test_concurrent_enroll_and_withdraw(self):
+        self.assertEqual(set(self.burst('enroll', self.participations)), {200})
+        self.assertEqual(self.assertNotOversubscribed(), self.CAPACITY)
+        # Each withdrawal promotes someone from the waitlist
+        enrolled = [p for p in self.participations if self.statuses()[p.id] == 'enrolled']
+        self.assertEqual(set(self.burst('withdraw', enrolled)), {200})
+        self.assertEqual(self.assertNotOversubscribed(), self.CAPACITY)
@@ -0,0 +1,84 @@
+"""Time-decayed trending scores for community posts and communities.
+
+Each engagement event (a new post, like or comment) is worth
+``weight * 2 ** -(age / HALF_LIFE)``, and a row's trending score is the sum
+over its events. Decaying every stored score as time passes would mean
+rewriting every row, so scores are stored relative to a fixed EPOCH instead:
+an event at time t adds ``weight * 2 ** ((t - EPOCH) / HALF_LIFE)``. At any
+instant all rows are off by the same factor, so ordering by the stored value
+is ordering by the decayed score and the ``-trending_score`` indexes serve a
+top-K read directly.
+
+The stored value is the base-2 logarithm of that sum, which grows linearly
+with time rather than overflowing a float. Recording an event is a
+log-sum-exp computed inside a single UPDATE, so concurrent events on the
+same row cannot overwrite each other.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Greatest, Least, Log, Power
+from django.utils import timezone
+
+HALF_LIFE = timedelta(hours=24)
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+WEIGHTS = {
+    'community': 1.0,
+    'post': 1.0,
+    'like': 1.0,
+    'comment': 2.0,
+}
+
+# Floor for 1 - 2**(x - s) when retracting the only remaining event, so the
+# score drops to "nothing recent" instead of taking the log of zero.
+_RETRACT_FLOOR = 2.0 ** -50
+
+
+def event_score(event, at=None):
+    """Log-domain score of one ``event`` happening at ``at`` (default now)."""
+    at = at or timezone.now()
+    return math.log2(WEIGHTS[event]) + (at - EPOCH) / HALF_LIFE
+
+
+def combine(scores):
+    """Log-domain sum of ``scores``, for folding many events into one UPDATE."""
+    scores = list(scores)
+    if not scores:
+        return 0.0
+    top = max(scores)
+    return top + math.log2(sum(2.0 ** (score - top) for score in scores))
+
+
+def added(score, base=None):
+    """Expression adding a log-domain ``score`` to ``base`` (default the stored score)."""
+    base = F('trending_score') if base is None else base
+    value = Value(score, output_field=FloatField())
+    high = Greatest(base, value)
+    low = Least(base, value)
+    return high + Log(2, 1 + Power(2, low - high))
+
+
+def removed(score, base=None):
+    """Expression taking a previously added log-domain ``score`` back out of ``base``."""
+    base = F('trending_score') if base is None else base
+    value = Value(score, output_field=FloatField())
+    remainder = Greatest(1 - Power(2, value - base), Value(_RETRACT_FLOOR, output_field=FloatField()))
+    return base + Log(2, remainder)
+
+
+def bumped(event, at=None):
+    """Update expression recording one ``event`` on ``trending_score``."""
+    return added(event_score(event, at))
+
+
+def retracted(event, at):
+    """Update expression removing an ``event`` that was recorded at ``at``."""
+    return removed(event_score(event, at))
+
+
+def current(score, now=None):
+    """Present-day decayed value of a stored score, for display."""
+    now = now or timezone.now()
+    return 2.0 ** (score - (now - EPOCH) / HALF_LIFE)
@@ -26,6 +26,11 @@ urlpatterns = [
     # Search API endpoints
     path('api/search/patients/', api_views.api_search_patients, name='api_search_patients'),
     path('api/search/researchers/', api_views.api_search_researchers, name='api_search_researchers'),
+    path('api/search/posts/', api_views.api_search_posts, name='api_search_posts'),
+    path('api/search/communities/', api_views.api_search_communities, name='api_search_communities'),
+    path('api/trending/', api_views.api_trending, name='api_trending'),
+    path('api/hashtags/trending/', api_views.api_trending_hashtags, name='api_trending_hashtags'),
+    path('api/hashtags/<str:name>/posts/', api_views.api_hashtag_posts, name='api_hashtag_posts'),
     
     # Profile API endpoints
     path('api/profile/', api_views.api_profile, name='api_profile'),
@@ -51,22 +56,29 @@ urlpatterns = [
     
     # Research Study API endpoints
     path('api/studies/', api_views.api_studies, name='api_studies'),
+    path('api/studies/suggested/', api_views.api_suggested_studies, name='api_suggested_studies'),
     path('api/studies/<int:study_id>/', api_views.api_study_detail, name='api_study_detail'),
     path('api/studies/create/', api_views.api_create_study, name='api_create_study'),
     path('api/studies/<int:study_id>/apply/', api_views.api_apply_study, name='api_apply_study'),
     path('api/studies/<int:study_id>/applicants/', api_views.api_study_applicants, name='api_study_applicants'),
     path('api/participations/<int:participation_id>/status/', api_views.api_update_applicant_status, name='api_update_applicant_status'),
+    path('api/participations/status/bulk/', api_views.api_bulk_update_applicant_status, name='api_bulk_update_applicant_status'),
     path('api/user/studies/', api_views.api_user_studies, name='api_user_studies'),
     
     # Community API endpoints
     path('api/communities/', api_views.api_communities, name='api_communities'),
     path('api/communities/create/', api_views.api_create_community, name='api_create_community'),
+    path('api/communities/tags/', api_views.api_community_tags, name='api_community_tags'),
+    path('api/communities/suggested/', api_views.api_suggested_communities, name='api_suggested_communities'),
     path('api/communities/<int:community_id>/', api_views.api_community_detail, name='api_community_detail'),
     path('api/communities/<int:community_id>/join/', api_views.api_join_community, name='api_join_community'),
     path('api/communities/<int:community_id>/leave/', api_views.api_leave_community, name='api_leave_community'),
+    path('api/communities/<int:community_id>/members/', api_views.api_community_members, name='api_community_members'),
     path('api/communities/<int:community_id>/posts/', api_views.api_community_posts, name='api_community_posts'),
     path('api/communities/<int:community_id>/posts/create/', api_views.api_create_post, name='api_create_post'),
+    path('api/communities/<int:community_id>/posts/duplicates/', api_views.api_community_duplicate_posts, name='api_community_duplicate_posts'),
     path('api/user/communities/', api_views.api_user_communities, name='api_user_communities'),
+    path('api/user/feed/', api_views.api_home_feed, name='api_home_feed'),
 
     # Study documents
     path('api/studies/<int:study_id>/documents/', api_views.api_study_documents, name='api_study_documents'),
@@ -82,6 +94,9 @@ urlpatterns = [
     path('api/posts/<int:post_id>/like/', api_views.api_like_post, name='api_like_post'),
     path('api/posts/<int:post_id>/unlike/', api_views.api_unlike_post, name='api_unlike_post'),
     path('api/posts/<int:post_id>/comments/', api_views.api_add_comment, name='api_add_comment'),
+    path('api/posts/<int:post_id>/comments/list/', api_views.api_post_comments, name='api_post_comments'),
+    path('api/posts/<int:post_id>/poll/', api_views.api_poll, name='api_poll'),
+    path('api/posts/<int:post_id>/poll/vote/', api_views.api_vote_poll, name='api_vote_poll'),
     
     # Contact Request API endpoints
     path('api/contact-request/<int:patient_id>/', api_views.api_send_contact_request, name='api_send_contact_request'),
@@ -1,6 +1,7 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Heart, MessageCircle, Share, MoreHorizontal, Send, User, Edit, Trash2, X, Check } from 'lucide-react';
 import { useAuth } from '../../contexts/AuthContext';
+import { PostComment, PostCommentPage } from '../../types/data';
 
 interface CommunityPostProps {
   post: {
@@ -15,13 +16,9 @@ interface CommunityPostProps {
       url: string;
     }>;
     likes: string[];
-    comments: Array<{
-      id: string;
-      authorName: string;
-      authorType: 'patient' | 'researcher';
-      content: string;
-      createdAt: string;
-    }>;
+    comments: PostComment[];
+    commentCount: number;
+    commentsNextCursor: string | null;
     createdAt: string;
   };
   onLike: (postId: string) => Promise<void>;
@@ -29,6 +26,7 @@ interface CommunityPostProps {
   onComment: (postId: string, content: string) => Promise<void>;
   onUpdate?: (postId: string, content: string) => Promise<void>;
   onDelete?: (postId: string) => Promise<void>;
+  onLoadComments: (postId: string, options?: { cursor?: string | null; root?: string }) => Promise<PostCommentPage | null>;
   isLiked: boolean;
 }
 
@@ -39,6 +37,7 @@ const CommunityPost: React.FC<CommunityPostProps> = ({
   onComment,
   onUpdate,
   onDelete,
+  onLoadComments,
   isLiked
 }) => {
   const { user } = useAuth();
@@ -48,6 +47,60 @@ const CommunityPost: React.FC<CommunityPostProps> = ({
   const [isEditing, setIsEditing] = useState(false);
   const [editText, setEditText] = useState(post.content);
   const [showMenu, setShowMenu] = useState(false);
+  // The feed embeds only the first top-level comments; opening the comments
+  // reads them with their first replies, and more pages and threads on demand
+  const [comments, setComments] = useState<PostComment[] | null>(null);
+  const [commentsCursor, setCommentsCursor] = useState<string | null>(null);
+  const [threads, setThreads] = useState<Record<string, { replies: PostComment[]; cursor: string | null }>>({});
+  const [loadingComments, setLoadingComments] = useState(false);
+
+  useEffect(() => {
+    if (!showComments) return;
+    let cancelled = false;
+    onLoadComments(post.id).then((page) => {
+      if (cancelled || !page) return;
+      setComments(page.comments);
+      setCommentsCursor(page.nextCursor);
+      setThreads({});
+    });
+    return () => {
+      cancelled = true;
+    };
+    // Reload when a comment is added and the post is refetched
+  }, [showComments, post.id, post.commentCount, onLoadComments]);
+
+  const handleLoadMoreComments = async () => {
+    const cursor = comments ? commentsCursor : post.commentsNextCursor;
+    if (!cursor) return;
+    setLoadingComments(true);
+    try {
+      const page = await onLoadComments(post.id, { cursor });
+      if (page) {
+        setComments([...(comments || post.comments), ...page.comments]);
+        setCommentsCursor(page.nextCursor);
+      }
+    } finally {
+      setLoadingComments(false);
+    }
+  };
+
+  const handleLoadReplies = async (root: PostComment) => {
+    const thread = threads[root.id];
+    setLoadingComments(true);
+    try {
+      const page = await onLoadComments(post.id, { root: root.id, cursor: thread?.cursor });
+      if (page) {
+        // A thread page starts with the root comment itself
+        const replies = page.comments.filter((comment) => comment.id !== root.id);
+        setThreads((prev) => ({
+          ...prev,
+          [root.id]: { replies: [...(thread?.replies || []), ...replies], cursor: page.nextCursor }
+        }));
+      }
+    } finally {
+      setLoadingComments(false);
+    }
+  };
 
   const handleLike = async () => {
     if (isLiked) {
@@ -119,6 +172,32 @@ const CommunityPost: React.FC<CommunityPostProps> = ({
     return authorType === 'researcher' ? '👨‍⚕️' : '👤';
   };
 
+  const renderComment = (comment: PostComment) => (
+    <div key={comment.id} className="flex space-x-2" style={{ marginLeft: `${comment.depth * 2.5}rem` }}>
+      <div className="w-8 h-8 bg-gray-100 rounded-full flex items-center justify-center flex-shrink-0">
+        {getAuthorIcon(comment.authorType)}
+      </div>
+      <div className="flex-1">
+        <div className="bg-gray-50 rounded-lg px-3 py-2">
+          <div className="flex items-center space-x-2 mb-1">
+            <span className="font-medium text-sm text-gray-900">{comment.authorName}</span>
+            <span className={`px-1 py-0.5 text-xs rounded ${
+              comment.authorType === 'researcher' 
+                ? 'bg-green-100 text-green-800' 
+                : 'bg-blue-100 text-blue-800'
+            }`}>
+              {comment.authorType === 'researcher' ? 'Researcher' : 'Patient'}
+            </span>
+          </div>
+          <p className="text-sm text-gray-700">{comment.content}</p>
+        </div>
+        <p className="text-xs text-gray-500 mt-1 ml-3">
+          {formatTimeAgo(comment.createdAt)}
+        </p>
+      </div>
+    </div>
+  );
+
   return (
     <div className="bg-white rounded-lg shadow-md p-6 mb-4">
       {/* Post Header */}
@@ -286,7 +365,7 @@ const CommunityPost: React.FC<CommunityPostProps> = ({
           </span>
           <span className="flex items-center space-x-1">
             <MessageCircle className="h-4 w-4" />
-            <span>{post.comments.length} {post.comments.length === 1 ? 'comment' : 'comments'}</span>
+            <span>{post.commentCount} {post.commentCount === 1 ? 'comment' : 'comments'}</span>
           </span>
         </div>
       </div>
@@ -354,31 +433,34 @@ const CommunityPost: React.FC<CommunityPostProps> = ({
 
           {/* Comments List */}
           <div className="space-y-3">
-            {post.comments.map((comment) => (
-              <div key={comment.id} className="flex space-x-2">
-                <div className="w-8 h-8 bg-gray-100 rounded-full flex items-center justify-center flex-shrink-0">
-                  {getAuthorIcon(comment.authorType)}
-                </div>
-                <div className="flex-1">
-                  <div className="bg-gray-50 rounded-lg px-3 py-2">
-                    <div className="flex items-center space-x-2 mb-1">
-                      <span className="font-medium text-sm text-gray-900">{comment.authorName}</span>
-                      <span className={`px-1 py-0.5 text-xs rounded ${
-                        comment.authorType === 'researcher' 
-                          ? 'bg-green-100 text-green-800' 
-                          : 'bg-blue-100 text-blue-800'
-                      }`}>
-                        {comment.authorType === 'researcher' ? 'Researcher' : 'Patient'}
-                      </span>
-                    </div>
-                    <p className="text-sm text-gray-700">{comment.content}</p>
-                  </div>
-                  <p className="text-xs text-gray-500 mt-1 ml-3">
-                    {formatTimeAgo(comment.createdAt)}
-                  </p>
-                </div>
-              </div>
-            ))}
+            {(comments || post.comments).map((comment) => {
+              const thread = threads[comment.id];
+              const hasMoreReplies = thread ? !!thread.cursor : comment.hasMoreReplies;
+              return (
+                <React.Fragment key={comment.id}>
+                  {renderComment(comment)}
+                  {(thread ? thread.replies : comment.replies).map(renderComment)}
+                  {hasMoreReplies && (
+                    <button
+                      onClick={() => handleLoadReplies(comment)}
+                      disabled={loadingComments}
+                      className="ml-10 text-sm text-blue-600 hover:text-blue-800 disabled:opacity-50"
+                    >
+                      View more replies
+                    </button>
+                  )}
+                </React.Fragment>
+              );
+            })}
+            {(comments ? commentsCursor : post.commentsNextCursor) && (
+              <button
+                onClick={handleLoadMoreComments}
+                disabled={loadingComments}
+                className="text-sm text-blue-600 hover:text-blue-800 disabled:opacity-50"
+              >
+                {loadingComments ? 'Loading...' : 'Load more comments'}
+              </button>
+            )}
           </div>
         </div>
       )}
@@ -1,6 +1,7 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { X, MapPin, Calendar, Users, Phone, Mail, FileText, CheckCircle, AlertCircle } from 'lucide-react';
 import { ClinicalTrial } from '../../types/data';
+import { useData } from '../../contexts/DataContext';
 
 interface StudyDetailModalProps {
   isOpen: boolean;
@@ -19,18 +20,37 @@ const StudyDetailModal: React.FC<StudyDetailModalProps> = ({
   userType,
   participationStatus
 }) => {
+  const { fetchStudyDetail } = useData();
   const [applying, setApplying] = useState(false);
   const [applyError, setApplyError] = useState<string>('');
+  // Catalog rows don't carry the eligibility criteria and primary endpoint
+  const [detail, setDetail] = useState<ClinicalTrial | null>(null);
+
+  useEffect(() => {
+    if (!isOpen || !study) return;
+    let cancelled = false;
+    setDetail(null);
+    fetchStudyDetail(study.id).then((loaded) => {
+      // Fall back to the catalog row so a failed load doesn't stay "Loading..."
+      if (!cancelled) setDetail(loaded || study);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [isOpen, study?.id]);
 
   if (!isOpen || !study) return null;
 
+  const loaded = detail && detail.id === study.id ? detail : null;
   const contact = study.contactInfo || { name: '', email: '', phone: '' };
   const startDateText = study.startDate ? new Date(study.startDate).toLocaleDateString() : 'Not specified';
   const completionDateText = study.estimatedCompletionDate ? new Date(study.estimatedCompletionDate).toLocaleDateString() : 'Not specified';
-  const eligibilityText = Array.isArray(study.eligibilityCriteria)
-    ? (study.eligibilityCriteria as string[]).join('\n')
-    : (study.eligibilityCriteria || 'Not specified');
-  const primaryEndpointText = study.primaryEndpoint || 'Not specified';
+  const eligibilityCriteria = loaded ? loaded.eligibilityCriteria : study.eligibilityCriteria;
+  const eligibilityText = Array.isArray(eligibilityCriteria)
+    ? (eligibilityCriteria as string[]).join('\n')
+    : (eligibilityCriteria || (loaded ? 'Not specified' : 'Loading...'));
+  const primaryEndpoint = loaded ? loaded.primaryEndpoint : study.primaryEndpoint;
+  const primaryEndpointText = primaryEndpoint || (loaded ? 'Not specified' : 'Loading...');
 
   const handleApply = async () => {
     setApplying(true);
@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useState, useEffect, useCallback, ReactNode } from 'react';
+import React, { createContext, useContext, useState, useEffect, useCallback, useRef, ReactNode } from 'react';
 import { useAuth } from './AuthContext';
 import { 
   ClinicalTrial, 
@@ -16,6 +16,8 @@ import {
   StudyDocument,
   StudyAppointment,
   ContactRequest,
+  PostComment,
+  PostCommentPage,
 } from '../types/data';
 
 interface DataContextType {
@@ -23,6 +25,7 @@ interface DataContextType {
   clinicalTrials: ClinicalTrial[];
   userStudies: ClinicalTrial[];
   fetchStudies: () => Promise<void>;
+  fetchStudyDetail: (studyId: string) => Promise<ClinicalTrial | null>;
   fetchUserStudies: () => Promise<void>;
   applyToStudy: (studyId: string) => Promise<boolean>;
   createClinicalTrial: (studyData: any) => Promise<boolean>;
@@ -44,7 +47,9 @@ interface DataContextType {
   createCommunity: (communityData: any) => Promise<boolean>;
   // Added for posts and membership checks
   communityPosts: any[];
+  communityPostsCursor: string | null;
   fetchCommunityPosts: (communityId: string) => Promise<void>;
+  loadMoreCommunityPosts: (communityId: string) => Promise<void>;
   isUserMemberOf: (communityId: string) => boolean;
   createPost: (communityId: string, content: string, attachments?: File[]) => Promise<boolean>;
   updatePost: (postId: string, content: string) => Promise<boolean>;
@@ -52,6 +57,7 @@ interface DataContextType {
   likePost: (postId: string) => Promise<boolean>;
   unlikePost: (postId: string) => Promise<boolean>;
   addComment: (postId: string, content: string) => Promise<boolean>;
+  fetchPostComments: (postId: string, options?: { cursor?: string | null; root?: string }) => Promise<PostCommentPage | null>;
   
   // Search & Matching
   patientMatches: PatientMatch[];
@@ -101,6 +107,45 @@ interface DataContextType {
 
 const DataContext = createContext<DataContextType | undefined>(undefined);
 
+interface CommunityPostPage {
+  posts: any[];
+  nextCursor: string | null;
+}
+
+const normalizeComment = (c: any): PostComment => ({
+  id: c.id?.toString(),
+  parentId: c.parent_id != null ? c.parent_id.toString() : null,
+  depth: Number(c.depth || 0),
+  authorName: c.author_name,
+  authorType: c.author_type,
+  content: c.content,
+  createdAt: c.created_at,
+  replies: (c.replies || []).map(normalizeComment),
+  hasMoreReplies: !!c.has_more_replies
+});
+
+const normalizePost = (p: any, communityId: string) => ({
+  id: p.id?.toString(),
+  authorName: p.author_name,
+  authorType: p.author_type,
+  content: p.content,
+  attachments: (p.attachments || []).map((a: any) => ({
+    id: a.id?.toString(),
+    name: a.name,
+    type: a.type,
+    url: a.url
+  })),
+  likes: Array.from({ length: Number(p.likes || 0) }, (_, i) => `like-${i}`),
+  // The feed embeds only the first page of top-level comments; the rest and
+  // all replies come from fetchPostComments
+  comments: (p.comments || []).map(normalizeComment),
+  commentCount: Number(p.comment_count ?? (p.comments || []).length),
+  commentsNextCursor: p.comments_next_cursor ?? null,
+  createdAt: p.created_at,
+  communityId: communityId.toString(),
+  is_liked: !!p.is_liked
+});
+
 // Move hook outside component for better Fast Refresh compatibility
 function useData() {
   const context = useContext(DataContext);
@@ -130,6 +175,9 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
   const [userCommunities, setUserCommunities] = useState<Community[]>([]);
   // Added: posts state
   const [communityPosts, setCommunityPosts] = useState<any[]>([]);
+  const [communityPostsCursor, setCommunityPostsCursor] = useState<string | null>(null);
+  // Which community the loaded posts belong to and how many pages of it are shown
+  const communityPostPages = useRef({ communityId: '', pages: 0 });
   
   // Search & Matching
   const [patientMatches, setPatientMatches] = useState<PatientMatch[]>([]);
@@ -149,19 +197,44 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
   // Clinical Trials Functions
   const fetchStudies = async () => {
     try {
-      const response = await fetch(`${API_BASE}/api/studies/`, {
+      // The catalog is keyset-paginated: follow next_cursor until the last page
+      const studies: ClinicalTrial[] = [];
+      let cursor: string | null = null;
+      do {
+        const params = new URLSearchParams({ limit: '100' });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${API_BASE}/api/studies/?${params}`, {
+          credentials: 'include'
+        });
+        if (!response.ok) return;
+        const data = await response.json();
+        if (!data.success) return;
+        studies.push(...data.studies);
+        cursor = data.next_cursor;
+      } while (cursor);
+      setClinicalTrials(studies);
+    } catch (error) {
+      console.error('Failed to fetch studies:', error);
+    }
+  };
+
+  // Catalog rows leave out eligibilityCriteria and primaryEndpoint; the detail endpoint has them
+  const fetchStudyDetail = async (studyId: string): Promise<ClinicalTrial | null> => {
+    try {
+      const response = await fetch(`${API_BASE}/api/studies/${studyId}/`, {
         credentials: 'include'
       });
       
       if (response.ok) {
         const data = await response.json();
         if (data.success) {
-          setClinicalTrials(data.studies);
+          return data.study;
         }
       }
     } catch (error) {
-      console.error('Failed to fetch studies:', error);
+      console.error('Failed to fetch study details:', error);
     }
+    return null;
   };
 
   const fetchUserStudies = async () => {
@@ -403,44 +476,58 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
   };
 
   // Added: fetch posts for a community
+  const fetchCommunityPostPage = useCallback(async (communityId: string, cursor: string | null): Promise<CommunityPostPage | null> => {
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${API_BASE}/api/communities/${communityId}/posts/?${params}`, {
+      credentials: 'include'
+    });
+    if (!response.ok) return null;
+    const data = await response.json();
+    if (!data.success) return null;
+    return {
+      posts: (data.posts || []).map((p: any) => normalizePost(p, communityId)),
+      nextCursor: data.next_cursor ?? null
+    };
+  }, [API_BASE]);
+
+  // Posts are keyset-paginated: a refresh re-reads as many pages as are already
+  // shown for the community, so liking a post deep in the feed keeps it on screen
   const fetchCommunityPosts = useCallback(async (communityId: string) => {
     try {
-      const response = await fetch(`${API_BASE}/api/communities/${communityId}/posts/`, {
-        credentials: 'include'
-      });
-      if (response.ok) {
-        const data = await response.json();
-        if (data.success) {
-          const normalized = (data.posts || []).map((p: any) => ({
-            id: p.id?.toString(),
-            authorName: p.author_name,
-            authorType: p.author_type,
-            content: p.content,
-            attachments: (p.attachments || []).map((a: any) => ({
-              id: a.id?.toString(),
-              name: a.name,
-              type: a.type,
-              url: a.url
-            })),
-            likes: Array.from({ length: Number(p.likes || 0) }, (_, i) => `like-${i}`),
-            comments: (p.comments || []).map((c: any) => ({
-              id: c.id?.toString(),
-              authorName: c.author_name,
-              authorType: c.author_type,
-              content: c.content,
-              createdAt: c.created_at
-            })),
-            createdAt: p.created_at,
-            communityId: communityId.toString(),
-            is_liked: !!p.is_liked
-          }));
-          setCommunityPosts(normalized);
-        }
-      }
+      const loaded = communityPostPages.current;
+      const wanted = loaded.communityId === communityId ? Math.max(loaded.pages, 1) : 1;
+      const posts: any[] = [];
+      let cursor: string | null = null;
+      let pages = 0;
+      do {
+        const page: CommunityPostPage | null = await fetchCommunityPostPage(communityId, cursor);
+        if (!page) return;
+        posts.push(...page.posts);
+        cursor = page.nextCursor;
+        pages += 1;
+      } while (cursor && pages < wanted);
+      communityPostPages.current = { communityId, pages };
+      setCommunityPosts(posts);
+      setCommunityPostsCursor(cursor);
     } catch (error) {
       console.error('Failed to fetch community posts:', error);
     }
-  }, [API_BASE]);
+  }, [fetchCommunityPostPage]);
+
+  const loadMoreCommunityPosts = useCallback(async (communityId: string) => {
+    const loaded = communityPostPages.current;
+    if (loaded.communityId !== communityId || !communityPostsCursor) return;
+    try {
+      const page = await fetchCommunityPostPage(communityId, communityPostsCursor);
+      if (!page) return;
+      communityPostPages.current = { communityId, pages: loaded.pages + 1 };
+      setCommunityPosts(prev => [...prev, ...page.posts]);
+      setCommunityPostsCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load more community posts:', error);
+    }
+  }, [fetchCommunityPostPage, communityPostsCursor]);
 
   // Added: membership check helper
   const isUserMemberOf = (communityId: string): boolean => {
@@ -590,6 +677,30 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
     }
   };
 
+  // Top-level comments with their first replies, or with a root comment id that comment's whole thread
+  const fetchPostComments = useCallback(async (postId: string, options: { cursor?: string | null; root?: string } = {}): Promise<PostCommentPage | null> => {
+    try {
+      const params = new URLSearchParams();
+      if (options.cursor) params.set('cursor', options.cursor);
+      if (options.root) params.set('root', options.root);
+      const resp = await fetch(`${API_BASE}/api/posts/${postId}/comments/list/?${params}`, {
+        credentials: 'include'
+      });
+      if (resp.ok) {
+        const data = await resp.json();
+        if (data.success) {
+          return {
+            comments: (data.comments || []).map(normalizeComment),
+            nextCursor: data.next_cursor ?? null
+          };
+        }
+      }
+    } catch (error) {
+      console.error('Failed to fetch comments:', error);
+    }
+    return null;
+  }, [API_BASE]);
+
   const joinCommunity = async (communityId: string): Promise<boolean> => {
     if (!user) return false;
     
@@ -1129,6 +1240,7 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
     clinicalTrials,
     userStudies,
     fetchStudies,
+    fetchStudyDetail,
     fetchUserStudies,
     applyToStudy,
     createClinicalTrial,
@@ -1150,7 +1262,9 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
     createCommunity,
     // Added
     communityPosts,
+    communityPostsCursor,
     fetchCommunityPosts,
+    loadMoreCommunityPosts,
     isUserMemberOf,
     createPost,
     updatePost,
@@ -1158,6 +1272,7 @@ const DataProvider = React.memo(({ children }: DataProviderProps) => {
     likePost,
     unlikePost,
     addComment,
+    fetchPostComments,
     
     // Search & Matching
     patientMatches,
@@ -11,6 +11,7 @@ const CommunityPage: React.FC = () => {
   const { 
     communities, 
     communityPosts, 
+    communityPostsCursor,
     joinCommunity, 
     leaveCommunity,
     isUserMemberOf,
@@ -20,13 +21,16 @@ const CommunityPage: React.FC = () => {
     likePost,
     unlikePost,
     addComment,
+    fetchPostComments,
     fetchCommunityPosts,
+    loadMoreCommunityPosts,
     createCommunity
   } = useData();
   const { user } = useAuth();
   const [searchQuery, setSearchQuery] = useState<string>('');
   const [selectedCategory, setSelectedCategory] = useState<string>('All');
   const [isJoining, setIsJoining] = useState(false);
+  const [loadingMorePosts, setLoadingMorePosts] = useState(false);
   const [showCreateCommunity, setShowCreateCommunity] = useState(false);
   const [creatingCommunity, setCreatingCommunity] = useState(false);
   const [communityForm, setCommunityForm] = useState({
@@ -89,6 +93,16 @@ const CommunityPage: React.FC = () => {
     await createPost(selectedCommunity.id, content, attachments);
   };
 
+  const handleLoadMorePosts = async () => {
+    if (!selectedCommunity) return;
+    setLoadingMorePosts(true);
+    try {
+      await loadMoreCommunityPosts(selectedCommunity.id.toString());
+    } finally {
+      setLoadingMorePosts(false);
+    }
+  };
+
   const handleUpdatePost = async (postId: string, content: string) => {
     await updatePost(postId, content);
     if (selectedCommunity) {
@@ -303,10 +317,20 @@ const CommunityPage: React.FC = () => {
                     onComment={handleAddComment}
                     onUpdate={handleUpdatePost}
                     onDelete={handleDeletePost}
+                    onLoadComments={fetchPostComments}
                     isLiked={isPostLiked(post)}
                   />
                 ))
               )}
+              {communityPostsList.length > 0 && communityPostsCursor && (
+                <button
+                  onClick={handleLoadMorePosts}
+                  disabled={loadingMorePosts}
+                  className="w-full border border-gray-300 text-gray-700 py-2 rounded-md hover:bg-gray-50 transition-colors disabled:opacity-50"
+                >
+                  {loadingMorePosts ? 'Loading...' : 'Load more posts'}
+                </button>
+              )}
             </div>
           </div>
 
@@ -250,6 +250,23 @@ export interface ContactRequest {
   createdAt: string;
 }
 
+export interface PostComment {
+  id: string;
+  parentId: string | null;
+  depth: number;
+  authorName: string;
+  authorType: 'patient' | 'researcher';
+  content: string;
+  createdAt: string;
+  replies: PostComment[];
+  hasMoreReplies: boolean;
+}
+
+export interface PostCommentPage {
+  comments: PostComment[];
+  nextCursor: string | null;
+}
+
 export interface CommunityPost {
   id: string;
   authorName: string;
@@ -257,7 +274,9 @@ export interface CommunityPost {
   content: string;
   attachments: any[];
   likes: number;
-  comments: any[];
+  comments: PostComment[];
+  commentCount: number;
+  commentsNextCursor: string | null;
   createdAt: string;
   isLiked: boolean;
 }
\ No newline at end of file